@@ -0,0 +1,316 @@
+"""
+Headless performance benchmarks for trajplotlib
+
+Run benchmarks and store results:
+    python benchmarks/run_benchmarks.py run --output results.json [--quick] [--filter quickplot3]
+
+Compare results against a stored baseline, exiting with status 1 on regressions:
+    python benchmarks/run_benchmarks.py compare baseline.json results.json [--threshold 0.25]
+
+Check import time of trajplotlib against its budget, exiting with status 1 if exceeded:
+    python benchmarks/run_benchmarks.py check-import [--budget 0.05]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import trajplotlib
+
+
+# budget for `import trajplotlib` plus access of a numpy-only helper, in seconds
+IMPORT_BUDGET = 0.05
+# modules that must not be loaded by importing trajplotlib
+IMPORT_FORBIDDEN = ["matplotlib.pyplot", "matplotlib.animation", "scipy"]
+
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+ENSEMBLES = [1, 10, 100, 1000]
+QUICK_SIZES = [10**3, 10**4, 10**5]
+QUICK_ENSEMBLES = [1, 10, 100]
+
+# registry of benchmarks: name -> (setup function, parameter name, full values, quick values)
+# the callable returned by a setup function is timed, unless it returns its own measured time
+BENCHMARKS = {}
+
+
+def benchmark(name, param, values, quick_values):
+    """Register benchmark; the decorated function takes the parameter value and returns a callable to be timed"""
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, param, values, quick_values)
+        return setup
+    return decorator
+
+
+def make_trajectory(n, n_rev=10.0, seed=0):
+    """Get precessing, perturbed orbit of shape (n,3) with time-stamps and velocities"""
+    rng = np.random.default_rng(seed)
+    ts = np.linspace(0.0, 2*np.pi*n_rev, n)
+    r = 250.0 + 50.0*np.sin(0.3*ts) + rng.normal(0.0, 0.1, n)
+    positions = np.array([r*np.cos(ts), r*np.sin(ts), 50.0*np.sin(0.5*ts)]).T
+    velocities = np.gradient(positions, ts, axis=0)
+    return ts, positions, velocities
+
+
+def make_ensemble(k, n, seed=0):
+    """Get ensemble of shape (k,n,3) dispersed around a reference trajectory"""
+    rng = np.random.default_rng(seed)
+    ts, positions, _ = make_trajectory(n, seed=seed)
+    return ts, positions[None, :, :] + rng.normal(0.0, 5.0, (k, 1, 3))
+
+
+@benchmark("quickplot2", "n_points", SIZES, QUICK_SIZES)
+def bench_quickplot2(n):
+    _, positions, _ = make_trajectory(n)
+    def run():
+        fig, ax = trajplotlib.quickplot2(positions[:, 0], positions[:, 1], radius=184.0)
+        fig.canvas.draw()
+    return run
+
+
+@benchmark("quickplot3", "n_points", SIZES, QUICK_SIZES)
+def bench_quickplot3(n):
+    _, positions, _ = make_trajectory(n)
+    def run():
+        fig, ax = trajplotlib.quickplot3(positions[:, 0], positions[:, 1], positions[:, 2], radius=184.0)
+        fig.canvas.draw()
+    return run
+
+
+@benchmark("quickplot3_ensemble", "n_traj", ENSEMBLES, QUICK_ENSEMBLES)
+def bench_quickplot3_ensemble(k):
+    _, trajs = make_ensemble(k, 1000)
+    def run():
+        fig, ax = trajplotlib.quickplot3(trajs[0, :, 0], trajs[0, :, 1], trajs[0, :, 2])
+        for traj in trajs[1:]:
+            trajplotlib.quickplot3(traj[:, 0], traj[:, 1], traj[:, 2], ax=ax)
+        fig.canvas.draw()
+    return run
+
+
+@benchmark("quickplot3_many", "n_traj", ENSEMBLES, QUICK_ENSEMBLES)
+def bench_quickplot3_many(k):
+    _, trajs = make_ensemble(k, 1000)
+    def run():
+        fig, ax = trajplotlib.quickplot3_many(trajs)
+        fig.canvas.draw()
+    return run
+
+
+@benchmark("animate_trajectory_3d_setup", "n_points", SIZES, QUICK_SIZES)
+def bench_animate_setup(n):
+    ts, positions, _ = make_trajectory(n)
+    def run():
+        trajplotlib.animate_trajectory_3d(positions[:, 0], positions[:, 1], positions[:, 2], ts, nt=100)
+    return run
+
+
+@benchmark("animate_trajectory_3d_ensemble_setup", "n_traj", ENSEMBLES, QUICK_ENSEMBLES)
+def bench_animate_ensemble_setup(k):
+    ts, trajs = make_ensemble(k, 1000)
+    def run():
+        trajplotlib.animate_trajectory_3d(
+            trajs[:, :, 0], trajs[:, :, 1], trajs[:, :, 2], ts, nt=100, multiple_traj=True, c_traj="navy"
+        )
+    return run
+
+
+@benchmark("animate_trajectory_3d_frame", "n_traj", ENSEMBLES, QUICK_ENSEMBLES)
+def bench_animate_frame(k):
+    ts, trajs = make_ensemble(k, 1000)
+    def run():
+        fig, ax, ani = trajplotlib.animate_trajectory_3d(
+            trajs[:, :, 0], trajs[:, :, 1], trajs[:, :, 2], ts, nt=100, multiple_traj=True, c_traj="navy"
+        )
+        # report time per blitted frame update rather than total time
+        return 1.0 / ani.measure_fps(n_frames=20)
+    return run
+
+
+@benchmark("get_lc_traj_singleColor", "n_points", SIZES, QUICK_SIZES)
+def bench_linecolor(n):
+    _, positions, velocities = make_trajectory(n)
+    speed = np.linalg.norm(velocities, axis=1)
+    def run():
+        trajplotlib.get_lc_traj_singleColor(positions[:, 0], positions[:, 1], speed, speed.min(), speed.max(), "viridis")
+    return run
+
+
+@benchmark("mesh_helpers", "n_calls", [10, 100, 1000, 10000], [10, 100, 1000])
+def bench_mesh(n_calls):
+    def run():
+        for i in range(n_calls):
+            trajplotlib.get_sphere_coordinates(184.0, [float(i), 0.0, 0.0])
+            trajplotlib.get_ellipsoid_coordinates(20.0, 10.0, 5.0, [float(i), 0.0, 0.0])
+            trajplotlib.helper3d.get_circle_coordinates(184.0, [float(i), 0.0])
+    return run
+
+
+def measure(run, repeat):
+    """Get best wall time over `repeat` runs and peak traced memory of one additional run"""
+    times = []
+    for _ in range(repeat):
+        tstart = time.perf_counter()
+        measured = run()
+        times.append(time.perf_counter() - tstart if measured is None else measured)
+        plt.close("all")
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    plt.close("all")
+    return min(times), peak
+
+
+def run_benchmarks(quick=False, repeat=3, name_filter=None):
+    """Run registered benchmarks
+
+    Args:
+        quick (bool): whether to use the reduced parameter ranges
+        repeat (int): number of timed runs per case
+        name_filter (str): if provided, only benchmarks whose name contains this string are run
+
+    Returns:
+        (dict): results with metadata
+    """
+    results = []
+    for name, (setup, param, values, quick_values) in BENCHMARKS.items():
+        if name_filter is not None and name_filter not in name:
+            continue
+        for value in (quick_values if quick else values):
+            run = setup(value)
+            wall_time, peak = measure(run, repeat)
+            plt.close("all")
+            results.append({"name": name, "params": {param: value}, "time": wall_time, "peak_memory": peak})
+            print(f"{name:40s} {param}={value:<10d} {wall_time:10.4f} s {peak/1e6:10.2f} MB", flush=True)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "quick": quick,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _key(result):
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare_results(baseline, current, threshold=0.25):
+    """Compare benchmark results against baseline
+
+    Args:
+        baseline (dict): baseline results
+        current (dict): current results
+        threshold (float): relative increase in time or peak memory flagged as regression
+
+    Returns:
+        (list): list of regressed cases as (name, params, metric, baseline value, current value)
+    """
+    baseline_by_key = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        ref = baseline_by_key.get(_key(result))
+        if ref is None:
+            continue
+        for metric in ("time", "peak_memory"):
+            ratio = result[metric] / ref[metric] if ref[metric] > 0 else 1.0
+            flag = "REGRESSION" if ratio > 1 + threshold else ""
+            print(f"{result['name']:40s} {json.dumps(result['params']):20s} {metric:12s} {ratio:8.2f}x {flag}")
+            if flag:
+                regressions.append((result["name"], result["params"], metric, ref[metric], result[metric]))
+    return regressions
+
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+import numpy
+tstart = time.perf_counter()
+import trajplotlib
+trajplotlib.get_ellipsoid_coordinates
+elapsed = time.perf_counter() - tstart
+print(json.dumps({"time": elapsed, "forbidden": [m for m in FORBIDDEN if m in sys.modules]}))
+"""
+
+
+def check_import(budget=IMPORT_BUDGET, repeat=5):
+    """Measure import time of trajplotlib in fresh interpreters, with numpy already imported
+
+    Args:
+        budget (float): maximum allowed import time in seconds
+        repeat (int): number of fresh interpreters; the best time is compared against the budget
+
+    Returns:
+        (list): list of violations as strings; empty if the import is within budget
+    """
+    script = f"FORBIDDEN = {IMPORT_FORBIDDEN!r}" + _IMPORT_SCRIPT
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get("PYTHONPATH", "")]))
+    runs = [
+        json.loads(subprocess.run([sys.executable, "-c", script], env=env, check=True,
+                                  capture_output=True, text=True).stdout)
+        for _ in range(repeat)
+    ]
+    best = min(run["time"] for run in runs)
+    print(f"import trajplotlib: {best*1e3:.1f} ms (budget {budget*1e3:.1f} ms)")
+    violations = []
+    if best > budget:
+        violations.append(f"import time {best*1e3:.1f} ms exceeds budget of {budget*1e3:.1f} ms")
+    for module in sorted(set(m for run in runs for m in run["forbidden"])):
+        violations.append(f"{module} is imported by `import trajplotlib`")
+    return violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="trajplotlib performance benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parser_run = subparsers.add_parser("run", help="run benchmarks")
+    parser_run.add_argument("--output", default="bench_results.json", help="output JSON file")
+    parser_run.add_argument("--quick", action="store_true", help="use reduced sizes")
+    parser_run.add_argument("--repeat", type=int, default=3, help="number of timed runs per case")
+    parser_run.add_argument("--filter", default=None, help="only run benchmarks whose name contains this string")
+    parser_compare = subparsers.add_parser("compare", help="compare results against baseline")
+    parser_compare.add_argument("baseline", help="baseline JSON file")
+    parser_compare.add_argument("current", help="current JSON file")
+    parser_compare.add_argument("--threshold", type=float, default=0.25, help="relative increase flagged as regression")
+    parser_import = subparsers.add_parser("check-import", help="check import time against budget")
+    parser_import.add_argument("--budget", type=float, default=IMPORT_BUDGET, help="maximum import time in seconds")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(quick=args.quick, repeat=args.repeat, name_filter=args.filter)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        return 0
+    if args.command == "check-import":
+        violations = check_import(budget=args.budget)
+        for violation in violations:
+            print(violation)
+        return 1 if violations else 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare_results(baseline, current, threshold=args.threshold)
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,8 +17,11 @@ if __name__=="__main__":
 	zs = data[:, 2]
 	ts = np.linspace(0.0, 1.0, len(data[:, 2]))  # fictitious time-stamp data
 
-	# create plot
-	fig, ax, anis = trajplotlib.animate_trajectory_3d(xs,ys,zs,ts)
+	# create plot, with a second trajectory scaled from the first one
+	# a single animator drives all trajectories (earlier versions returned a list of animations)
+	fig, ax, ani = trajplotlib.animate_trajectory_3d(
+		[xs, 0.8*xs], [ys, 0.8*ys], [zs, 0.8*zs], ts, multiple_traj=True, c_traj=["navy", "darkorange"]
+	)
 
 	# labels
 	ax.set_xlabel('x, km')
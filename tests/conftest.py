@@ -0,0 +1,11 @@
+"""
+Test configuration: headless backend and import path of the package
+"""
+
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,101 @@
+"""
+Tests of the blitted trajectory animator and its frame cache
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.animation import PillowWriter
+from PIL import Image, ImageSequence
+
+from trajplotlib.animator import TrajectoryAnimator
+
+
+def _animator(cache_frames=None, nt=12):
+    t = np.linspace(0.0, 2*np.pi, nt)
+    positions = np.stack([
+        np.stack([np.cos(t), np.sin(t), 0.1*t], axis=1),
+        np.stack([2*np.cos(t), np.sin(2*t), -0.1*t], axis=1),
+    ])
+    fig = plt.figure(figsize=(2, 2), dpi=50)
+    ax = fig.add_subplot(projection="3d")
+    ax.set_xlim(-2, 2)
+    ax.set_ylim(-2, 2)
+    ax.set_zlim(-1, 1)
+    lines = [ax.plot(pos[0:1, 0], pos[0:1, 1], pos[0:1, 2])[0] for pos in positions]
+    ani = TrajectoryAnimator(fig, lines, positions, times=t, cache_frames=cache_frames)
+    return fig, ani
+
+
+def _gif_frames(path):
+    with Image.open(path) as image:
+        return [np.asarray(frame.convert("RGBA")) for frame in ImageSequence.Iterator(image)]
+
+
+def test_seek_restores_cached_frames():
+    fig, ani = _animator(cache_frames=32)
+    fig.canvas.draw()
+    rendered = []
+    for i in range(12):
+        assert ani.seek(ani.times[i]) == i
+        rendered.append(np.asarray(fig.canvas.buffer_rgba()).copy())
+    assert len(ani.frame_cache) == 12 and ani.frame_cache.hits == 0
+    for i in (3, 0, 11):
+        ani.seek(ani.times[i])
+        assert np.array_equal(np.asarray(fig.canvas.buffer_rgba()), rendered[i])
+    assert ani.frame_cache.hits == 3
+    plt.close(fig)
+
+
+def test_cached_frames_record_timing():
+    fig, ani = _animator(cache_frames=32)
+    fig.canvas.draw()
+    ani.seek(ani.times[1])
+    ani.seek(ani.times[2])
+    for num in (1, 2):
+        ani._update_frame(num)
+    assert len(ani._frame_times) == 2
+    assert ani.frame_cache.hits == 2
+    plt.close(fig)
+
+
+def test_save_with_cached_frames(tmp_path):
+    fig, ani = _animator()
+    ani.save(tmp_path / "reference.gif", writer=PillowWriter(fps=10))
+    plt.close(fig)
+
+    fig, ani = _animator(cache_frames=32)
+    fig.canvas.draw()
+    # fill the cache in reverse order, so that stale artists would show in saved frames
+    for i in range(11, -1, -1):
+        ani.seek(ani.times[i])
+    assert len(ani.frame_cache) == 12
+    ani.save(tmp_path / "cached.gif", writer=PillowWriter(fps=10))
+    plt.close(fig)
+
+    reference = _gif_frames(tmp_path / "reference.gif")
+    cached = _gif_frames(tmp_path / "cached.gif")
+    assert len(reference) == len(cached) > 1
+    assert all(np.array_equal(a, b) for a, b in zip(reference, cached))
+
+
+def test_multiple_trajectories_share_one_animator():
+    from trajplotlib.helper3d import animate_trajectory_3d
+
+    t = np.linspace(0.0, 1.0, 50)
+    xs, ys, zs = [np.cos(t), 2*np.cos(t)], [np.sin(t), 2*np.sin(t)], [t, -t]
+    fig, ax, ani = animate_trajectory_3d(xs, ys, zs, t, nt=20, multiple_traj=True)
+    assert isinstance(ani, TrajectoryAnimator)
+    assert len(ani.lines) == 2 and ani.positions.shape == (2, 20, 3)
+    plt.close(fig)
+
+
+def test_single_trajectory_accepts_tuple_color():
+    from matplotlib.colors import to_rgba
+
+    from trajplotlib.helper3d import animate_trajectory_3d
+
+    t = np.linspace(0.0, 1.0, 50)
+    fig, ax, ani = animate_trajectory_3d(np.cos(t), np.sin(t), t, t, nt=20, c_traj=(0, 0, 1))
+    assert len(ani.lines) == 1
+    assert to_rgba(ani.lines[0].get_color()) == to_rgba("blue")
+    plt.close(fig)
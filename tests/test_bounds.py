@@ -0,0 +1,34 @@
+"""
+Tests of equal-axis bounds tracking
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from trajplotlib.bounds import get_axes_bounds
+from trajplotlib.helper2d import quickplot2
+from trajplotlib.helper3d import quickplot3
+
+
+def test_existing_artists_are_not_clipped():
+    t = np.linspace(0.0, 2*np.pi, 100)
+
+    fig, ax = plt.subplots()
+    ax.plot([10.0, 12.0], [-8.0, 5.0])
+    quickplot2(np.cos(t), np.sin(t), ax=ax)
+    assert ax.get_xlim()[1] >= 12.0 and ax.get_ylim()[0] <= -8.0
+    plt.close(fig)
+
+    fig = plt.figure()
+    ax = fig.add_subplot(projection="3d")
+    ax.plot([10.0, 12.0], [-8.0, 5.0], [3.0, 20.0])
+    quickplot3(np.cos(t), np.sin(t), 0.0*t, ax=ax)
+    assert ax.get_xlim()[1] >= 12.0 and ax.get_ylim()[0] <= -8.0 and ax.get_zlim()[1] >= 20.0
+    plt.close(fig)
+
+
+def test_empty_axes_start_empty():
+    fig = plt.figure()
+    ax = fig.add_subplot(projection="3d")
+    assert get_axes_bounds(ax, dim=3).is_empty
+    plt.close(fig)
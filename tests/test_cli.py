@@ -0,0 +1,73 @@
+"""
+Tests of the command line interface
+"""
+
+import os
+
+import numpy as np
+
+from trajplotlib import cli
+from trajplotlib.io import get_cache_path, load_trajectory
+
+
+def _write_trajectory(path, n=50):
+    t = np.linspace(0.0, 2*np.pi, n)
+    np.savetxt(path, np.stack([np.cos(t), np.sin(t), 0.1*t, -np.sin(t), np.cos(t), 0.1*np.ones(n)], axis=1), delimiter=",")
+
+
+def test_glob_skips_caches_and_directories(tmp_path):
+    _write_trajectory(tmp_path / "t1.csv")
+    _write_trajectory(tmp_path / "t2.csv")
+    # binary cache sidecar, and a directory matching the glob pattern
+    load_trajectory(str(tmp_path / "t1.csv"))
+    assert os.path.exists(get_cache_path(str(tmp_path / "t1.csv")))
+    os.mkdir(tmp_path / "tdir")
+
+    expected = [str(tmp_path / "t1.csv"), str(tmp_path / "t2.csv")]
+    assert cli.find_trajectory_files([str(tmp_path / "*")]) == expected
+    assert cli.find_trajectory_files([str(tmp_path / "t*")]) == expected
+    assert cli.find_trajectory_files([str(tmp_path)]) == expected
+
+
+def test_render_glob(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    _write_trajectory(data / "t1.csv")
+    load_trajectory(str(data / "t1.csv"))
+    os.mkdir(data / "plots")
+
+    out = tmp_path / "out"
+    assert cli.main(["render", str(data / "*"), "-o", str(out), "-j", "1", "--dim", "2"]) == 0
+    assert sorted(os.listdir(out)) == [".cache", "t1.png"]
+
+
+def test_render_same_names_in_different_directories(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        _write_trajectory(tmp_path / name / "orbit.csv")
+    _write_trajectory(tmp_path / "a" / "other.csv")
+
+    out = tmp_path / "out"
+    files = cli.find_trajectory_files([str(tmp_path / "a"), str(tmp_path / "b")])
+    summaries = cli.render_files(files, str(out), n_workers=1, dim=2)
+    assert [os.path.basename(summary["output"]) for summary in summaries] == ["a_orbit.png", "other.png", "b_orbit.png"]
+    assert sorted(os.listdir(out)) == [".cache", "a_orbit.png", "b_orbit.png", "other.png"]
+    # caches are kept in the output directory, not next to the inputs
+    assert sorted(os.listdir(tmp_path / "a")) == ["orbit.csv", "other.csv"]
+    assert len(os.listdir(out / ".cache")) == 3
+
+
+def test_output_names():
+    assert cli.get_output_names(["x/a.csv", "x/b.npy"], "png") == ["a.png", "b.png"]
+    assert cli.get_output_names(["x/a.csv", "x/y/a.csv"], "svg") == ["a.svg", "y_a.svg"]
+    # same stem in the same directory
+    assert cli.get_output_names(["x/a.csv", "x/a.npy"], "png") == ["a.png", "a_1.png"]
+
+
+def test_cache_dir(tmp_path):
+    _write_trajectory(tmp_path / "t1.csv")
+    cache_dir = tmp_path / "caches"
+    assert cli.main(["render", str(tmp_path / "t1.csv"), "-o", str(tmp_path / "out"), "-j", "1", "--dim", "2",
+                     "--cache-dir", str(cache_dir)]) == 0
+    assert len(os.listdir(cache_dir)) == 1 and os.listdir(tmp_path / "out") == ["t1.png"]
+    assert not os.path.exists(get_cache_path(str(tmp_path / "t1.csv")))
@@ -0,0 +1,50 @@
+"""
+Tests of trajectory decimation
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from trajplotlib.decimate import decimate_minmax
+from trajplotlib.helper3d import quickplot3
+
+
+def _helix(n, revolutions):
+    t = np.linspace(0.0, 2*np.pi*revolutions, n)
+    return np.stack([np.cos(t), np.sin(t), 1e-3*t], axis=1)
+
+
+def test_minmax_fills_budget():
+    for revolutions in (1, 10, 1000):
+        points = _helix(200_000, revolutions)
+        idx = decimate_minmax(points, 5000)
+        assert 0.9*5000 <= len(idx) <= 5000
+        assert idx[0] == 0 and idx[-1] == len(points) - 1
+        assert np.all(np.diff(idx) > 0)
+
+
+@pytest.mark.parametrize("max_points", [1, 0, -5])
+def test_minmax_rejects_budget_below_two(max_points):
+    with pytest.raises(ValueError):
+        decimate_minmax(_helix(1000, 1), max_points)
+    # also for trajectories already within the budget
+    with pytest.raises(ValueError):
+        decimate_minmax(_helix(1, 1), max_points)
+
+
+def test_minmax_small_budget():
+    points = _helix(1000, 3)
+    for max_points in (2, 3, 7):
+        idx = decimate_minmax(points, max_points)
+        assert len(idx) <= max_points and idx[0] == 0 and idx[-1] == len(points) - 1
+    assert len(decimate_minmax(points, 8)) <= 8
+
+
+def test_verbose_logs_dropped_points(caplog, capsys):
+    points = _helix(20_000, 10)
+    with caplog.at_level(logging.INFO, logger="trajplotlib"):
+        quickplot3(*points.T, max_points=1000, verbose=True)
+    assert "dropped" in caplog.text
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,57 @@
+"""
+Tests of trajectory event detection
+"""
+
+import numpy as np
+
+from trajplotlib.events import _local_velocities, find_events
+
+
+def test_apsides_and_nodes_of_inclined_ellipse():
+    t = np.linspace(0.0, 4*np.pi, 401)
+    positions = np.stack([2*np.cos(t), np.sin(t)*np.cos(0.3), np.sin(t)*np.sin(0.3)], axis=1)
+    velocities = np.stack([-2*np.sin(t), np.cos(t)*np.cos(0.3), np.cos(t)*np.sin(0.3)], axis=1)
+    events = find_events(positions, times=t, velocities=velocities)
+    assert np.allclose(events["apoapsis"][0], [np.pi, 2*np.pi, 3*np.pi], atol=1e-5)
+    assert np.allclose(events["periapsis"][0], [np.pi/2, 3*np.pi/2, 5*np.pi/2, 7*np.pi/2], atol=1e-5)
+    assert np.allclose(events["ascending_node"][0], [2*np.pi], atol=1e-5)
+    assert np.allclose(events["ascending_node"][1][:, 2], 0.0, atol=1e-12)
+
+
+def test_nodes_of_two_samples():
+    positions = np.array([[1.0, 0.0, -1.0], [1.0, 1.0, 3.0]])
+    events = find_events(positions, times=[0.0, 2.0], kinds=("ascending_node", "descending_node"))
+    t_node, p_node = events["ascending_node"]
+    assert np.allclose(t_node, [0.5])
+    assert np.allclose(p_node, [[1.0, 0.25, 0.0]])
+    assert len(events["descending_node"][0]) == 0
+
+
+def test_unbracketed_apsis_falls_back_to_sample():
+    # velocities inconsistent with positions, so the radial velocity of the Hermite interpolant does not change sign
+    positions = np.array([[2.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.1, 0.0]])
+    velocities = np.array([[1.0, 0.0, 0.0], [0.5, 0.0, 0.0], [1.0, 0.0, 0.0]])
+    t_min, p_min = find_events(positions, velocities=velocities, kinds=("periapsis",))["periapsis"]
+    assert np.array_equal(t_min, [1.0])
+    assert np.array_equal(p_min, positions[1:2])
+
+
+def test_local_velocities_match_quadratic():
+    times = np.array([0.0, 1.0, 2.5, 3.0, 5.0])
+    positions = np.stack([2*times + 1, times**2], axis=1)
+    velocities = _local_velocities(positions, times, np.arange(len(times)))
+    assert np.allclose(velocities[:, 0], 2.0)
+    assert np.allclose(velocities[:, 1], 2*times)
+
+
+def test_events_of_ellipse_without_velocities():
+    inclination = 0.3
+    for dt, atol in ((0.31, 5e-3), (0.05, 2e-5)):
+        t = np.arange(0.0, 4*np.pi, dt)
+        positions = np.stack([2*np.cos(t), np.sin(t)*np.cos(inclination), np.sin(t)*np.sin(inclination)], axis=1)
+        events = find_events(positions, times=t)
+        assert np.allclose(events["periapsis"][0], np.pi/2 + np.pi*np.arange(4), atol=atol)
+        assert np.allclose(events["apoapsis"][0], np.pi*np.arange(1, 4), atol=atol)
+        assert np.allclose(events["ascending_node"][0], [2*np.pi], atol=atol)
+        assert np.allclose(events["descending_node"][0], [np.pi, 3*np.pi], atol=atol)
+        assert np.allclose(np.linalg.norm(events["closest_approach"][1], axis=1), 1.0, atol=atol)
@@ -0,0 +1,53 @@
+"""
+Tests of streaming, parallel animation export
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageSequence
+
+from trajplotlib.export import export_trajectory_animation
+
+
+def _positions(nt=10):
+    t = np.linspace(0.0, 2*np.pi, nt)
+    return np.stack([
+        np.stack([np.cos(t), np.sin(t), 0.1*t], axis=1),
+        np.stack([2*np.cos(t), np.sin(2*t), -0.1*t], axis=1),
+    ])
+
+
+def _gif_frames(path):
+    with Image.open(path) as image:
+        return [np.asarray(frame.convert("RGBA")) for frame in ImageSequence.Iterator(image)]
+
+
+def test_gif_has_one_frame_per_step(tmp_path):
+    filename = str(tmp_path / "orbit.gif")
+    assert export_trajectory_animation(_positions(), filename, n_workers=1, n_figsize=2, dpi=40) == filename
+    frames = _gif_frames(filename)
+    assert len(frames) == 10 and frames[0].shape == (80, 80, 4)
+    # the trajectories grow, so consecutive frames differ
+    assert all(not np.array_equal(a, b) for a, b in zip(frames[:-1], frames[1:]))
+
+
+@pytest.mark.parametrize("trail_length", [None, 3])
+def test_parallel_export_matches_serial(tmp_path, trail_length):
+    kwargs = dict(n_figsize=2, dpi=40, trail_length=trail_length, c_traj=["navy", (1.0, 0.5, 0.0)])
+    export_trajectory_animation(_positions(), str(tmp_path / "serial.gif"), n_workers=1, **kwargs)
+    # small chunks, so that more chunks than workers are in flight and must be reordered
+    export_trajectory_animation(_positions(), str(tmp_path / "parallel.gif"), n_workers=2, chunk_size=3, **kwargs)
+    serial = _gif_frames(tmp_path / "serial.gif")
+    parallel = _gif_frames(tmp_path / "parallel.gif")
+    assert len(serial) == len(parallel) == 10
+    assert all(np.array_equal(a, b) for a, b in zip(serial, parallel))
+
+
+def test_single_trajectory_with_tuple_color(tmp_path):
+    filename = str(tmp_path / "single.gif")
+    export_trajectory_animation(_positions()[0], filename, n_workers=1, n_figsize=2, dpi=40, c_traj=(0, 0, 1),
+                                limits=((-1, 1), (-1, 1), (0, 1)))
+    last = _gif_frames(filename)[-1]
+    # the trajectory is drawn in blue, up to antialiasing and quantization
+    rgb = last[:, :, :3].astype(int)
+    assert np.any((rgb[:, :, 2] > 200) & (rgb[:, :, 0] < 100) & (rgb[:, :, 1] < 100))
@@ -0,0 +1,87 @@
+"""
+Tests of reference frame transformations
+"""
+
+import numpy as np
+import pytest
+
+from trajplotlib.frames import FrameTransform, inertial_to_rotating, rotating_to_inertial, transform_trajectory
+from trajplotlib.trajectory import Trajectory
+
+ORIGIN = [-0.012, 0.0, 0.0]
+
+
+def _rotating_states(times):
+    """Analytic trajectory in the rotating frame, with its velocity"""
+    positions = np.stack([0.8 + 0.1*np.cos(3*times), 0.2*np.sin(2*times), 0.05*times], axis=1)
+    velocities = np.stack([-0.3*np.sin(3*times), 0.4*np.cos(2*times), np.full_like(times, 0.05)], axis=1)
+    return positions, velocities
+
+
+@pytest.mark.parametrize("origin", [None, ORIGIN])
+def test_round_trip(origin):
+    times = np.linspace(0.0, 12.0, 1000)
+    positions, velocities = _rotating_states(times)
+    inertial = rotating_to_inertial(omega=1.3, t0=0.5, origin=origin)
+    rotating = inertial_to_rotating(omega=1.3, t0=0.5, origin=origin)
+    r_inertial, v_inertial = inertial.apply(positions, times=times, velocities=velocities, chunk_size=64)
+    r_back, v_back = rotating.apply(r_inertial, times=times, velocities=v_inertial, chunk_size=100)
+    assert np.allclose(r_back, positions) and np.allclose(v_back, velocities)
+    # frames coincide at t0, up to the origin offset
+    r0 = inertial.apply(positions[:1], times=np.array([0.5]))
+    assert np.allclose(r0, positions[:1] - (0.0 if origin is None else np.asarray(origin)))
+
+
+def test_point_at_rest_becomes_circle():
+    times = np.linspace(0.0, 2*np.pi, 50)
+    positions = np.tile([1.0, 0.0, 0.0], (50, 1))
+    r, v = rotating_to_inertial(omega=1.0).apply(positions, times=times, velocities=np.zeros_like(positions))
+    assert np.allclose(r, np.stack([np.cos(times), np.sin(times), np.zeros(50)], axis=1))
+    assert np.allclose(v, np.stack([-np.sin(times), np.cos(times), np.zeros(50)], axis=1))
+
+
+@pytest.mark.parametrize("transform", [rotating_to_inertial(omega=0.7, origin=ORIGIN),
+                                       inertial_to_rotating(omega=0.7, origin=ORIGIN)])
+def test_velocities_match_finite_differences(transform):
+    times = np.linspace(0.0, 5.0, 20001)
+    positions, velocities = _rotating_states(times)
+    r, v = transform.apply(positions, times=times, velocities=velocities)
+    v_fd = np.gradient(r, times, axis=0)
+    assert np.allclose(v[1:-1], v_fd[1:-1], atol=1e-6)
+
+
+def test_in_place_matches_out_of_place():
+    times = np.linspace(0.0, 3.0, 500)
+    positions, velocities = _rotating_states(times)
+    batched = np.stack([positions, 2*positions])
+    batched_velocities = np.stack([velocities, -velocities])
+    transform = rotating_to_inertial(omega=2.0, origin=ORIGIN)
+    r_expected, v_expected = transform.apply(batched, times=times, velocities=batched_velocities)
+
+    r, v = batched.copy(), batched_velocities.copy()
+    r_out, v_out = transform.apply(r, times=times, velocities=v, out=r, out_velocities=v, chunk_size=128)
+    assert r_out is r and v_out is v
+    assert np.allclose(r, r_expected) and np.allclose(v, v_expected)
+
+
+def test_array_components():
+    times = np.linspace(0.0, 1.0, 20)
+    positions, _ = _rotating_states(times)
+    transform = rotating_to_inertial(omega=0.5, origin=ORIGIN)
+    rotations = transform.rotations(times)
+    translations = transform.translations(times)
+    from_arrays = FrameTransform(rotations=rotations, translations=translations)
+    assert from_arrays.time_dependent == False
+    assert np.allclose(from_arrays.apply(positions, chunk_size=7), transform.apply(positions, times=times))
+
+
+def test_transform_trajectory():
+    times = np.linspace(0.0, 4.0, 300)
+    positions, velocities = _rotating_states(times)
+    transform = rotating_to_inertial(omega=1.0, origin=ORIGIN)
+    traj = transform_trajectory(transform, Trajectory(positions, velocities=velocities, times=times))
+    r, v = transform.apply(positions, times=times, velocities=velocities)
+    assert np.allclose(traj.positions, r) and np.allclose(traj.velocities, v)
+    # stacked coordinates, with a time-independent translation
+    shifted = transform_trajectory(FrameTransform(translations=np.tile([1.0, 2.0, 3.0], (300, 1))), *positions.T)
+    assert np.allclose(shifted.positions, positions + [1.0, 2.0, 3.0])
@@ -0,0 +1,19 @@
+"""
+Tests of parallel grid rendering
+"""
+
+import numpy as np
+
+from trajplotlib.grid import render_grid
+
+
+def test_parallel_grid_matches_serial():
+    rng = np.random.default_rng(0)
+    trajs = [np.cumsum(rng.random((200, 3)) - 0.5, axis=0) for _ in range(5)]
+    for dim in (2, 3):
+        serial = render_grid(trajs, dim=dim, ncols=3, panel_size=1.0, dpi=50, shared_limits=True, n_workers=1)
+        parallel = render_grid(trajs, dim=dim, ncols=3, panel_size=1.0, dpi=50, shared_limits=True, n_workers=2)
+        assert serial.shape == (100, 150, 4)
+        assert np.array_equal(serial, parallel)
+        # empty tile of the last row stays white
+        assert np.all(serial[50:, 100:] == 255)
@@ -0,0 +1,74 @@
+"""
+Tests that importing trajplotlib stays lightweight
+"""
+
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must not be loaded by importing trajplotlib, or by using its numpy-only helpers
+HEAVY_MODULES = [
+    "scipy", "PIL", "matplotlib", "matplotlib.pyplot", "matplotlib.animation", "mpl_toolkits.mplot3d",
+    "trajplotlib.animator", "trajplotlib.cli", "trajplotlib.events", "trajplotlib.grid", "trajplotlib.live",
+    "trajplotlib.occlusion", "trajplotlib.pyramid", "trajplotlib.scene", "trajplotlib.webexport",
+]
+
+
+def _read_import_budget():
+    """Read `IMPORT_BUDGET` from benchmarks/run_benchmarks.py without importing it (it imports pyplot)"""
+    with open(os.path.join(ROOT, "benchmarks", "run_benchmarks.py")) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and [t.id for t in node.targets if isinstance(t, ast.Name)] == ["IMPORT_BUDGET"]:
+            return ast.literal_eval(node.value)
+    raise LookupError("IMPORT_BUDGET not found in benchmarks/run_benchmarks.py")
+
+
+IMPORT_BUDGET = _read_import_budget()
+# fresh interpreters to try before failing; the best time counts, as for `run_benchmarks.py check-import`
+IMPORT_RETRIES = 5
+
+_SCRIPT = """
+import json, sys
+import trajplotlib
+loaded = [sorted(sys.modules)]
+trajplotlib.get_ellipsoid_coordinates(1.0, 2.0, 3.0)
+loaded.append(sorted(sys.modules))
+print(json.dumps(loaded))
+"""
+
+_TIMING_SCRIPT = """
+import time
+import numpy
+tstart = time.perf_counter()
+import trajplotlib
+trajplotlib.get_ellipsoid_coordinates
+print(time.perf_counter() - tstart)
+"""
+
+
+def _env():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get("PYTHONPATH", "")]))
+    env.pop("MPLBACKEND", None)
+    return env
+
+
+def test_import_does_not_load_heavy_modules():
+    result = subprocess.run([sys.executable, "-c", _SCRIPT], env=_env(), check=True, capture_output=True, text=True)
+    after_import, after_helper = json.loads(result.stdout)
+    assert [name for name in after_import if name.startswith("trajplotlib.")] == []
+    assert [name for name in HEAVY_MODULES if name in after_helper] == []
+
+
+def test_import_time_within_budget():
+    times = []
+    for _ in range(IMPORT_RETRIES):
+        result = subprocess.run([sys.executable, "-c", _TIMING_SCRIPT], env=_env(), check=True, capture_output=True, text=True)
+        times.append(float(result.stdout))
+        if times[-1] <= IMPORT_BUDGET:
+            break
+    assert min(times) <= IMPORT_BUDGET, f"import trajplotlib took {min(times)*1e3:.1f} ms, budget is {IMPORT_BUDGET*1e3:.1f} ms"
@@ -0,0 +1,82 @@
+"""
+Tests of trajectory loading with binary cache
+"""
+
+import os
+
+import numpy as np
+
+from trajplotlib.io import convert_csv, get_cache_path, get_positions, is_cache_valid, load_trajectory
+
+
+def _write_csv(path, states):
+    np.savetxt(path, states, delimiter=",")
+
+
+def _states(n, offset=0.0):
+    t = np.linspace(0.0, 10.0, n)
+    return np.column_stack([t, np.cos(t), np.sin(t), t + offset, -np.sin(t), np.cos(t), np.ones(n)])
+
+
+def test_csv_round_trip_through_cache(tmp_path):
+    path = str(tmp_path / "orbit.csv")
+    states = _states(101)
+    _write_csv(path, states)
+    data = load_trajectory(path)
+    assert os.path.exists(path + ".npy") and get_cache_path(path) == path + ".npy"
+    assert data.dtype.names == ("t", "x", "y", "z", "vx", "vy", "vz")
+    assert np.allclose(data.view(float).reshape(len(states), -1), states)
+    # the cache is a plain .npy file, loaded directly as well
+    assert np.array_equal(load_trajectory(path + ".npy"), data)
+    assert np.allclose(get_positions(data), states[:, 1:4])
+
+
+def test_chunked_conversion(tmp_path):
+    path = str(tmp_path / "orbit.csv")
+    states = _states(1003)[:, 1:]
+    _write_csv(path, states)
+    cache = convert_csv(path, chunk_rows=100)
+    data = np.load(cache)
+    assert data.dtype.names == ("x", "y", "z", "vx", "vy", "vz")
+    assert np.allclose(data.view(float).reshape(len(states), -1), states)
+
+
+def test_cache_invalidated_when_source_changes(tmp_path):
+    path = str(tmp_path / "orbit.csv")
+    _write_csv(path, _states(50))
+    load_trajectory(path)
+    assert is_cache_valid(path)
+
+    # rewrite source, and age the cache so that the source is newer
+    _write_csv(path, _states(50, offset=5.0))
+    mtime = os.path.getmtime(path)
+    os.utime(get_cache_path(path), (mtime - 10, mtime - 10))
+    assert is_cache_valid(path) == False
+    assert np.allclose(load_trajectory(path, columns="z"), np.linspace(0.0, 10.0, 50) + 5.0)
+    assert is_cache_valid(path)
+
+
+def test_valid_cache_is_reused(tmp_path):
+    path = str(tmp_path / "orbit.csv")
+    _write_csv(path, _states(50))
+    load_trajectory(path)
+    # overwrite source while keeping it older than the cache: stale values are served until refresh
+    mtime = os.path.getmtime(get_cache_path(path))
+    _write_csv(path, _states(50, offset=5.0))
+    os.utime(path, (mtime - 10, mtime - 10))
+    assert np.allclose(load_trajectory(path, columns="z"), np.linspace(0.0, 10.0, 50))
+    assert np.allclose(load_trajectory(path, columns="z", refresh=True), np.linspace(0.0, 10.0, 50) + 5.0)
+
+
+def test_window_and_columns(tmp_path):
+    path = str(tmp_path / "orbit.csv")
+    states = _states(101)
+    _write_csv(path, states)
+    data = load_trajectory(path, columns=["x", "y"], window=(2.0, 3.0))
+    in_window = (states[:, 0] >= 2.0) & (states[:, 0] <= 3.0)
+    assert data.dtype.names == ("x", "y")
+    assert np.allclose(data["x"], states[in_window, 1]) and np.allclose(data["y"], states[in_window, 2])
+    # without a time column, the window is in rows
+    path_rows = str(tmp_path / "rows.csv")
+    _write_csv(path_rows, states[:, 1:])
+    assert np.allclose(load_trajectory(path_rows, columns="x", window=(10, 20)), states[10:20, 1])
@@ -0,0 +1,26 @@
+"""
+Tests of live trajectory plots
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from trajplotlib.live import LiveTrajectoryPlot
+
+
+def test_ring_buffer_does_not_alias_line_data():
+    for dim in (2, 3):
+        live = LiveTrajectoryPlot(dim=dim, capacity=8, max_fps=1e-6)
+        points = np.arange(12*dim, dtype=float).reshape(12, dim)
+        live.extend(points[:6])
+        drawn = np.array(live.line.get_data_3d() if dim == 3 else live.line.get_data()).T.copy()
+        assert np.array_equal(drawn, points[:6])
+        # wraps around the ring buffer without a redraw
+        live.extend(points[6:])
+        assert live.n_draws == 1
+        current = np.array(live.line.get_data_3d() if dim == 3 else live.line.get_data()).T
+        assert np.array_equal(current, drawn)
+        live.redraw()
+        current = np.array(live.line.get_data_3d() if dim == 3 else live.line.get_data()).T
+        assert np.array_equal(current, points[4:])
+        plt.close(live.fig)
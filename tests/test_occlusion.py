@@ -0,0 +1,71 @@
+"""
+Tests of occlusion of 3D trajectories by the central body
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from trajplotlib.helper3d import quickplot3
+from trajplotlib.occlusion import EllipsoidOcclusion, OccludedLine3D, _get_eye
+
+
+def _axis(elev, azim, proj_type):
+    fig = plt.figure()
+    ax = fig.add_subplot(projection="3d")
+    ax.set_xlim(-2, 2)
+    ax.set_ylim(-1, 3)
+    ax.set_zlim(0, 4)
+    ax.view_init(elev, azim)
+    ax.set_proj_type(proj_type)
+    return ax
+
+
+def test_eye_from_view_angles():
+    ax = _axis(0, 0, "ortho")
+    eye, orthographic = _get_eye(ax)
+    assert orthographic is True
+    assert np.allclose(eye, [1.0, 0.0, 0.0])
+
+    ax = _axis(90, 0, "persp")
+    eye, orthographic = _get_eye(ax)
+    assert orthographic is False
+    # above the center of the view, beyond the limits
+    assert np.allclose(eye[:2], [0.0, 1.0]) and eye[2] > 4.0
+    plt.close("all")
+
+
+def test_chord_behind_body_is_split():
+    # both end points are visible from +x, but the chord passes behind the unit sphere
+    points = np.array([[-3.0, -3.0, 0.0], [-3.0, -2.0, 0.0], [-3.0, 2.0, 0.0], [-3.0, 3.0, 0.0]])
+    occlusion = EllipsoidOcclusion(points, 1.0)
+    eye = np.array([1.0, 0.0, 0.0])
+    hidden = occlusion.get_hidden(eye, orthographic=True)
+    assert not np.any(hidden)
+    idx, inserted = occlusion.get_crossings(hidden, eye, orthographic=True)
+    assert np.array_equal(idx, [1])
+    assert np.allclose(inserted, [[-3.0, 0.0, 0.0]])
+    visible, occluded = occlusion.split(hidden, (idx, inserted))
+    assert len(visible) == 5
+    # chord is only drawn by the hidden line
+    assert np.all(np.isnan(visible[2])) and not np.any(np.isnan(occluded[1:4]))
+    assert not np.any(np.isnan(visible[[0, 1, 3, 4]]))
+
+
+def test_quickplot3_ellipsoid():
+    t = np.linspace(0.0, 2*np.pi, 200)
+    fig, ax = quickplot3(3*np.cos(t), 3*np.sin(t), 0.0*t, radii=[2.0, 1.0, 0.5], occlude=True)
+    lines = [line for line in ax.lines if isinstance(line, OccludedLine3D)]
+    assert len(lines) == 2
+    assert np.allclose(lines[0].occlusion.radii, [2.0, 1.0, 0.5])
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def test_quickplot3_many_sphere():
+    from trajplotlib.helper3d import quickplot3_many
+
+    t = np.linspace(0.0, 2*np.pi, 50)
+    trajs = np.stack([np.stack([r*np.cos(t), r*np.sin(t), 0.0*t], axis=1) for r in (2.0, 3.0)])
+    fig, ax = quickplot3_many(trajs, radius=1.0)
+    assert len(ax.collections) >= 2
+    plt.close(fig)
@@ -0,0 +1,86 @@
+"""
+Tests of opt-in profiling instrumentation
+"""
+
+import numpy as np
+import pytest
+
+from trajplotlib import profiling
+from trajplotlib.profiling import instrument, phase
+
+
+@instrument
+def _outer(points, n_inner):
+    with phase("prepare", n_points=len(points)):
+        for _ in range(n_inner):
+            _inner(points)
+    return len(points)
+
+
+@instrument(name="inner")
+def _inner(points):
+    with phase("work"):
+        return points.sum()
+
+
+@pytest.fixture(autouse=True)
+def _disabled():
+    profiling.disable()
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def test_disabled_path_records_nothing():
+    calls = []
+    assert profiling.is_enabled() == False
+    assert _outer(np.zeros((10, 3)), 3) == 10
+    # phases are a shared no-op while disabled
+    assert phase("draw") is phase("other")
+    assert profiling.get_stats() == {}
+    # callbacks registered before disabling are dropped
+    profiling.enable(callback=lambda *args: calls.append(args))
+    profiling.disable()
+    _outer(np.zeros((10, 3)), 3)
+    assert profiling.get_stats() == {} and calls == []
+
+
+def test_nested_phases_accumulate():
+    points = np.ones((100, 3))
+    with profiling.profile() as stats:
+        _outer(points, 4)
+        _outer(points[:20], 2)
+    assert sorted(stats) == ["_outer", "_outer/prepare", "_outer/prepare/inner", "_outer/prepare/inner/work"]
+    assert stats["_outer"].calls == 2 and stats["_outer"].n_points == 120
+    assert stats["_outer/prepare"].n_points == 120
+    assert stats["_outer/prepare/inner"].calls == 6 and stats["_outer/prepare/inner"].n_points == 4*100 + 2*20
+    assert stats["_outer/prepare/inner/work"].calls == 6 and stats["_outer/prepare/inner/work"].n_points == 0
+    # enclosing phases take at least as long as the phases they contain
+    assert stats["_outer"].time >= stats["_outer/prepare"].time >= stats["_outer/prepare/inner"].time > 0
+    assert profiling.is_enabled() == False
+    report = profiling.report(stats)
+    assert len(report.splitlines()) == 5 and "_outer/prepare/inner/work" in report
+
+
+def test_callback_is_invoked():
+    calls = []
+    with profiling.profile(callback=lambda *args: calls.append(args)) as stats:
+        _inner(np.ones((7, 3)))
+    # inner phases end first
+    assert [(name, n_points) for name, _, n_points in calls] == [("inner/work", 0), ("inner", 7)]
+    assert all(elapsed >= 0 for _, elapsed, _ in calls)
+    assert stats["inner"].calls == 1
+    # the callback is removed on exit
+    profiling.enable()
+    _inner(np.ones((7, 3)))
+    assert len(calls) == 2
+
+
+def test_count_points():
+    from trajplotlib.trajectory import Trajectory
+    assert profiling.count_points(np.zeros(5)) == 5
+    assert profiling.count_points(np.zeros((4, 6, 3))) == 24
+    assert profiling.count_points(Trajectory(np.zeros((8, 3)))) == 8
+    assert profiling.count_points([np.zeros(3), np.zeros(4)]) == 7
+    assert profiling.count_points(None) == 0
@@ -0,0 +1,67 @@
+"""
+Tests of view-dependent trajectory pyramids
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from trajplotlib.pyramid import TrajectoryPyramid, attach_pyramid
+
+
+def _orbit(n, dtype=float):
+    t = np.linspace(0.0, 20*np.pi, n)
+    return np.stack([np.cos(t), np.sin(t), 0.01*t], axis=1).astype(dtype)
+
+
+def test_float32_kept_without_copy():
+    points = _orbit(10_000, dtype=np.float32)
+    pyramid = TrajectoryPyramid(points)
+    assert pyramid.points.dtype == np.float32
+    assert np.shares_memory(pyramid.points, points)
+
+
+def test_levels_match_direct_reduction():
+    points = _orbit(4096 + 5)
+    pyramid = TrajectoryPyramid(points, base=8)
+    imin, imax = pyramid.levels[2]
+    for i in (0, 17, len(imin) - 1):
+        block = points[i*64:(i+1)*64]
+        assert np.array_equal(points[imin[i], np.arange(3)], block.min(axis=0))
+        assert np.array_equal(points[imax[i], np.arange(3)], block.max(axis=0))
+
+
+def test_select_respects_vertex_budget():
+    points = _orbit(200_000)
+    pyramid = TrajectoryPyramid(points)
+    lower, upper = points.min(axis=0), points.max(axis=0)
+    pixel_size = (upper - lower) / 1e5
+    idx_full, _ = pyramid.select(lower, upper, pixel_size)
+    idx, run = pyramid.select(lower, upper, pixel_size, max_vertices=2000)
+    assert len(idx) < len(idx_full)
+    # budget counts kept bin samples, only samples around visible runs are added
+    assert len(idx) <= 2000 + 2*len(np.unique(run))
+
+
+def test_recompute_once_per_draw():
+    fig = plt.figure(figsize=(4, 4), dpi=50)
+    ax = fig.add_subplot(projection="3d")
+    points = _orbit(50_000)
+    line = ax.plot(points[0:1, 0], points[0:1, 1], points[0:1, 2])[0]
+    pyramid = attach_pyramid(ax, line, points)
+    calls = []
+    get_coordinates = pyramid.get_coordinates
+    pyramid.get_coordinates = lambda *args, **kwargs: calls.append(1) or get_coordinates(*args, **kwargs)
+
+    fig.canvas.draw()
+    assert len(calls) == 1
+    n_full = len(line.get_data_3d()[0])
+    assert n_full <= 2*ax.bbox.width + 64
+    ax.set_xlim(0.9, 1.0)
+    ax.set_ylim(-0.1, 0.1)
+    ax.set_zlim(0.0, 0.6)
+    assert len(calls) == 1
+    fig.canvas.draw()
+    assert len(calls) == 2
+    fig.canvas.draw()
+    assert len(calls) == 2
+    plt.close(fig)
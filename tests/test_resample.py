@@ -0,0 +1,82 @@
+"""
+Tests of batched trajectory resampling
+"""
+
+import numpy as np
+import pytest
+
+from trajplotlib.resample import monotonic_mask, resample_trajectories
+
+
+def _cubic(t):
+    """Cubic polynomial curve and its derivative, reproduced exactly by cubic and hermite interpolation"""
+    positions = np.stack([t**3 - 2*t, 0.5*t**2 + 1, -t**3 + t**2 - 3*t], axis=-1)
+    velocities = np.stack([3*t**2 - 2, t, -3*t**2 + 2*t - 3], axis=-1)
+    return positions, velocities
+
+
+def test_monotonic_mask():
+    times = np.array([0.0, 1.0, 1.0, 0.5, 2.0, 1.5, 3.0])
+    assert monotonic_mask(times).tolist() == [True, True, False, False, True, False, True]
+    assert monotonic_mask(np.array([0.0])).tolist() == [True]
+
+
+def test_linear_is_exact_on_lines():
+    times = np.sort(np.random.default_rng(0).uniform(0.0, 5.0, 40))
+    positions = np.outer(times, [1.0, -2.0, 0.5]) + [3.0, 0.0, 1.0]
+    t_interp, positions_interp = resample_trajectories(times, positions, nt=101, method="linear")
+    assert np.allclose(t_interp, np.linspace(times[0], times[-1], 101))
+    assert np.allclose(positions_interp, np.outer(t_interp, [1.0, -2.0, 0.5]) + [3.0, 0.0, 1.0])
+
+
+@pytest.mark.parametrize("method", ["cubic", "hermite"])
+def test_cubic_methods_are_exact_on_cubics(method):
+    times = np.sort(np.random.default_rng(1).uniform(-2.0, 2.0, 30))
+    positions, velocities = _cubic(times)
+    t_interp, positions_interp = resample_trajectories(times, positions, nt=77, method=method, velocities=velocities)
+    assert np.allclose(positions_interp, _cubic(t_interp)[0], atol=1e-9)
+
+
+def test_linear_error_on_circle():
+    # linear interpolation of a circle errs by at most the sagitta of each chord
+    times = np.linspace(0.0, 2*np.pi, 64)
+    positions = np.stack([np.cos(times), np.sin(times), np.zeros_like(times)], axis=1)
+    t_interp, positions_interp = resample_trajectories(times, positions, nt=500, method="linear")
+    radius = np.linalg.norm(positions_interp, axis=1)
+    sagitta = 1 - np.cos(0.5*(times[1] - times[0]))
+    assert np.all(radius <= 1 + 1e-12) and np.all(radius >= 1 - sagitta - 1e-12)
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic", "hermite"])
+def test_non_monotonic_samples_are_dropped(method):
+    times = np.linspace(0.0, 2.0, 25)
+    positions, velocities = _cubic(times)
+    # inject samples going back in time, and a repeated time-stamp, with garbage states
+    times_bad = np.insert(times, [5, 12, 12], [0.1, times[11], 0.3])
+    positions_bad = np.insert(positions, [5, 12, 12], 1e3, axis=0)
+    velocities_bad = np.insert(velocities, [5, 12, 12], -1e3, axis=0)
+    assert monotonic_mask(times_bad).sum() == len(times)
+
+    expected = resample_trajectories(times, positions, nt=60, method=method, velocities=velocities)
+    result = resample_trajectories(times_bad, positions_bad, nt=60, method=method, velocities=velocities_bad)
+    assert np.allclose(result[0], expected[0]) and np.allclose(result[1], expected[1])
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic", "hermite"])
+def test_batched_matches_single(method):
+    times = np.linspace(0.0, 1.0, 30)
+    positions, velocities = _cubic(times)
+    stacked = np.stack([positions, 2*positions, positions - 1])
+    stacked_velocities = np.stack([velocities, 2*velocities, velocities])
+    t_interp = np.linspace(0.1, 0.9, 45)
+    _, batched = resample_trajectories(times, stacked, method=method, velocities=stacked_velocities, t_interp=t_interp)
+    assert batched.shape == (3, 45, 3)
+    for positions_k, velocities_k, result in zip(stacked, stacked_velocities, batched):
+        _, single = resample_trajectories(times, positions_k, method=method, velocities=velocities_k, t_interp=t_interp)
+        assert np.allclose(result, single)
+
+
+def test_invalid_method():
+    times = np.linspace(0.0, 1.0, 10)
+    with pytest.raises(ValueError):
+        resample_trajectories(times, np.zeros((10, 3)), method="quintic")
@@ -0,0 +1,23 @@
+"""
+Tests of cached scene templates
+"""
+
+import numpy as np
+
+from trajplotlib.helper3d import quickplot3
+from trajplotlib.scene import get_scene_template
+
+
+def test_quickplot3_renders_on_scene(tmp_path):
+    limits = ((-2.0, 2.0), (-2.0, 2.0), (-1.0, 1.0))
+    scene = get_scene_template(limits, radius=0.5, n_figsize=2, dpi=50)
+    assert get_scene_template(limits, radius=0.5, n_figsize=2, dpi=50) is scene
+    t = np.linspace(0.0, 2*np.pi, 500)
+    images = []
+    for r in (1.0, 1.5):
+        fig, ax = quickplot3(r*np.cos(t), r*np.sin(t), 0.1*t, scene=scene, c_traj="tab:red")
+        assert fig is scene.fig and ax is scene.ax
+        images.append(np.asarray(fig.canvas.buffer_rgba()).copy())
+    assert not np.array_equal(images[0], images[1])
+    assert np.array_equal(images[1], scene.render(1.5*np.cos(t), 1.5*np.sin(t), 0.1*t, c_traj="tab:red"))
+    fig.savefig(tmp_path / "scene.png")
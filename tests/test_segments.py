@@ -0,0 +1,53 @@
+"""
+Tests of colour-mapped line segments
+"""
+
+import numpy as np
+import pytest
+
+from trajplotlib.linecolor import get_lc_traj_singleColor, get_lc_traj_singleColor_3d, get_segments
+from trajplotlib.trajectory import Trajectory
+
+
+def test_segments_are_read_only_view():
+    points = np.random.default_rng(0).normal(size=(50, 3))
+    segments = get_segments(points)
+    assert segments.shape == (49, 2, 3)
+    assert np.shares_memory(segments, points)
+    assert np.array_equal(segments[:, 0], points[:-1]) and np.array_equal(segments[:, 1], points[1:])
+    with pytest.raises(ValueError):
+        segments[0, 0, 0] = 1.0
+
+
+def test_segments_of_non_contiguous_input():
+    positions = np.random.default_rng(1).normal(size=(60, 6))
+    for points in (positions[::3, :2], positions[:, 1:4], positions[::-2, ::2]):
+        assert not points.flags.c_contiguous
+        segments = get_segments(points)
+        expected = np.stack([points[:-1], points[1:]], axis=1)
+        assert np.array_equal(segments, expected)
+        assert np.shares_memory(segments, positions)
+
+
+def test_2d_collection_uses_trajectory_positions():
+    t = np.linspace(0.0, 2*np.pi, 100)
+    traj = Trajectory.from_coordinates(np.cos(t), np.sin(t), t)
+    lc = get_lc_traj_singleColor(traj, cs=t)
+    segments = lc.get_segments()
+    assert len(segments) == 99
+    assert np.allclose(segments[10], traj.positions[10:12, :2])
+
+
+@pytest.mark.parametrize("from_trajectory", [False, True])
+def test_3d_collection_keeps_float32(from_trajectory):
+    t = np.linspace(0.0, 2*np.pi, 100)
+    xs, ys, zs = np.cos(t), np.sin(t), t
+    if from_trajectory:
+        lc = get_lc_traj_singleColor_3d(Trajectory.from_coordinates(xs, ys, zs, float32=True), cs=t)
+    else:
+        lc = get_lc_traj_singleColor_3d(xs, ys, zs, cs=t, float32=True)
+    segments = lc._segments3d
+    assert segments.dtype == np.float32 and segments.shape == (99, 2, 3)
+    reference = get_segments(np.column_stack([xs, ys, zs]))
+    assert np.allclose(segments, reference, atol=1e-6)
+    assert np.array_equal(lc.get_array(), t[:99])
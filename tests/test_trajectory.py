@@ -0,0 +1,60 @@
+"""
+Tests of the Trajectory container
+"""
+
+import numpy as np
+
+from trajplotlib.trajectory import Trajectory, unpack_coordinates
+
+
+def _helix(n):
+    t = np.linspace(0.0, 4*np.pi, n)
+    positions = np.stack([np.cos(t), np.sin(t), 0.5*t], axis=1)
+    velocities = np.stack([-np.sin(t), np.cos(t), np.full(n, 0.5)], axis=1)
+    return t, positions, velocities
+
+
+def test_from_coordinates_and_views():
+    t, positions, _ = _helix(100)
+    traj = Trajectory.from_coordinates(*positions.T, times=t)
+    assert traj.positions.flags.c_contiguous and len(traj) == 100
+    assert np.array_equal(traj.positions, positions)
+    assert np.shares_memory(traj.xs, traj.positions) and np.array_equal(traj.zs, positions[:, 2])
+    xs, ys, zs, unpacked = unpack_coordinates(traj)
+    assert unpacked is traj and np.shares_memory(ys, traj.positions)
+    assert unpack_coordinates(positions[:, 0], positions[:, 1])[2:] == (None, None)
+
+
+def test_dtype():
+    _, positions, velocities = _helix(10)
+    assert Trajectory(positions).positions.dtype == np.float64
+    assert Trajectory(positions.astype(np.float32)).positions.dtype == np.float32
+    assert Trajectory(positions.astype(int)).positions.dtype == np.float64
+    traj = Trajectory(positions, velocities=velocities, float32=True)
+    assert traj.positions.dtype == traj.velocities.dtype == np.float32
+    # contiguous input of matching dtype is used without copying
+    assert Trajectory(positions).positions is positions
+
+
+def test_speed_from_velocities_and_times():
+    t, positions, velocities = _helix(2001)
+    expected = np.sqrt(1.25)
+    assert np.allclose(Trajectory(positions, velocities=velocities).speed, expected)
+    # finite differences are second-order accurate in the interior
+    speed = Trajectory(positions, times=t).speed
+    assert np.allclose(speed[1:-1], expected, atol=1e-5)
+
+
+def test_bounds_ignore_nan():
+    _, positions, _ = _helix(200)
+    positions[50] = np.nan
+    traj = Trajectory(positions)
+    assert np.allclose(traj.bounds, [np.nanmin(positions, axis=0), np.nanmax(positions, axis=0)])
+    assert traj.bounds is traj.bounds
+
+
+def test_arc_length():
+    _, positions, _ = _helix(5001)
+    arc_length = Trajectory(positions).arc_length
+    assert arc_length[0] == 0.0 and np.all(np.diff(arc_length) > 0)
+    assert np.isclose(arc_length[-1], 4*np.pi*np.sqrt(1.25), rtol=1e-6)
@@ -0,0 +1,36 @@
+"""
+Tests of binary bundles and the offline HTML viewer
+"""
+
+import numpy as np
+
+from trajplotlib.webexport import export_bundle, export_viewer, load_bundle
+
+
+def _bundle(tmp_path, title):
+    t = np.linspace(0.0, 10.0, 100)
+    positions = np.stack([np.cos(t), np.sin(t), 0.1*t], axis=1)
+    path = str(tmp_path / "traj.tplb")
+    export_bundle(path, positions, times=t, title=title)
+    return path, positions
+
+
+def test_bundle_roundtrip(tmp_path):
+    path, positions = _bundle(tmp_path, "orbit")
+    bundle = load_bundle(path)
+    assert bundle["meta"]["title"] == "orbit"
+    assert np.allclose(bundle["positions"].reshape(-1, 3), positions, atol=1e-5)
+
+
+def test_viewer_title_from_bundle_is_escaped(tmp_path):
+    path, _ = _bundle(tmp_path, "<b>A & B</b>")
+    for embed in (True, False):
+        html_path = str(tmp_path / f"viewer_{embed}.html")
+        export_viewer(html_path, path, embed=embed)
+        with open(html_path, encoding="utf-8") as f:
+            page = f.read()
+        assert "<title>&lt;b&gt;A &amp; B&lt;/b&gt;</title>" in page
+
+    export_viewer(html_path, path, title="</title><script>")
+    with open(html_path, encoding="utf-8") as f:
+        assert "<title>&lt;/title&gt;&lt;script&gt;</title>" in f.read()
@@ -1,16 +1,83 @@
 """
 trajplotlib init file
+
+Public functions and classes are loaded lazily on first access (PEP 562), so that
+`import trajplotlib` does not pull in matplotlib.pyplot or scipy.
 """
 
+import importlib
+
+
+# public attribute -> submodule defining it
+_LAZY_ATTRIBUTES = {
+	"quickplot2": "helper2d",
+	"quickplot2_many": "helper2d",
+	"quickplot2_density": "helper2d",
+	"quickplot3": "helper3d",
+	"quickplot3_many": "helper3d",
+	"set_equal_axis": "helper3d",
+	"get_sphere_coordinates": "helper3d",
+	"plot_sphere_wireframe": "helper3d",
+	"plot_ellipsoid_wireframe": "helper3d",
+	"get_ellipsoid_coordinates": "helper3d",
+	"animate_trajectory_3d": "helper3d",
+	"get_lc_traj_singleColor": "linecolor",
+	"get_lc_traj_singleColor_3d": "linecolor",
+	"get_segments": "linecolor",
+	"cycle_color": "linecolor",
+	"TrajectoryAnimator": "animator",
+	"AxesBounds": "bounds",
+	"get_axes_bounds": "bounds",
+	"accumulate_density": "density",
+	"project_trajectories": "density",
+	"decimate_minmax": "decimate",
+	"decimate_rdp": "decimate",
+	"decimate_trajectory": "decimate",
+	"find_events": "events",
+	"plot_events": "events",
+	"export_trajectory_animation": "export",
+	"FrameTransform": "frames",
+	"rotating_to_inertial": "frames",
+	"inertial_to_rotating": "frames",
+	"render_grid": "grid",
+	"LiveTrajectoryPlot": "live",
+	"load_trajectory": "io",
+	"convert_csv": "io",
+	"get_positions": "io",
+	"EllipsoidOcclusion": "occlusion",
+	"plot_occluded": "occlusion",
+	"TrajectoryPyramid": "pyramid",
+	"attach_pyramid": "pyramid",
+	"monotonic_mask": "resample",
+	"resample_trajectories": "resample",
+	"SceneTemplate": "scene",
+	"Trajectory": "trajectory",
+	"get_scene_template": "scene",
+	"export_bundle": "webexport",
+	"export_viewer": "webexport",
+	"load_bundle": "webexport",
+}
+
+# submodules accessible as attributes, e.g. `trajplotlib.helper3d`
+_SUBMODULES = {
+	"animator", "bounds", "cli", "decimate", "density", "events", "export", "frames", "grid", "helper2d", "helper3d",
+	"io", "linecolor", "live", "occlusion", "profiling", "pyramid", "resample", "scene", "trajectory", "webexport",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+	if name in _LAZY_ATTRIBUTES:
+		value = getattr(importlib.import_module("." + _LAZY_ATTRIBUTES[name], __name__), name)
+	elif name in _SUBMODULES:
+		value = importlib.import_module("." + name, __name__)
+	else:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	# cache so that later accesses bypass __getattr__
+	globals()[name] = value
+	return value
+
 
-from .helper2d import quickplot2
-from .helper3d import (
-	quickplot3, 
-	set_equal_axis, 
-	get_sphere_coordinates, 
-	plot_sphere_wireframe, 
-	plot_ellipsoid_wireframe, 
-	get_ellipsoid_coordinates,
-	animate_trajectory_3d
-)
-from .linecolor import get_lc_traj_singleColor, cycle_color
+def __dir__():
+	return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _SUBMODULES)
@@ -0,0 +1,42 @@
+"""
+Headless figure reused by rendering processes for all of their plots
+"""
+
+
+class WorkerFigure:
+    """Agg figure reused by a rendering process, with a single axis that is cleared between plots
+    and re-created only if the plot dimension changes
+
+    Args:
+        figsize (float): size of the square figure in inches
+        dpi (int): resolution of the figure; if None, matplotlib's default
+    """
+    def __init__(self, figsize, dpi=None):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        import mpl_toolkits.mplot3d  # noqa: F401 (registers 3d projection)
+
+        self.fig = Figure(figsize=(figsize, figsize), dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = None
+        self.dim = None
+
+    def get_axes(self, dim):
+        """Get cleared axis of the figure, with reset equal-axis bounds
+
+        Args:
+            dim (int): 2 for a 2D axis, or 3 for a 3D axis
+
+        Returns:
+            (Axes3DSubplot): matplotlib axis, 3D if `dim` is 3
+        """
+        from .bounds import get_axes_bounds
+
+        if self.ax is None or self.dim != dim:
+            self.fig.clf()
+            self.ax = self.fig.add_subplot(projection="3d") if dim == 3 else self.fig.add_subplot()
+            self.dim = dim
+        else:
+            self.ax.cla()
+        get_axes_bounds(self.ax, dim=dim).reset()
+        return self.ax
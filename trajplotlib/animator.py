@@ -0,0 +1,341 @@
+"""
+Blitted animator for one or multiple 3D trajectories
+"""
+
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+import matplotlib.animation as animation
+from matplotlib.artist import Artist
+
+from .linecolor import get_segments
+
+
+def get_trail_colors(color, trail_length, alpha_min=0.0):
+    """Get RGBA colors of a fading trail, from `alpha_min` at its oldest segment to opaque at its newest
+
+    Args:
+        color (str): color of trail
+        trail_length (int): number of segments of trail
+        alpha_min (float): alpha of oldest segment
+
+    Returns:
+        (ndarray): colors of shape (trail_length,4)
+    """
+    from matplotlib.colors import to_rgba
+
+    colors = np.tile(to_rgba(color), (trail_length, 1))
+    colors[:, 3] *= np.linspace(alpha_min, 1.0, trail_length+1)[1:]
+    return colors
+
+
+def plot_trail(ax, position, trail_length, lw=0.5, color="navy", marker="o", ms=3.0):
+    """Add fading trail and moving marker artists of one trajectory to a 3D axis
+
+    Args:
+        ax (Axes3DSubplot): matplotlib 3D axis
+        position (ndarray): first position of trajectory, of shape (3,)
+        trail_length (int): number of segments of trail
+        lw (float): linewidth of trail
+        color (str): color of trail and marker
+        marker (str): marker at current position; if None, no marker is drawn
+        ms (float): size of marker
+
+    Returns:
+        (tuple): `Line3DCollection` of trail, and `Line3D` of marker (or None)
+    """
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+    trail = Line3DCollection([np.tile(position, (2, 1))], linewidths=lw, colors=color)
+    ax.add_collection3d(trail, autolim=False)
+    if marker is None:
+        return trail, None
+    head = ax.plot(position[0:1], position[1:2], position[2:3], linestyle="none", marker=marker, ms=ms, c=color)[0]
+    return trail, head
+
+
+def update_trail(trail, head, segments, colors, num):
+    """Show the `len(colors)` segments leading to frame `num`; cost is independent of `num`
+
+    Args:
+        trail (Line3DCollection): trail artist
+        head (Line3D): marker artist, or None
+        segments (ndarray): segment view of shape (nt-1,2,3) from `get_segments`
+        colors (ndarray): trail colors of shape (trail_length,4) from `get_trail_colors`
+        num (int): frame index
+    """
+    trail_length = len(colors)
+    # at least one (degenerate) segment is kept, since empty collections can't be projected
+    lo = max(num - trail_length, 0)
+    window = segments[lo:num] if num > 0 else segments[0:1, 0:1].repeat(2, axis=1)
+    trail.set_segments(window)
+    trail.set_color(colors[trail_length-len(window):])
+    if head is not None:
+        point = segments[num-1, 1] if num > 0 else segments[0, 0]
+        head.set_data_3d(point[0:1], point[1:2], point[2:3])
+
+
+class FrameCache:
+    """Least-recently-used cache of rendered frame bitmaps, keyed by frame index.
+    All cached frames belong to one view (view angles, axis limits, and canvas size);
+    storing or looking up a frame for a different view clears the cache.
+
+    Args:
+        maxsize (int): maximum number of cached frames; each frame takes width x height x 4 bytes
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.view = None
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, frame):
+        return frame in self._frames
+
+    def clear(self):
+        """Drop all cached frames"""
+        self._frames.clear()
+
+    def _check_view(self, view):
+        if view != self.view:
+            self._frames.clear()
+            self.view = view
+
+    def get(self, frame, view):
+        """Get cached bitmap of frame, or None if it is not cached for this view
+
+        Args:
+            frame (int): frame index
+            view (tuple): view parameters
+
+        Returns:
+            (BufferRegion): cached bitmap, or None
+        """
+        self._check_view(view)
+        region = self._frames.get(frame)
+        if region is None:
+            self.misses += 1
+            return None
+        self._frames.move_to_end(frame)
+        self.hits += 1
+        return region
+
+    def put(self, frame, view, region):
+        """Store bitmap of frame, dropping the least recently used frame if the cache is full
+
+        Args:
+            frame (int): frame index
+            view (tuple): view parameters
+            region (BufferRegion): bitmap from `canvas.copy_from_bbox`
+        """
+        self._check_view(view)
+        self._frames[frame] = region
+        self._frames.move_to_end(frame)
+        if len(self._frames) > self.maxsize:
+            self._frames.popitem(last=False)
+
+
+class _CachedFrameArtist(Artist):
+    """Animated artist drawn after the trajectories of a blitted frame, which either stores the rendered
+    frame in a `FrameCache`, or restores a cached frame in place of the trajectories.
+    It is not drawn while saving, so that saved frames are always rendered from the updated trajectories."""
+    def __init__(self, frame_cache, get_view):
+        super().__init__()
+        self.frame_cache = frame_cache
+        self.get_view = get_view
+        self.frame = None
+        self.region = None
+        self.set_animated(True)
+        self.set_zorder(np.inf)
+
+    def draw(self, renderer):
+        canvas = self.figure.canvas
+        if self.frame is None or canvas.is_saving():
+            return
+        if self.region is not None:
+            canvas.restore_region(self.region)
+        else:
+            self.frame_cache.put(self.frame, self.get_view(), canvas.copy_from_bbox(self.figure.bbox))
+
+    def get_window_extent(self, renderer=None):
+        from matplotlib.transforms import Bbox
+        return Bbox.null()
+
+
+class TrajectoryAnimator(animation.FuncAnimation):
+    """Animate multiple trajectories with a single `matplotlib.animation.FuncAnimation`.
+    All `Line3D` artists are updated in one frame callback, and only these artists are
+    redrawn on each frame (blitting), instead of redrawing the full figure once per trajectory.
+    Lines are drawn in full on every frame; occlusion by a central body (see `plot_occluded`) is not applied.
+
+    Args:
+        fig (Figure): matplotlib figure containing the lines
+        lines (list): list of `Line3D` artists, one per trajectory
+        positions (ndarray): positions of shape (K,nt,3), with K equal to the number of lines
+        interval (int): delay between frames in milliseconds
+        repeat (bool): whether to repeat the animation
+        repeat_delay (int): delay in milliseconds between repeats
+        blit (bool): whether to only redraw the updated lines
+        n_fps_window (int): number of most recent frames used by `measured_fps`
+        trail_length (int): if provided, `lines` are `Line3DCollection` trails from `plot_trail` showing
+            only the most recent `trail_length` segments with fading alpha, so that frame cost stays constant
+        markers (list): list of `Line3D` markers moved to the current position, one per trajectory, used with `trail_length`
+        times (ndarray): time-stamps of the frames, of shape (nt,), used by `seek`
+        cache_frames (int): if provided, up to `cache_frames` rendered frames are kept in a `FrameCache`, so that
+            loops and `seek` restore them instead of re-rendering the trajectories; requires `blit`, all lines on one
+            axis, and a canvas supporting `copy_from_bbox`. Trajectories are still updated on every frame, so that
+            full redraws and `save` are unaffected by the cache.
+        **kwargs: passed on to `matplotlib.animation.FuncAnimation`
+    """
+    def __init__(self, fig, lines, positions, interval=20, repeat=True, repeat_delay=0,
+                 blit=True, n_fps_window=100, trail_length=None, markers=None, times=None, cache_frames=None, **kwargs):
+        assert len(lines) == len(positions), "number of lines and trajectories must match"
+        self.fig = fig
+        self.blit = blit
+        self.lines = list(lines)
+        self.positions = np.asarray(positions)
+        self.trail_length = trail_length
+        self.markers = [None] * len(self.lines) if markers is None else list(markers)
+        self.artists = self.lines + [marker for marker in self.markers if marker is not None]
+        if trail_length is not None:
+            # segment views and fading colors are computed once, frames only slice them
+            self._segments = [get_segments(pos) for pos in self.positions]
+            self._trail_colors = [get_trail_colors(line.get_edgecolor()[0], trail_length) for line in self.lines]
+        self._frame_times = deque(maxlen=n_fps_window)
+        self.times = None if times is None else np.asarray(times)
+        self.frame_cache = None
+        self._cache_artist = None
+        axes = {artist.axes for artist in self.artists}
+        if cache_frames is not None and blit is True and len(axes) == 1 and hasattr(fig.canvas, "copy_from_bbox"):
+            self.frame_cache = FrameCache(maxsize=cache_frames)
+            self._cache_artist = _CachedFrameArtist(self.frame_cache, self._get_view)
+            axes.pop().add_artist(self._cache_artist)
+        # background of the last full draw, used by `seek`
+        self._background = None
+        fig.canvas.mpl_connect("draw_event", self._on_draw)
+        super().__init__(
+            fig, self._update_frame, frames=self.positions.shape[1], init_func=self._init_frame,
+            interval=interval, repeat=repeat, repeat_delay=repeat_delay, blit=blit, **kwargs
+        )
+
+    def _init_frame(self):
+        # NOTE: Can't pass empty arrays into 3d version of plot(), so start from first point
+        self._set_frame(0)
+        if self._cache_artist is not None:
+            self._cache_artist.frame = None
+            return self.artists + [self._cache_artist]
+        return self.artists
+
+    def _set_frame(self, num):
+        """Update artists to show frame `num`"""
+        if self.trail_length is not None:
+            for trail, head, segments, colors in zip(self.lines, self.markers, self._segments, self._trail_colors):
+                update_trail(trail, head, segments, colors, num)
+            return
+        for line, pos in zip(self.lines, self.positions):
+            # NOTE: there is no .set_data() for 3 dim data...
+            line.set_data(pos[:num+1, 0], pos[:num+1, 1])
+            line.set_3d_properties(pos[:num+1, 2])
+
+    def _update_frame(self, num, record=True):
+        """Update artists to show frame `num`, and get the artists to draw.
+        Artists are always updated, but with a frame cache, a cached frame is drawn by restoring its bitmap instead."""
+        if record is True:
+            self._frame_times.append(time.perf_counter())
+        self._set_frame(num)
+        if self._cache_artist is None:
+            return self.artists
+        self._cache_artist.frame = num
+        self._cache_artist.region = self.frame_cache.get(num, self._get_view())
+        if self._cache_artist.region is not None:
+            return [self._cache_artist]
+        return self.artists + [self._cache_artist]
+
+    def _get_view(self):
+        """Get view parameters that cached frames depend on"""
+        views = []
+        for ax in {artist.axes for artist in self.artists}:
+            views.append((ax.elev, ax.azim, getattr(ax, "roll", None), tuple(ax.get_w_lims())))
+        return tuple(views) + (self.fig.canvas.get_width_height(), self.fig.dpi)
+
+    def _on_draw(self, event):
+        # full draws skip animated artists, so that the canvas holds the background of blitted frames
+        if self.blit is True and hasattr(self.fig.canvas, "copy_from_bbox") and not self.fig.canvas.is_saving():
+            self._background = (self._get_view(), self.fig.canvas.copy_from_bbox(self.fig.bbox))
+
+    def seek(self, t):
+        """Show the frame at time `t`, restoring it from the frame cache if available.
+        The animation keeps running; call `pause()` first to scrub through a paused animation.
+
+        Args:
+            t (float): time; if `times` was not provided, frame index
+
+        Returns:
+            (int): index of the shown frame
+        """
+        nt = self.positions.shape[1]
+        if self.times is None:
+            frame = int(round(t))
+        else:
+            frame = int(np.searchsorted(self.times, t))
+            # nearest of the two neighboring frames
+            if frame > 0 and (frame == nt or t - self.times[frame-1] < self.times[frame] - t):
+                frame -= 1
+        frame = min(max(frame, 0), nt-1)
+        artists = self._update_frame(frame, record=False)
+        canvas = self.fig.canvas
+        if self.blit is not True or not hasattr(canvas, "copy_from_bbox"):
+            canvas.draw_idle()
+            return frame
+        if self._background is None or self._background[0] != self._get_view():
+            canvas.draw()
+        canvas.restore_region(self._background[1])
+        for artist in sorted(artists, key=lambda artist: artist.get_zorder()):
+            self.fig.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        return frame
+
+    @property
+    def measured_fps(self):
+        """Frames-per-second measured over the most recently drawn frames, or None if fewer than two frames were drawn"""
+        if len(self._frame_times) < 2:
+            return None
+        elapsed = self._frame_times[-1] - self._frame_times[0]
+        if elapsed <= 0.0:
+            return None
+        return (len(self._frame_times) - 1) / elapsed
+
+    def measure_fps(self, n_frames=None):
+        """Measure achievable frames-per-second by drawing frames back-to-back with blitting,
+        independently of the animation timer. Works with any canvas supporting
+        `copy_from_bbox`, including the headless Agg backend.
+
+        Args:
+            n_frames (int): number of frames to draw; if None, all frames of the animation are drawn
+
+        Returns:
+            (float): measured frames-per-second
+        """
+        nt = self.positions.shape[1]
+        if n_frames is None:
+            n_frames = nt
+        fig = self.fig
+        canvas = fig.canvas
+        for artist in self.artists:
+            artist.set_animated(True)
+        self._init_frame()
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+        tstart = time.perf_counter()
+        for i in range(n_frames):
+            canvas.restore_region(background)
+            self._set_frame(i % nt)
+            for artist in self.artists:
+                fig.draw_artist(artist)
+            canvas.blit(fig.bbox)
+        return n_frames / (time.perf_counter() - tstart)
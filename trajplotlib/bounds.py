@@ -0,0 +1,104 @@
+"""
+Incremental bounding-box tracking for equal-axis scaling
+"""
+
+import numpy as np
+
+
+class AxesBounds:
+    """Bounding box of trajectories plotted on an axis, updated incrementally.
+    Each update only reduces the newly added data, ignoring NaN's.
+
+    Args:
+        dim (int): number of dimensions, 2 or 3
+    """
+    def __init__(self, dim=3):
+        self.dim = dim
+        self.reset()
+
+    def reset(self):
+        """Clear accumulated bounds"""
+        self.mins = np.full(self.dim, np.inf)
+        self.maxs = np.full(self.dim, -np.inf)
+
+    @property
+    def is_empty(self):
+        """Whether no finite data has been added yet"""
+        return bool(np.any(self.mins > self.maxs))
+
+    @property
+    def limits(self):
+        """List of [min, max] along each axis"""
+        return [[mn, mx] for mn, mx in zip(self.mins, self.maxs)]
+
+    def update(self, points):
+        """Extend bounds with new data
+
+        Args:
+            points (ndarray or tuple): array of shape (N,dim), or tuple of `dim` coordinate arrays (e.g. (xs, ys, zs))
+
+        Returns:
+            (AxesBounds): self
+        """
+        if isinstance(points, (tuple, list)):
+            assert len(points) == self.dim, f"expected {self.dim} coordinate arrays"
+            mins = [np.fmin.reduce(np.asarray(coord, dtype=float).ravel()) for coord in points]
+            maxs = [np.fmax.reduce(np.asarray(coord, dtype=float).ravel()) for coord in points]
+        else:
+            points = np.asarray(points, dtype=float).reshape(-1, self.dim)
+            if len(points) == 0:
+                return self
+            mins = np.fmin.reduce(points, axis=0)
+            maxs = np.fmax.reduce(points, axis=0)
+        np.fmin(self.mins, mins, out=self.mins)
+        np.fmax(self.maxs, maxs, out=self.maxs)
+        return self
+
+    def apply(self, ax, scale=1.0):
+        """Set equal axis limits on `ax` from accumulated bounds with `set_equal_axis`
+
+        Args:
+            ax (Axes3DSubplot): matplotlib axis
+            scale (float): scaling factor along x,y,z
+        """
+        from .helper3d import set_equal_axis
+
+        if self.is_empty:
+            return
+        if self.dim == 3:
+            set_equal_axis(ax, *self.limits, scale=scale, dim3=True)
+        else:
+            xlims, ylims = self.limits
+            set_equal_axis(ax, xlims, ylims, ylims, scale=scale, dim3=False)
+        return
+
+
+def _get_data_limits(ax, dim):
+    """Get lower and upper corners of the data limits of artists already on axis, of shape (2,dim)"""
+    if dim == 3:
+        intervals = [ax.xy_dataLim.intervalx, ax.xy_dataLim.intervaly, ax.zz_dataLim.intervalx]
+    else:
+        intervals = [ax.dataLim.intervalx, ax.dataLim.intervaly]
+    return np.array(intervals, dtype=float).T
+
+
+def get_axes_bounds(ax, dim=3):
+    """Get bounds accumulator attached to axis, creating it on first access.
+    A new accumulator starts from the data limits of artists already on the axis, e.g. plotted
+    before the first trajectory, so that equal-axis limits do not clip them.
+
+    Args:
+        ax (Axes3DSubplot): matplotlib axis
+        dim (int): number of dimensions, 2 or 3
+
+    Returns:
+        (AxesBounds): bounds accumulator of `ax`
+    """
+    bounds = getattr(ax, "_trajplotlib_bounds", None)
+    if bounds is None or bounds.dim != dim:
+        bounds = AxesBounds(dim=dim)
+        # 3D data limits are only defined on 3D axes
+        if ax.has_data() and (dim == 2 or hasattr(ax, "zz_dataLim")):
+            bounds.update(_get_data_limits(ax, dim))
+        ax._trajplotlib_bounds = bounds
+    return bounds
@@ -0,0 +1,275 @@
+"""
+Command line interface for headless batch rendering
+
+Usage:
+    python -m trajplotlib render data/*.csv --output-dir plots --dim 3 --radius 184.0 --workers 8
+    python -m trajplotlib grid data/*.csv --output page.png --ncols 10 --shared-limits --workers 8
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+
+# per-process rendering state, populated by `_init_worker`
+_WORKER = {}
+
+
+def is_trajectory_file(path):
+    """Check whether path is a regular `.csv` or `.npy` file, and not a `.csv.npy` cache
+
+    Args:
+        path (str): path
+
+    Returns:
+        (bool): whether path is a trajectory file
+    """
+    return (path.endswith((".csv", ".npy")) and not path.endswith(".csv.npy")) and os.path.isfile(path)
+
+
+def find_trajectory_files(inputs):
+    """Get sorted list of trajectory files from directories, glob patterns, or file paths.
+    Directories are searched for `.csv` and `.npy` files; matches of glob patterns are filtered alike,
+    skipping directories, other files, and `.csv.npy` caches.
+
+    Args:
+        inputs (list): list of directories, glob patterns, or file paths
+
+    Returns:
+        (list): list of file paths
+    """
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            candidates = glob.glob(os.path.join(entry, "*.csv")) + glob.glob(os.path.join(entry, "*.npy"))
+        else:
+            candidates = glob.glob(entry)
+        files += [f for f in candidates if is_trajectory_file(f)]
+    return sorted(set(files))
+
+
+def get_output_names(files, fmt):
+    """Get unique output file names for trajectory files.
+    Files are named after their basename without extension; files sharing that name are instead
+    named after their path relative to the common directory of all files, with separators replaced
+    by "_", and a numbered suffix is appended to any name that is still taken.
+
+    Args:
+        files (list): list of trajectory files
+        fmt (str): extension of output files, e.g. "png"
+
+    Returns:
+        (list): list of file names, in the order of `files`
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in files]
+    duplicated = set(stem for stem in stems if stems.count(stem) > 1)
+    if len(duplicated) > 0:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+    names, taken = [], set()
+    for path, stem in zip(files, stems):
+        if stem in duplicated:
+            stem = os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0].replace(os.sep, "_")
+        name, i = stem, 1
+        while name in taken:
+            name = f"{stem}_{i}"
+            i += 1
+        taken.add(name)
+        names.append(name + "." + fmt)
+    return names
+
+
+def _cache_path(path, cache_dir):
+    """Get path of binary cache of a trajectory file within `cache_dir`, unique to the absolute path of the file
+
+    Args:
+        path (str): path to trajectory file
+        cache_dir (str): directory of caches
+
+    Returns:
+        (str): path to `.npy` cache
+    """
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{os.path.basename(path)}.{digest}.npy")
+
+
+def _init_worker(options):
+    """Create the figure reused by a rendering process for all of its files"""
+    from ._worker import WorkerFigure
+
+    _WORKER.clear()
+    _WORKER.update(figure=WorkerFigure(options["figsize"]), options=options)
+
+
+def _load_positions(path, cache_dir):
+    """Load (N,3) positions from CSV or `.npy` file, with the binary cache of CSV files kept in `cache_dir`"""
+    from .io import load_trajectory, get_positions
+
+    data = load_trajectory(path, cache=_cache_path(path, cache_dir))
+    if data.dtype.names is None:
+        return np.asarray(data)[:, 0:3]
+    return get_positions(data)
+
+
+def _render_file(path, out_path):
+    """Render quickplot of one trajectory file
+
+    Returns:
+        (dict): timing summary of file
+    """
+    from .helper2d import quickplot2
+    from .helper3d import quickplot3, plot_sphere_wireframe, get_circle_coordinates
+
+    options = _WORKER["options"]
+    tstart = time.perf_counter()
+    positions = _load_positions(path, options["cache_dir"])
+    t_load = time.perf_counter()
+
+    dim = options["dim"]
+    ax = _WORKER["figure"].get_axes(dim)
+    if dim == 3:
+        if options["radius"] is not None:
+            plot_sphere_wireframe(ax, options["radius"], center=options["center"], color="k", linewidth=0.5)
+        quickplot3(positions[:, 0], positions[:, 1], positions[:, 2], ax=ax, scale=options["scale"],
+                   max_points=options["max_points"])
+    else:
+        if options["radius"] is not None:
+            x_circle, y_circle = get_circle_coordinates(options["radius"], options["center"])
+            ax.plot(x_circle, y_circle, c="k", linewidth=0.5)
+        quickplot2(positions[:, 0], positions[:, 1], ax=ax, scale=options["scale"],
+                   max_points=options["max_points"])
+    t_plot = time.perf_counter()
+
+    _WORKER["figure"].fig.savefig(out_path, dpi=options["dpi"])
+    t_save = time.perf_counter()
+    return {
+        "file": path,
+        "output": out_path,
+        "n_points": len(positions),
+        "load_time": t_load - tstart,
+        "plot_time": t_plot - t_load,
+        "save_time": t_save - t_plot,
+        "total_time": t_save - tstart,
+    }
+
+
+def render_files(files, output_dir, fmt="png", n_workers=None, cache_dir=None, **options):
+    """Render quickplots of trajectory files on the Agg backend with a pool of processes.
+    Output images are named with `get_output_names`, so that files of the same name in different directories don't overwrite each other.
+
+    Args:
+        files (list): list of trajectory files
+        output_dir (str): directory of output images
+        fmt (str): output format, "png" or "svg"
+        n_workers (int): number of rendering processes; if None, set to `os.cpu_count()`; if 1, files are rendered in the calling process
+        cache_dir (str): directory of binary caches of CSV files; if None, set to ".cache" within `output_dir`, so that nothing is written next to the inputs
+        **options: rendering options `dim`, `radius`, `center`, `scale`, `figsize`, `dpi`, `max_points`
+
+    Returns:
+        (list): list of per-file timing summaries, in the order of `files`
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(output_dir, ".cache")
+    options = dict(dict(dim=3, radius=None, center=None, scale=1.0, figsize=5, dpi=100, max_points=None), **options)
+    options["cache_dir"] = cache_dir
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    jobs = [(path, os.path.join(output_dir, name)) for path, name in zip(files, get_output_names(files, fmt))]
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    if n_workers == 1:
+        _init_worker(options)
+        return [_render_file(*job) for job in jobs]
+
+    summaries = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(options,)) as pool:
+        futures = {pool.submit(_render_file, *job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            summaries[futures[future]] = future.result()
+    return summaries
+
+
+def _main_grid(args, files):
+    """Render grid of trajectory files from parsed arguments"""
+    from .grid import render_grid
+
+    cache_dir = args.cache_dir
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(args.output)), ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    tstart = time.perf_counter()
+    trajs = [_load_positions(path, cache_dir) for path in files]
+    t_load = time.perf_counter()
+    render_grid(
+        trajs, filename=args.output, ncols=args.ncols, dim=args.dim, panel_size=args.panel_size, dpi=args.dpi,
+        shared_limits=args.shared_limits, scale=args.scale, radius=args.radius, center=args.center,
+        titles=[os.path.splitext(os.path.basename(path))[0] for path in files], max_points=args.max_points,
+        n_workers=args.workers,
+    )
+    t_render = time.perf_counter()
+    print(f"Rendered {len(files)} panel(s) into {args.output}: load {t_load - tstart:.3f} s, render {t_render - t_load:.3f} s")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m trajplotlib", description="trajplotlib command line interface")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parser_render = subparsers.add_parser("render", help="render quickplots of trajectory files")
+    parser_render.add_argument("inputs", nargs="+", help="directories, glob patterns, or trajectory files (.csv or .npy)")
+    parser_render.add_argument("-o", "--output-dir", default=".", help="directory of output images")
+    parser_render.add_argument("--format", default="png", choices=["png", "svg"], help="output format")
+    parser_render.add_argument("--dim", type=int, default=3, choices=[2, 3], help="2D or 3D quickplot")
+    parser_render.add_argument("--radius", type=float, default=None, help="radius of central body")
+    parser_render.add_argument("--center", type=float, nargs=3, default=None, help="x,y,z coordinates of central body")
+    parser_render.add_argument("--scale", type=float, default=1.0, help="scaling factor of axis limits")
+    parser_render.add_argument("--figsize", type=float, default=5, help="figure size in inches")
+    parser_render.add_argument("--dpi", type=int, default=100, help="resolution of output images")
+    parser_render.add_argument("--max-points", type=int, default=None, help="decimate trajectories to at most this many points")
+    parser_render.add_argument("-j", "--workers", type=int, default=None, help="number of rendering processes")
+    parser_render.add_argument("--cache-dir", default=None, help="directory of binary caches of CSV files (default: .cache in the output directory)")
+    parser_render.add_argument("--summary", default=None, help="JSON file to write per-file timings to")
+    parser_grid = subparsers.add_parser("grid", help="render a grid of quickplot panels of trajectory files into one image")
+    parser_grid.add_argument("inputs", nargs="+", help="directories, glob patterns, or trajectory files (.csv or .npy)")
+    parser_grid.add_argument("-o", "--output", default="grid.png", help="output image")
+    parser_grid.add_argument("--ncols", type=int, default=None, help="number of panels per row")
+    parser_grid.add_argument("--dim", type=int, default=3, choices=[2, 3], help="2D or 3D quickplot panels")
+    parser_grid.add_argument("--radius", type=float, default=None, help="radius of central body")
+    parser_grid.add_argument("--center", type=float, nargs=3, default=None, help="x,y,z coordinates of central body")
+    parser_grid.add_argument("--scale", type=float, default=1.0, help="scaling factor of axis limits")
+    parser_grid.add_argument("--panel-size", type=float, default=2.0, help="panel size in inches")
+    parser_grid.add_argument("--dpi", type=int, default=100, help="resolution of panels")
+    parser_grid.add_argument("--max-points", type=int, default=None, help="decimate trajectories to at most this many points")
+    parser_grid.add_argument("--shared-limits", action="store_true", help="use the same equal-axis limits in all panels")
+    parser_grid.add_argument("-j", "--workers", type=int, default=None, help="number of rendering processes")
+    parser_grid.add_argument("--cache-dir", default=None, help="directory of binary caches of CSV files (default: .cache next to the output image)")
+    args = parser.parse_args(argv)
+
+    files = find_trajectory_files(args.inputs)
+    if len(files) == 0:
+        print("No trajectory files found", file=sys.stderr)
+        return 1
+    if args.command == "grid":
+        return _main_grid(args, files)
+    tstart = time.perf_counter()
+    summaries = render_files(
+        files, args.output_dir, fmt=args.format, n_workers=args.workers, cache_dir=args.cache_dir,
+        dim=args.dim, radius=args.radius, center=args.center, scale=args.scale,
+        figsize=args.figsize, dpi=args.dpi, max_points=args.max_points,
+    )
+    elapsed = time.perf_counter() - tstart
+
+    for summary in summaries:
+        print(f"{summary['file']:50s} {summary['n_points']:>10d} pts  load {summary['load_time']:7.3f} s"
+              f"  plot {summary['plot_time']:7.3f} s  save {summary['save_time']:7.3f} s")
+    print(f"Rendered {len(summaries)} file(s) in {elapsed:.3f} s")
+    if args.summary is not None:
+        with open(args.summary, "w") as f:
+            json.dump({"elapsed": elapsed, "files": summaries}, f, indent=2)
+    return 0
@@ -0,0 +1,172 @@
+"""
+Shape-preserving decimation of trajectories
+"""
+
+import logging
+
+import numpy as np
+
+from .profiling import instrument
+
+logger = logging.getLogger(__name__)
+
+
+def _minmax_bins(points, n_bins):
+    """Get sorted indices of first, last, and min/max samples along each coordinate of `n_bins` bins of interior samples"""
+    n, dim = points.shape
+    n_interior = n - 2
+    bin_size = int(np.ceil(n_interior / n_bins))
+    n_full = n_interior // bin_size
+    interior = points[1:n-1]
+
+    idx = [np.array([0, n-1])]
+    if n_full > 0:
+        binned = interior[:n_full*bin_size].reshape(n_full, bin_size, dim)
+        offsets = 1 + bin_size*np.arange(n_full)[:, None]
+        idx.append((np.argmin(binned, axis=1) + offsets).ravel())
+        idx.append((np.argmax(binned, axis=1) + offsets).ravel())
+    if n_full*bin_size < n_interior:
+        tail = interior[n_full*bin_size:]
+        offset = 1 + n_full*bin_size
+        idx.append(np.argmin(tail, axis=0) + offset)
+        idx.append(np.argmax(tail, axis=0) + offset)
+    return np.unique(np.concatenate(idx))
+
+
+def decimate_minmax(points, max_points, n_retries=2):
+    """Get indices of samples kept by min/max binning.
+    The interior samples are split into bins of equal sample count, and for each bin the samples
+    with minimum and maximum value along each coordinate are kept, so that the extent
+    of the trajectory within each bin is preserved. First and last samples are always kept.
+    Each bin keeps up to 2*D samples, but fewer when one sample is the extremum of several
+    coordinates, e.g. on smooth arcs spanning a bin; the number of bins is then increased
+    in proportion to the shortfall, so that close to `max_points` samples are kept.
+
+    Args:
+        points (ndarray): trajectory of shape (N,D)
+        max_points (int): maximum number of samples to keep, at least 2
+        n_retries (int): maximum number of re-binnings to fill the budget of `max_points`
+
+    Returns:
+        (ndarray): sorted indices of kept samples
+    """
+    if max_points < 2:
+        raise ValueError(f"max_points must be at least 2 to keep first and last samples, got {max_points}")
+    points = np.asarray(points)
+    n, dim = points.shape
+    if n <= max_points:
+        return np.arange(n)
+    # bins over interior samples, each keeping up to 2*dim samples
+    n_bins = (max_points - 2) // (2*dim)
+    if n_bins == 0:
+        # budget too small for a single bin
+        return np.array([0, n-1])
+    idx = _minmax_bins(points, n_bins)
+    for _ in range(n_retries):
+        if len(idx) >= 0.95*max_points:
+            break
+        # expected number of kept samples is proportional to the number of bins, with some margin
+        n_more = min(int(0.97*n_bins*(max_points - 2) / max(len(idx) - 2, 1)), n - 2)
+        if n_more <= n_bins:
+            break
+        more = _minmax_bins(points, n_more)
+        if len(more) > max_points:
+            break
+        idx, n_bins = more, n_more
+    return idx
+
+
+def decimate_rdp(points, epsilon):
+    """Get indices of samples kept by the Ramer-Douglas-Peucker algorithm.
+    All intervals between kept samples are refined simultaneously, one level at a time,
+    by adding the sample farthest from the interval's chord if its distance exceeds `epsilon`.
+    First and last samples are always kept.
+
+    Args:
+        points (ndarray): trajectory of shape (N,D)
+        epsilon (float): distance tolerance
+
+    Returns:
+        (ndarray): sorted indices of kept samples
+    """
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    # samples of intervals that are not yet within tolerance
+    active = np.arange(1, n-1)
+    while len(active) > 0:
+        kept = np.flatnonzero(keep)
+        # interval containing each active sample, and distance to its chord
+        seg = np.searchsorted(kept, active, side="right") - 1
+        a = points[kept[seg]]
+        ab = points[kept[seg+1]] - a
+        ap = points[active] - a
+        ab2 = np.einsum("ij,ij->i", ab, ab)
+        t = np.clip(np.einsum("ij,ij->i", ap, ab) / np.where(ab2 > 0, ab2, 1.0), 0.0, 1.0)
+        dist = np.linalg.norm(ap - t[:, None]*ab, axis=1)
+        # farthest sample of each interval
+        starts = np.flatnonzero(np.r_[True, seg[1:] != seg[:-1]])
+        counts = np.diff(np.r_[starts, len(seg)])
+        dmax = np.maximum.reduceat(dist, starts)
+        refine = np.repeat(dmax > epsilon, counts)
+        is_max = (dist == np.repeat(dmax, counts)) & refine
+        _, first = np.unique(seg[is_max], return_index=True)
+        new = active[is_max][first]
+        keep[new] = True
+        # drop samples of intervals within tolerance, and newly kept samples
+        refine[np.searchsorted(active, new)] = False
+        active = active[refine]
+    return np.flatnonzero(keep)
+
+
+@instrument
+def decimate_trajectory(points, max_points, method="minmax", epsilon=None):
+    """Get indices of samples kept when reducing trajectory to at most `max_points` samples.
+    With "rdp", the tolerance defaults to the diagonal of the trajectory's bounding box divided
+    by `max_points`. Very long trajectories are first reduced to `16*max_points` samples by
+    min/max binning before applying Ramer-Douglas-Peucker, and the result is further reduced
+    by min/max binning if it still has more than `max_points` samples.
+
+    Args:
+        points (ndarray): trajectory of shape (N,D)
+        max_points (int): maximum number of samples to keep
+        method (str): "minmax" for min/max binning, or "rdp" for Ramer-Douglas-Peucker
+        epsilon (float): distance tolerance, used only if `method` is "rdp"
+
+    Returns:
+        (ndarray): sorted indices of kept samples
+    """
+    points = np.asarray(points)
+    if len(points) <= max_points:
+        return np.arange(len(points))
+    if method == "minmax":
+        return decimate_minmax(points, max_points)
+    elif method == "rdp":
+        if epsilon is None:
+            epsilon = np.linalg.norm(np.nanmax(points, axis=0) - np.nanmin(points, axis=0)) / max_points
+        if len(points) > 16*max_points:
+            idx = decimate_minmax(points, 16*max_points)
+        else:
+            idx = np.arange(len(points))
+        idx = idx[decimate_rdp(points[idx], epsilon)]
+        if len(idx) > max_points:
+            idx = idx[decimate_minmax(points[idx], max_points)]
+        return idx
+    else:
+        raise ValueError(f"method must be 'minmax' or 'rdp', got {method}")
+
+
+def _decimate(coords, max_points, method, verbose, points=None):
+    """Decimate trajectory coordinates (xs, ys[, zs]) if `max_points` is provided, optionally logging dropped points.
+    If already available, `points` of shape (N,D) stacking `coords` is used instead of stacking them again."""
+    if max_points is None:
+        return coords
+    if points is None:
+        points = np.array(coords).T
+    idx = decimate_trajectory(points, max_points, method=method)
+    if verbose is True:
+        logger.info("Decimated trajectory from %d to %d points (%d dropped)", len(points), len(idx), len(points) - len(idx))
+    return points[idx].T
@@ -0,0 +1,133 @@
+"""
+Rasterized density of trajectory ensembles
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .profiling import instrument
+
+
+# coordinate columns of each projection of 3D trajectories, as slices so that projections are views
+PROJECTIONS = {"xy": slice(0, 2), "xz": slice(0, 3, 2), "yz": slice(1, 3)}
+
+
+def project_trajectories(trajs, projection="xy"):
+    """Get 2D projections of trajectories, as views without copying
+
+    Args:
+        trajs (ndarray or list): array of shape (K,N,D), or list of K arrays of shape (N_i,D), with D equal to 2 or 3
+        projection (str): plane to project 3D trajectories onto, "xy", "xz", or "yz"; ignored if D is 2
+
+    Returns:
+        (list): list of K arrays of shape (N_i,2)
+    """
+    if isinstance(trajs, np.ndarray) and trajs.ndim == 2:
+        trajs = [trajs]
+    trajs = [np.asarray(traj) for traj in trajs]
+    assert all(traj.ndim == 2 and traj.shape[1] in (2, 3) for traj in trajs), "trajectories must be of shape (N_i,2) or (N_i,3)"
+    if projection not in PROJECTIONS:
+        raise ValueError(f"projection must be one of {list(PROJECTIONS)}, got {projection}")
+    cols = PROJECTIONS[projection]
+    return [traj if traj.shape[1] == 2 else traj[:, cols] for traj in trajs]
+
+
+def _split_tasks(trajs, chunk_size):
+    """Group trajectory slices (i, start, stop) into tasks of at most about `chunk_size` segments each"""
+    tasks, task, n_task = [], [], 0
+    for i, traj in enumerate(trajs):
+        n = len(traj)
+        for start in range(0, n-1, chunk_size):
+            # consecutive slices overlap by one sample, so that no segment is lost
+            stop = min(start + chunk_size + 1, n)
+            task.append((i, start, stop))
+            n_task += stop - start - 1
+            if n_task >= chunk_size:
+                tasks.append(task)
+                task, n_task = [], 0
+    if len(task) > 0:
+        tasks.append(task)
+    return tasks
+
+
+def _accumulate_task(trajs, task, lower, pixel_size, shape, max_samples):
+    """Rasterize segments of one task into a flattened grid of path length per cell, in pixels"""
+    nx, ny = shape
+    # slices in pixel units, with segments from consecutive samples
+    scaled = [(trajs[i][start:stop] - lower) / pixel_size for i, start, stop in task]
+    a = np.concatenate([q[:-1] for q in scaled])
+    b = np.concatenate([q[1:] for q in scaled])
+    grid = np.zeros(nx*ny)
+    # sample each segment at least once per pixel of its length, in sub-chunks of bounded size
+    length = np.nan_to_num(np.hypot(*(b - a).T), nan=0.0)
+    n_sub = np.clip(np.ceil(length), 1, 2*(nx + ny)).astype(np.intp)
+    weight = length / n_sub
+    ends = np.cumsum(n_sub)
+    bounds = np.searchsorted(ends, np.arange(max_samples, ends[-1], max_samples), side="right")
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(n_sub)]):
+        if hi <= lo:
+            continue
+        counts = n_sub[lo:hi]
+        seg = np.repeat(np.arange(lo, hi), counts)
+        # fraction along segment at the middle of each sub-segment
+        first = np.cumsum(counts) - counts
+        frac = (np.arange(len(seg)) - np.repeat(first, counts) + 0.5) / n_sub[seg]
+        uv = a[seg] + frac[:, None]*(b[seg] - a[seg])
+        ix = np.floor(uv[:, 0])
+        iy = np.floor(uv[:, 1])
+        valid = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+        flat = iy[valid].astype(np.intp)*nx + ix[valid].astype(np.intp)
+        grid += np.bincount(flat, weights=weight[seg][valid], minlength=nx*ny)
+    return grid
+
+
+@instrument
+def accumulate_density(trajs, xlims, ylims, resolution=512, chunk_size=1000000, n_threads=None):
+    """Accumulate path length of 2D trajectories on a fixed-resolution grid.
+    Segments are sampled at least once per pixel and binned with `np.bincount`, one chunk
+    of at most about `chunk_size` segments at a time, so that memory use does not depend
+    on the number of trajectories. Chunks are optionally accumulated by a pool of threads.
+
+    Args:
+        trajs (ndarray or list): array of shape (K,N,2), or list of K arrays of shape (N_i,2)
+        xlims (list): limits of grid along x
+        ylims (list): limits of grid along y
+        resolution (int or tuple): number of cells along x, or tuple of cells along x and y; if int, the number of cells along y follows from the aspect ratio of the limits
+        chunk_size (int): number of segments rasterized at once
+        n_threads (int): number of threads; if None or 1, chunks are accumulated in the calling thread; if 0, set to `os.cpu_count()`
+
+    Returns:
+        (ndarray): grid of shape (ny,nx) with the path length in pixels through each cell
+    """
+    trajs = [np.asarray(traj) for traj in trajs]
+    if isinstance(resolution, (tuple, list)):
+        nx, ny = resolution
+    else:
+        nx = resolution
+        ny = max(int(round(resolution * (ylims[1] - ylims[0]) / (xlims[1] - xlims[0]))), 1)
+    lower = np.array([xlims[0], ylims[0]], dtype=float)
+    pixel_size = np.array([(xlims[1] - xlims[0]) / nx, (ylims[1] - ylims[0]) / ny])
+    tasks = _split_tasks(trajs, chunk_size)
+    args = (lower, pixel_size, (nx, ny), chunk_size)
+
+    grid = np.zeros(nx*ny)
+    if n_threads == 0:
+        n_threads = os.cpu_count() or 1
+    if n_threads is None or n_threads == 1:
+        for task in tasks:
+            grid += _accumulate_task(trajs, task, *args)
+        return grid.reshape(ny, nx)
+
+    # keep at most 2*n_threads grids in flight
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_accumulate_task, trajs, task, *args))
+            if len(pending) >= 2*n_threads:
+                grid += pending.popleft().result()
+        while pending:
+            grid += pending.popleft().result()
+    return grid.reshape(ny, nx)
@@ -0,0 +1,198 @@
+"""
+Detection of trajectory events (apsides, node crossings, closest approach)
+"""
+
+import numpy as np
+
+from .profiling import instrument
+from .resample import _hermite_eval
+
+
+EVENT_KINDS = ("periapsis", "apoapsis", "ascending_node", "descending_node", "closest_approach")
+
+# default scatter style of each event kind
+EVENT_STYLES = {
+    "periapsis": dict(marker="o", c="tab:red", s=12),
+    "apoapsis": dict(marker="o", c="tab:blue", s=12),
+    "ascending_node": dict(marker="^", c="tab:green", s=14),
+    "descending_node": dict(marker="v", c="tab:green", s=14),
+    "closest_approach": dict(marker="D", c="k", s=16),
+}
+
+
+def _hermite_derivative(p0, v0, p1, v1, h, s):
+    """Evaluate time derivative of cubic Hermite interpolant between two samples, with arguments as `_hermite_eval`"""
+    s2 = s*s
+    dh00 = 6*s2 - 6*s
+    dh10 = 3*s2 - 4*s + 1
+    dh01 = -6*s2 + 6*s
+    dh11 = 3*s2 - 2*s
+    return (dh00*p0 + dh01*p1) / h + dh10*v0 + dh11*v1
+
+
+def _local_velocities(positions, times, idx):
+    """Get velocities at samples `idx` from second-order finite differences, as `np.gradient` without evaluating all samples.
+    With only two samples, the velocity of the linear interpolant is used."""
+    n = len(positions)
+    if n < 3:
+        assert n == 2, "velocities require at least two samples"
+        return np.broadcast_to((positions[1] - positions[0]) / (times[1] - times[0]), (len(idx), positions.shape[1]))
+    lo = np.clip(idx - 1, 0, n - 3)
+    dt0 = times[lo+1] - times[lo]
+    dt1 = times[lo+2] - times[lo+1]
+    p0, p1, p2 = positions[lo], positions[lo+1], positions[lo+2]
+    # derivative at idx of the quadratic through samples lo, lo+1, lo+2, from its Lagrange weights
+    x = (times[idx] - times[lo+1])[:, None]
+    a0 = (2*x - dt1[:, None]) / (dt0*(dt0 + dt1))[:, None]
+    a2 = (2*x + dt0[:, None]) / (dt1*(dt0 + dt1))[:, None]
+    return a0*p0 - (a0 + a2)*p1 + a2*p2
+
+
+class _Intervals:
+    """Hermite interpolants on intervals [i, i+1] of a trajectory"""
+    def __init__(self, positions, times, velocities, idx):
+        self.idx = idx
+        self.p0 = positions[idx]
+        self.p1 = positions[idx+1]
+        if velocities is not None:
+            self.v0 = velocities[idx]
+            self.v1 = velocities[idx+1]
+        else:
+            self.v0 = _local_velocities(positions, times, idx)
+            self.v1 = _local_velocities(positions, times, idx+1)
+        self.t0 = times[idx]
+        self.h = (times[idx+1] - times[idx])[:, None]
+
+    def position(self, s):
+        return _hermite_eval(self.p0, self.v0, self.p1, self.v1, self.h, s[:, None])
+
+    def velocity(self, s):
+        return _hermite_derivative(self.p0, self.v0, self.p1, self.v1, self.h, s[:, None])
+
+    def refine(self, func, n_iter):
+        """Bisect for the root of `func(s)` within each interval, and get its time and position.
+        Intervals where `func` does not change sign fall back to the end sample closest to a root."""
+        lo = np.zeros(len(self.idx))
+        hi = np.ones(len(self.idx))
+        f_lo, f_hi = func(lo), func(hi)
+        sign_lo = np.sign(f_lo)
+        bracketed = sign_lo != np.sign(f_hi)
+        for _ in range(n_iter):
+            mid = 0.5*(lo + hi)
+            same = np.sign(func(mid)) == sign_lo
+            lo = np.where(same, mid, lo)
+            hi = np.where(same, hi, mid)
+        s = np.where(bracketed, 0.5*(lo + hi), np.where(np.abs(f_lo) <= np.abs(f_hi), 0.0, 1.0))
+        return self.t0 + s*self.h[:, 0], self.position(s)
+
+
+@instrument
+def find_events(positions, times=None, velocities=None, center=None, kinds=EVENT_KINDS, n_iter=40):
+    """Find events along a trajectory from sign changes and extrema over all samples at once.
+    Apsides are extrema of the range from `center`, nodes are crossings of the plane z = center z,
+    and the closest approach is the global minimum of the range. Event times are refined by
+    bisection on the cubic Hermite interpolant between the bracketing samples, which is the path
+    drawn by `animate_trajectory_3d` with `method="hermite"`, and not exactly the path of its default
+    `method="cubic"` spline; without velocities, velocities at the bracketing samples are estimated
+    from finite differences. If the interpolant has no sign change within an interval, e.g. with
+    inconsistent velocities, the event falls back to the closest sample.
+
+    Args:
+        positions (ndarray or Trajectory): positions of shape (N,2) or (N,3), or `Trajectory`
+        times (ndarray): time-stamps of shape (N,), strictly increasing; if None, time-stamps of the `Trajectory`, or sample indices
+        velocities (ndarray): velocities of same shape as `positions`; if None, velocities of the `Trajectory`, or finite differences
+        center (list): coordinates of center, if None set to the origin
+        kinds (tuple): event kinds to find, among "periapsis", "apoapsis", "ascending_node", "descending_node", and "closest_approach"; nodes require 3D positions
+        n_iter (int): number of bisection iterations
+
+    Returns:
+        (dict): event kind -> tuple of event times of shape (M,) and event positions of shape (M,D)
+    """
+    traj_times, traj_velocities = getattr(positions, "times", None), getattr(positions, "velocities", None)
+    positions = np.asarray(getattr(positions, "positions", positions))
+    times = traj_times if times is None else times
+    velocities = traj_velocities if velocities is None else velocities
+    n, dim = positions.shape
+    times = np.arange(n, dtype=float) if times is None else np.asarray(times, dtype=float)
+    velocities = None if velocities is None else np.asarray(velocities)
+    center = np.zeros(dim) if center is None else np.asarray(center, dtype=float)[:dim]
+    for kind in kinds:
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"event kind must be one of {EVENT_KINDS}, got {kind}")
+
+    events = {}
+    empty = (np.empty(0), np.empty((0, dim)))
+    if any(kind in kinds for kind in ("periapsis", "apoapsis", "closest_approach")) and n >= 3:
+        # squared range without forming positions - center
+        range2 = np.einsum("ij,ij->i", positions, positions) - 2*(positions @ center) + center @ center
+        drange2 = np.diff(range2)
+        # local extrema at samples, from sign changes of the range difference
+        falling = drange2[:-1] < 0
+        rising = drange2[1:] >= 0
+        minima = np.flatnonzero(falling & rising) + 1
+        maxima = np.flatnonzero(~falling & ~rising) + 1
+
+        def radial(intervals):
+            return lambda s: np.einsum("ij,ij->i", intervals.position(s) - center, intervals.velocity(s))
+
+        def apsides(idx, sign):
+            if len(idx) == 0:
+                return empty
+            # extremum lies in the interval before the sample if the range is already rising (falling for maxima)
+            v = velocities[idx] if velocities is not None else _local_velocities(positions, times, idx)
+            rdot = np.einsum("ij,ij->i", positions[idx] - center, v)
+            start = np.clip(np.where(sign*rdot > 0, idx - 1, idx), 0, n - 2)
+            intervals = _Intervals(positions, times, velocities, start)
+            return intervals.refine(radial(intervals), n_iter)
+
+        if "periapsis" in kinds or "closest_approach" in kinds:
+            periapsis = apsides(minima, 1.0)
+            if "periapsis" in kinds:
+                events["periapsis"] = periapsis
+        if "apoapsis" in kinds:
+            events["apoapsis"] = apsides(maxima, -1.0)
+        if "closest_approach" in kinds:
+            # global minimum among periapses and end points
+            t_min, p_min = periapsis
+            t_cand = np.concatenate([t_min, times[[0, -1]]])
+            p_cand = np.concatenate([p_min, positions[[0, -1]]])
+            i_min = np.argmin(np.sum((p_cand - center)**2, axis=1))
+            events["closest_approach"] = (t_cand[i_min:i_min+1], p_cand[i_min:i_min+1])
+
+    if any(kind in kinds for kind in ("ascending_node", "descending_node")):
+        assert dim == 3, "node crossings require 3D positions"
+        above = positions[:, 2] >= center[2]
+        for kind, crossing in (("ascending_node", ~above[:-1] & above[1:]), ("descending_node", above[:-1] & ~above[1:])):
+            if kind not in kinds:
+                continue
+            idx = np.flatnonzero(crossing)
+            if len(idx) == 0:
+                events[kind] = empty
+                continue
+            intervals = _Intervals(positions, times, velocities, idx)
+            events[kind] = intervals.refine(lambda s: intervals.position(s)[:, 2] - center[2], n_iter)
+    return {kind: events.get(kind, empty) for kind in kinds}
+
+
+def plot_events(ax, events, dim=3, styles=None, zorder=3):
+    """Plot events with one scatter artist per event kind
+
+    Args:
+        ax (Axes3DSubplot): matplotlib axis, 3D if `dim` is 3
+        events (dict): events from `find_events`
+        dim (int): number of plotted dimensions, 2 or 3
+        styles (dict): event kind -> keyword arguments of `ax.scatter`, overriding `EVENT_STYLES`
+        zorder (float): zorder of scatter artists
+
+    Returns:
+        (dict): event kind -> scatter artist
+    """
+    artists = {}
+    for kind, (_, points) in events.items():
+        if len(points) == 0:
+            continue
+        style = dict(EVENT_STYLES.get(kind, {}), label=kind.replace("_", " "), zorder=zorder)
+        if styles is not None and kind in styles:
+            style.update(styles[kind])
+        artists[kind] = ax.scatter(*points[:, :dim].T, **style)
+    return artists
@@ -0,0 +1,239 @@
+"""
+Streaming, parallel export of trajectory animations
+"""
+
+import os
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .profiling import instrument
+
+
+# per-process rendering state, populated by `_init_worker`
+_WORKER = {}
+
+
+def _init_worker(positions, style):
+    """Create the headless figure used by a rendering process"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import mpl_toolkits.mplot3d  # noqa: F401 (registers 3d projection)
+    from .helper3d import set_equal_axis
+    from .animator import plot_trail, get_trail_colors
+    from .linecolor import get_segments
+
+    fig = Figure(figsize=(style["n_figsize"], style["n_figsize"]), dpi=style["dpi"])
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(projection="3d")
+    xlims, ylims, zlims = style["limits"]
+    set_equal_axis(ax, xlims, ylims, zlims, scale=style["scale"], dim3=True)
+    if style["elev"] is not None or style["azim"] is not None:
+        ax.view_init(elev=style["elev"], azim=style["azim"])
+    lines, trails = [], []
+    for i_traj, pos in enumerate(positions):
+        if style["trail_length"] is not None:
+            trail, head = plot_trail(ax, pos[0], style["trail_length"], lw=style["lw_traj"],
+                                     color=style["c_traj"][i_traj], marker=style["marker"])
+            colors = get_trail_colors(style["c_traj"][i_traj], style["trail_length"])
+            trails.append((trail, head, get_segments(pos), colors))
+        else:
+            lines.append( ax.plot(pos[:1, 0], pos[:1, 1], pos[:1, 2], lw=style["lw_traj"], c=style["c_traj"][i_traj])[0] )
+    _WORKER.clear()
+    _WORKER.update(fig=fig, lines=lines, trails=trails, positions=positions, style=style)
+
+
+def _render_frame(num):
+    """Render frame `num` on the worker's figure and return its RGBA buffer"""
+    from .animator import update_trail
+
+    for trail in _WORKER["trails"]:
+        update_trail(*trail, num)
+    for line, pos in zip(_WORKER["lines"], _WORKER["positions"]):
+        line.set_data(pos[:num+1, 0], pos[:num+1, 1])
+        line.set_3d_properties(pos[:num+1, 2])
+    canvas = _WORKER["fig"].canvas
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())
+
+
+def _render_chunk(frame_range):
+    """Render a range of frames and return them encoded for the writer
+
+    Args:
+        frame_range (tuple): first and last (exclusive) frame indices
+
+    Returns:
+        (tuple): (width, height) of frames, and list of encoded frames as bytes
+    """
+    from PIL import Image, GifImagePlugin
+
+    style = _WORKER["style"]
+    encoded = []
+    for num in range(*frame_range):
+        rgba = _render_frame(num)
+        if style["writer"] == "pillow":
+            # quantize with a per-frame palette stored as local color table
+            im = Image.fromarray(rgba[:, :, :3]).quantize(colors=256)
+            encoded.append(b"".join(GifImagePlugin.getdata(
+                im, duration=style["duration"], include_color_table=True
+            )))
+        else:
+            encoded.append(rgba.tobytes())
+    height, width = rgba.shape[:2]
+    return (width, height), encoded
+
+
+class _GifStream:
+    """Write GIF frames to file as they arrive"""
+    def __init__(self, filename, size, loop):
+        from PIL import Image, GifImagePlugin
+        self._fp = open(filename, "wb")
+        header, _ = GifImagePlugin.getheader(Image.new("P", size), info={"loop": loop, "duration": 1})
+        for block in header:
+            self._fp.write(block)
+
+    def write(self, frame):
+        self._fp.write(frame)
+
+    def close(self):
+        self._fp.write(b";")
+        self._fp.close()
+
+
+class _FFmpegStream:
+    """Pipe raw RGBA frames to an ffmpeg process"""
+    def __init__(self, filename, size, fps, ffmpeg_path, ffmpeg_args):
+        cmd = [
+            ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{size[0]}x{size[1]}", "-r", str(fps),
+            "-i", "-",
+        ] + list(ffmpeg_args) + [filename]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        self._proc.stdin.write(frame)
+
+    def close(self):
+        self._proc.stdin.close()
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with return code {self._proc.returncode}")
+
+
+@instrument
+def export_trajectory_animation(
+        positions,
+        filename,
+        fps=20,
+        writer=None,
+        n_workers=None,
+        chunk_size=None,
+        lw_traj=0.5,
+        c_traj="navy",
+        limits=None,
+        scale=1.2,
+        n_figsize=5,
+        dpi=100,
+        elev=None,
+        azim=None,
+        loop=0,
+        trail_length=None,
+        marker="o",
+        ffmpeg_path="ffmpeg",
+        ffmpeg_args=("-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p"),
+    ):
+    """Export animation of trajectories growing over time to a GIF or video file.
+    Frames are rendered headlessly on the Agg backend by a pool of processes, each
+    handling a range of frames, and are streamed to the writer in order as soon as they
+    are available, so that only a bounded number of frames is held in memory.
+
+    Args:
+        positions (ndarray): resampled positions of shape (nt,3) or (K,nt,3)
+        filename (str): output file; ".gif" is written with Pillow, other extensions with ffmpeg
+        fps (int): frames per second
+        writer (str): "pillow" or "ffmpeg"; if None, inferred from extension of `filename`
+        n_workers (int): number of rendering processes; if None, set to `os.cpu_count()`; if 1, frames are rendered in the calling process
+        chunk_size (int): number of frames per rendering task; if None, set from number of frames and workers
+        lw_traj (float): linewidth for trajectory
+        c_traj (str, tuple, or list): color for trajectory, or list of colors for each trajectory
+        limits (tuple): xlims, ylims, zlims of (equal) axis; if None, computed from `positions` with `set_equal_axis`
+        scale (float): scaling for setting limits on axis, used only if `limits` is None
+        n_figsize (int): fig_size is set to (n_figsize, n_figsize)
+        dpi (int): resolution of frames
+        elev (float): elevation angle of view in degrees
+        azim (float): azimuthal angle of view in degrees
+        loop (int): number of GIF loops, 0 for infinite
+        trail_length (int): if provided, only the most recent `trail_length` segments are shown, fading out along the trail
+        marker (str): marker at the current position, shown if `trail_length` is provided; if None, no marker is drawn
+        ffmpeg_path (str): path to ffmpeg executable
+        ffmpeg_args (tuple): output arguments passed to ffmpeg
+
+    Returns:
+        (str): filename
+    """
+    positions = np.asarray(positions, dtype=float)
+    if positions.ndim == 2:
+        positions = positions[None, :, :]
+    nt = positions.shape[1]
+    if writer is None:
+        writer = "pillow" if os.path.splitext(filename)[1].lower() == ".gif" else "ffmpeg"
+    assert writer in ("pillow", "ffmpeg"), "writer must be 'pillow' or 'ffmpeg'"
+    from matplotlib.colors import is_color_like
+
+    if is_color_like(c_traj):
+        c_traj = [c_traj] * len(positions)
+    if limits is None:
+        limits = tuple(zip(positions.min(axis=(0, 1)), positions.max(axis=(0, 1))))
+    else:
+        scale = 1.0
+    style = dict(
+        writer=writer, duration=1000/fps, lw_traj=lw_traj, c_traj=list(c_traj), limits=limits, scale=scale,
+        n_figsize=n_figsize, dpi=dpi, elev=elev, azim=azim, trail_length=trail_length, marker=marker,
+    )
+
+    # split frames into ranges
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = int(min(max(np.ceil(nt / (4*n_workers)), 1), 50))
+    frame_ranges = [(i, min(i + chunk_size, nt)) for i in range(0, nt, chunk_size)]
+
+    stream = None
+    try:
+        for size, frames in _iter_chunks(frame_ranges, positions, style, n_workers):
+            if stream is None:
+                if writer == "pillow":
+                    stream = _GifStream(filename, size, loop)
+                else:
+                    stream = _FFmpegStream(filename, size, fps, ffmpeg_path, ffmpeg_args)
+            for frame in frames:
+                stream.write(frame)
+    finally:
+        if stream is not None:
+            stream.close()
+    return filename
+
+
+def _iter_chunks(frame_ranges, positions, style, n_workers):
+    """Yield rendered chunks in order, keeping at most 2*n_workers chunks in flight"""
+    if n_workers == 1:
+        _init_worker(positions, style)
+        for frame_range in frame_ranges:
+            yield _render_chunk(frame_range)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(positions, style)) as pool:
+        pending = deque()
+        ranges = iter(frame_ranges)
+        for frame_range in ranges:
+            pending.append(pool.submit(_render_chunk, frame_range))
+            if len(pending) >= 2*n_workers:
+                break
+        while pending:
+            result = pending.popleft().result()
+            frame_range = next(ranges, None)
+            if frame_range is not None:
+                pending.append(pool.submit(_render_chunk, frame_range))
+            yield result
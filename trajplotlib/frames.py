@@ -0,0 +1,201 @@
+"""
+Time-varying reference frame transformations of trajectories
+"""
+
+import numpy as np
+
+from .profiling import instrument
+
+
+class FrameTransform:
+    """Time-varying rigid transformation of positions and velocities, r' = R(t) r + b(t) and
+    v' = R(t) v + dR/dt(t) r + db/dt(t). Each of R, b, and their rates is given either as an array
+    with one entry per sample, or as a callable of an array of times, which is evaluated one chunk
+    of samples at a time.
+
+    Args:
+        rotations (ndarray or callable): rotation matrices of shape (N,3,3), or callable returning them for times of shape (M,); if None, identity
+        translations (ndarray or callable): translations of shape (N,3), or callable returning them for times of shape (M,); if None, zero
+        rotation_rates (ndarray or callable): time derivatives of rotation matrices, same format as `rotations`; if None, zero
+        translation_rates (ndarray or callable): time derivatives of translations, same format as `translations`; if None, zero
+    """
+    def __init__(self, rotations=None, translations=None, rotation_rates=None, translation_rates=None):
+        self.rotations = rotations
+        self.translations = translations
+        self.rotation_rates = rotation_rates
+        self.translation_rates = translation_rates
+
+    @property
+    def time_dependent(self):
+        """Whether any of the components is a callable of time"""
+        return any(callable(component) for component in
+                   (self.rotations, self.translations, self.rotation_rates, self.translation_rates))
+
+    @staticmethod
+    def _evaluate(component, times, start, stop):
+        """Get component for samples start:stop, or None if it is not set"""
+        if component is None:
+            return None
+        if callable(component):
+            return np.asarray(component(times[start:stop]), dtype=float)
+        return np.asarray(component, dtype=float)[start:stop]
+
+    @instrument
+    def apply(self, positions, times=None, velocities=None, out=None, out_velocities=None, chunk_size=65536):
+        """Transform positions, and optionally velocities, in chunks of `chunk_size` samples.
+        Outputs may be the inputs themselves for an in-place transformation, in which case only
+        a temporary buffer of one chunk is allocated.
+
+        Args:
+            positions (ndarray): positions of shape (N,3) or (K,N,3)
+            times (ndarray): time-stamps of shape (N,), required if any component is a callable
+            velocities (ndarray): velocities of same shape as `positions`
+            out (ndarray): output buffer of transformed positions; if None, a new array is allocated
+            out_velocities (ndarray): output buffer of transformed velocities; if None and `velocities` is provided, a new array is allocated
+            chunk_size (int): number of samples transformed at once
+
+        Returns:
+            (ndarray or tuple): transformed positions, or tuple of transformed positions and velocities if `velocities` is provided
+        """
+        positions = np.asarray(positions)
+        single = positions.ndim == 2
+        if out is None:
+            out = np.empty(positions.shape, dtype=np.result_type(positions.dtype, float))
+        assert out.shape == positions.shape, "out must be of same shape as positions"
+        if velocities is not None:
+            velocities = np.asarray(velocities)
+            if out_velocities is None:
+                out_velocities = np.empty(velocities.shape, dtype=np.result_type(velocities.dtype, float))
+            assert velocities.shape == positions.shape and out_velocities.shape == positions.shape, \
+                "velocities and out_velocities must be of same shape as positions"
+        if self.time_dependent:
+            assert times is not None, "times are required to evaluate a time-dependent transformation"
+        # view all inputs as (K,N,3)
+        pos, pos_out = (positions[None], out[None]) if single else (positions, out)
+        vel, vel_out = (None, None) if velocities is None else \
+            ((velocities[None], out_velocities[None]) if single else (velocities, out_velocities))
+
+        n = pos.shape[1]
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            rotation = self._evaluate(self.rotations, times, start, stop)
+            translation = self._evaluate(self.translations, times, start, stop)
+            r = pos[:, start:stop]
+            if vel is not None:
+                # velocities depend on untransformed positions, so transform them first
+                v = vel[:, start:stop]
+                rotation_rate = self._evaluate(self.rotation_rates, times, start, stop)
+                translation_rate = self._evaluate(self.translation_rates, times, start, stop)
+                v_new = _rotate(rotation, v, vel_out[:, start:stop])
+                if rotation_rate is not None:
+                    v_new += np.einsum("nij,knj->kni", rotation_rate, r)
+                if translation_rate is not None:
+                    v_new += translation_rate
+            r_new = _rotate(rotation, r, pos_out[:, start:stop])
+            if translation is not None:
+                r_new += translation
+        if velocities is not None:
+            return out, out_velocities
+        return out
+
+
+def _rotate(rotation, vectors, out):
+    """Rotate vectors of shape (K,M,3) by rotations of shape (M,3,3) into `out`, which may alias `vectors`"""
+    if rotation is None:
+        if out is not vectors:
+            out[...] = vectors
+        return out
+    if np.shares_memory(out, vectors):
+        # einsum can't write into its own input, so go through a chunk-sized temporary
+        out[...] = np.einsum("nij,knj->kni", rotation, vectors)
+    else:
+        np.einsum("nij,knj->kni", rotation, vectors, out=out)
+    return out
+
+
+def _rotation_z(angles):
+    """Get rotation matrices of shape (M,3,3) about the z-axis by angles of shape (M,)"""
+    c, s = np.cos(angles), np.sin(angles)
+    rotations = np.zeros((len(angles), 3, 3))
+    rotations[:, 0, 0] = c
+    rotations[:, 0, 1] = -s
+    rotations[:, 1, 0] = s
+    rotations[:, 1, 1] = c
+    rotations[:, 2, 2] = 1.0
+    return rotations
+
+
+def rotating_to_inertial(omega=1.0, t0=0.0, origin=None):
+    """Get transformation from a frame rotating about its z-axis at constant rate `omega` to the inertial frame,
+    e.g. from the CR3BP rotating frame (omega = 1 in canonical units) to the barycentric inertial frame.
+    Both frames coincide at time `t0`.
+
+    Args:
+        omega (float): rotation rate of the rotating frame
+        t0 (float): time at which both frames coincide
+        origin (list): x,y,z coordinates in the rotating frame of the inertial origin, e.g. the position of the primary body; if None, set to [0.0, 0.0, 0.0]
+
+    Returns:
+        (FrameTransform): transformation, evaluated from time-stamps
+    """
+    # skew-symmetric matrix of rotation rate about z
+    skew = np.array([[0.0, -omega, 0.0], [omega, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    rotations = lambda times: _rotation_z(omega*(np.asarray(times) - t0))
+    rotation_rates = lambda times: rotations(times) @ skew
+    if origin is None:
+        return FrameTransform(rotations=rotations, rotation_rates=rotation_rates)
+    origin = np.asarray(origin, dtype=float)
+    # r' = R (r - origin)
+    translations = lambda times: -rotations(times) @ origin
+    translation_rates = lambda times: -rotation_rates(times) @ origin
+    return FrameTransform(rotations, translations, rotation_rates, translation_rates)
+
+
+def inertial_to_rotating(omega=1.0, t0=0.0, origin=None):
+    """Get transformation from the inertial frame to a frame rotating about its z-axis at constant rate `omega`;
+    inverse of `rotating_to_inertial`
+
+    Args:
+        omega (float): rotation rate of the rotating frame
+        t0 (float): time at which both frames coincide
+        origin (list): x,y,z coordinates in the rotating frame of the inertial origin; if None, set to [0.0, 0.0, 0.0]
+
+    Returns:
+        (FrameTransform): transformation, evaluated from time-stamps
+    """
+    # r' = R^T r + origin, with the transpose of the rotation about z being the rotation by the opposite angle
+    skew = np.array([[0.0, omega, 0.0], [-omega, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    rotations = lambda times: _rotation_z(-omega*(np.asarray(times) - t0))
+    rotation_rates = lambda times: skew @ rotations(times)
+    if origin is None:
+        return FrameTransform(rotations=rotations, rotation_rates=rotation_rates)
+    origin = np.asarray(origin, dtype=float)
+    return FrameTransform(rotations, lambda times: np.broadcast_to(origin, (len(times), 3)), rotation_rates)
+
+
+def transform_trajectory(frame, xs, ys=None, zs=None):
+    """Apply `frame` to a trajectory before plotting, filling the transformed position array once
+
+    Args:
+        frame (FrameTransform): transformation
+        xs (ndarray or Trajectory): x-coordinates of trajectory, or `Trajectory` providing time-stamps and velocities
+        ys (ndarray): y-coordinates of trajectory, not needed if `xs` is a `Trajectory`
+        zs (ndarray): z-coordinates of trajectory; if None, set to zero
+
+    Returns:
+        (Trajectory): transformed trajectory
+    """
+    from .trajectory import Trajectory
+    if isinstance(xs, Trajectory):
+        if xs.velocities is not None:
+            positions, velocities = frame.apply(xs.positions, times=xs.times, velocities=xs.velocities)
+        else:
+            positions, velocities = frame.apply(xs.positions, times=xs.times), None
+        return Trajectory(positions, velocities=velocities, times=xs.times)
+    # stacked coordinates are a new array, so transform them in place
+    positions = np.zeros((len(xs), 3))
+    positions[:, 0] = xs
+    positions[:, 1] = ys
+    if zs is not None:
+        positions[:, 2] = zs
+    return Trajectory(frame.apply(positions, out=positions))
@@ -0,0 +1,184 @@
+"""
+Parallel rendering of grids of trajectory panels into one image
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .bounds import AxesBounds
+from .profiling import instrument
+
+
+# per-process panel state, populated by `_init_grid_worker`
+_WORKER = {}
+
+
+def _init_grid_worker(options, points_name, points_shape, offsets, image_name, image_shape):
+    """Attach to shared input and output buffers, and create the figure reused for all panels of a process"""
+    from ._worker import WorkerFigure
+
+    shm_points = shared_memory.SharedMemory(name=points_name)
+    shm_image = shared_memory.SharedMemory(name=image_name)
+    _WORKER.clear()
+    _WORKER.update(
+        options=options,
+        figure=WorkerFigure(options["figsize"], dpi=options["dpi"]),
+        offsets=offsets,
+        # keep handles alive as long as the views are used
+        shm=(shm_points, shm_image),
+        points=np.ndarray(points_shape, dtype=float, buffer=shm_points.buf),
+        image=np.ndarray(image_shape, dtype=np.uint8, buffer=shm_image.buf),
+    )
+
+
+def _render_panels(panels):
+    """Render panels into their tiles of the shared output image
+
+    Returns:
+        (int): number of rendered panels
+    """
+    from .bounds import get_axes_bounds
+    from .helper2d import quickplot2
+    from .helper3d import quickplot3, plot_sphere_wireframe, get_circle_coordinates
+
+    options = _WORKER["options"]
+    offsets = _WORKER["offsets"]
+    points = _WORKER["points"]
+    image = _WORKER["image"]
+    dim, (height, width), ncols = options["dim"], options["panel_pixels"], options["ncols"]
+    figure = _WORKER["figure"]
+    for i in panels:
+        positions = points[offsets[i]:offsets[i+1]]
+        ax = figure.get_axes(dim)
+        if options["limits"] is not None:
+            # start from the bounds of all panels, so that every panel gets the same equal-axis limits
+            get_axes_bounds(ax, dim=dim).update(np.transpose(options["limits"]))
+        if dim == 3:
+            if options["radius"] is not None:
+                plot_sphere_wireframe(ax, options["radius"], center=options["center"], color="k", linewidth=0.5)
+            quickplot3(positions[:, 0], positions[:, 1], positions[:, 2], ax=ax, scale=options["scale"],
+                       lw_traj=options["lw_traj"], c_traj=options["c_traj"], max_points=options["max_points"])
+        else:
+            if options["radius"] is not None:
+                x_circle, y_circle = get_circle_coordinates(options["radius"], options["center"])
+                ax.plot(x_circle, y_circle, c="k", linewidth=0.5)
+            quickplot2(positions[:, 0], positions[:, 1], ax=ax, scale=options["scale"],
+                       lw_traj=options["lw_traj"], c_traj=options["c_traj"], max_points=options["max_points"])
+        if options["titles"] is not None:
+            ax.set_title(options["titles"][i], fontsize=8)
+        figure.fig.canvas.draw()
+        row, col = divmod(i, ncols)
+        image[row*height:(row+1)*height, col*width:(col+1)*width] = np.asarray(figure.fig.canvas.buffer_rgba())
+    return len(panels)
+
+
+@instrument
+def render_grid(
+        trajs,
+        filename=None,
+        ncols=None,
+        dim=3,
+        panel_size=2.0,
+        dpi=100,
+        shared_limits=False,
+        scale=1.0,
+        lw_traj=0.5,
+        c_traj="navy",
+        radius=None,
+        center=None,
+        titles=None,
+        max_points=None,
+        n_workers=None,
+    ):
+    """Render one quickplot panel per trajectory into a single image, with panels rendered on the Agg backend
+    by a pool of processes. Trajectories are passed to the processes through one shared memory buffer, and
+    each process draws its panels directly into their tiles of a shared output image, so neither trajectories
+    nor pixels are pickled.
+
+    Args:
+        trajs (ndarray or list): array of shape (K,N,D), list of K arrays of shape (N_i,D), or list of `Trajectory`
+        filename (str): if provided, image is saved to this file
+        ncols (int): number of panels per row; if None, set to ceil(sqrt(K))
+        dim (int): 2 for `quickplot2` or 3 for `quickplot3` panels
+        panel_size (float): size of each square panel in inches
+        dpi (int): resolution of panels
+        shared_limits (bool): whether all panels use the same equal-axis limits, covering all trajectories
+        scale (float): scaling factor along x,y,z
+        lw_traj (float): linewidth for trajectories
+        c_traj (str): color for trajectories
+        radius (float): radius of sphere (or circle in 2D) at the center of each panel
+        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
+        titles (list): title of each panel
+        max_points (int): if provided, trajectories are decimated to at most `max_points` samples
+        n_workers (int): number of rendering processes; if None, set to `os.cpu_count()`; if 1, panels are rendered in the calling process
+
+    Returns:
+        (ndarray): image of shape (nrows*H, ncols*W, 4), with panels of H x W pixels
+    """
+    trajs = [np.asarray(getattr(traj, "positions", traj), dtype=float) for traj in trajs]
+    assert all(traj.ndim == 2 and traj.shape[1] >= dim for traj in trajs), f"trajectories must be of shape (N_i,{dim}) or (N_i,3)"
+    n_panels = len(trajs)
+    if ncols is None:
+        ncols = max(math.ceil(math.sqrt(n_panels)), 1)
+    nrows = max(math.ceil(n_panels / ncols), 1)
+    # same truncation as the Agg canvas size
+    pixels = int(panel_size*dpi)
+    image_shape = (nrows*pixels, ncols*pixels, 4)
+    offsets = np.zeros(n_panels + 1, dtype=np.intp)
+    np.cumsum([len(traj) for traj in trajs], out=offsets[1:])
+
+    limits = None
+    if shared_limits is True:
+        bounds = AxesBounds(dim=dim)
+        for traj in trajs:
+            bounds.update(traj[:, 0:dim])
+        limits = bounds.limits
+    options = dict(
+        dim=dim, figsize=panel_size, dpi=dpi, panel_pixels=(pixels, pixels), ncols=ncols, limits=limits,
+        scale=scale, lw_traj=lw_traj, c_traj=c_traj, radius=radius, center=center, titles=titles,
+        max_points=max_points,
+    )
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(min(n_workers, n_panels), 1)
+
+    points_shape = (int(offsets[-1]), dim)
+    shm_points = shared_memory.SharedMemory(create=True, size=max(int(np.prod(points_shape))*8, 1))
+    shm_image = shared_memory.SharedMemory(create=True, size=int(np.prod(image_shape)))
+    try:
+        # fill shared trajectory buffer once, and start from a white page
+        points = np.ndarray(points_shape, dtype=float, buffer=shm_points.buf)
+        for i, traj in enumerate(trajs):
+            points[offsets[i]:offsets[i+1]] = traj[:, 0:dim]
+        image = np.ndarray(image_shape, dtype=np.uint8, buffer=shm_image.buf)
+        image.fill(255)
+        initargs = (options, shm_points.name, points_shape, offsets, shm_image.name, image_shape)
+        # interleaved panel chunks, several per process to balance uneven trajectory lengths
+        n_chunks = min(4*n_workers, n_panels)
+        chunks = [list(range(start, n_panels, n_chunks)) for start in range(n_chunks)]
+
+        if n_workers == 1:
+            _init_grid_worker(*initargs)
+            for chunk in chunks:
+                _render_panels(chunk)
+            _WORKER.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_grid_worker, initargs=initargs) as pool:
+                for future in [pool.submit(_render_panels, chunk) for chunk in chunks]:
+                    future.result()
+        result = image.copy()
+        del points, image
+    finally:
+        shm_points.close()
+        shm_points.unlink()
+        shm_image.close()
+        shm_image.unlink()
+
+    if filename is not None:
+        from matplotlib.image import imsave
+        imsave(filename, result)
+    return result
@@ -3,22 +3,29 @@
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
-from .helper3d import set_equal_axis
+from .bounds import get_axes_bounds
+from .decimate import _decimate
+from .density import PROJECTIONS, accumulate_density, project_trajectories
+from .frames import transform_trajectory
+from .helper3d import get_circle_coordinates
+from .profiling import instrument, phase
+from .trajectory import _as_trajectory_list, unpack_coordinates
 
-def quickplot2(xs, ys, ax=None, n_figsize=5, scale=1.0,
+@instrument
+def quickplot2(xs, ys=None, ax=None, n_figsize=5, scale=1.0,
         lw_traj=0.75, c_traj="navy", 
         radius: float=None, center=None,
         scatter_start=True, marker_start="x", c_start="r", 
-        scatter_end=True, marker_end="*", c_end="g"):
+        scatter_end=True, marker_end="*", c_end="g",
+        max_points=None, decimate="minmax", verbose=False, pyramid=False, frame=None, events=None):
     """Plot 2D trajectory around body. 
     If `ax` is not provided, a new `matplotlib` trajectory is initialized. 
-    If `ax` is provided, the trajectory is appended. 
+    If `ax` is provided, the trajectory is appended, and equal-axis limits are extended to include it. 
     
     Args:
-        xs (ndarray): x-coordinates of trajectory
-        ys (ndarray): y-coordinates of trajectory
+        xs (ndarray or Trajectory): x-coordinates of trajectory, or `Trajectory` whose x,y-coordinates are plotted
+        ys (ndarray): y-coordinates of trajectory, not needed if `xs` is a `Trajectory`
         ax (Axes3DSubplot): matplotlib 3D axis, created by `ax = fig.add_subplot(projection='3d')`. If set to None, new set of axis is created. 
         n_figsize (int): fig_size is set to (n_figsize, n_figsize)
         scale (float): scaling factor along x,y,z direction
@@ -32,45 +39,194 @@ def quickplot2(xs, ys, ax=None, n_figsize=5, scale=1.0,
         scatter_end (bool): whether to plot marker at the end of trajectory
         marker_end (str): marker at the end of trajectory
         c_end (str): marker color at the end of trajectory
+        max_points (int): if provided, trajectory line is decimated to at most `max_points` samples, from bins of equal sample count; markers use exact start/end
+        decimate (str): decimation method, "minmax" or "rdp"
+        verbose (bool): whether to log how many points were dropped by decimation, at INFO level of the `logging` module
+        pyramid (bool): whether to draw the trajectory from a min/max pyramid re-sampled on every pan or zoom with `attach_pyramid`, instead of decimating with `max_points`
+        frame (FrameTransform): if provided, trajectory is transformed before plotting its x,y-coordinates; time-dependent transformations require a `Trajectory` with time-stamps
+        events (bool or list): if True, apsides and closest approach to `center` (and node crossings if `xs` is a `Trajectory`) are marked with `find_events`; if a list, only the listed event kinds
     """
-    if ax is None:
-        fig = plt.figure(figsize=(n_figsize,n_figsize))
-        ax = fig.add_subplot()
-        # reference sphere around asteroid
-        if radius is not None:
-            x_circle, y_circle = get_circle_coordinates(radius, center)
-            ax.plot(x_circle, y_circle, c="k", linewidth=0.5)
-        # equal size grid
-        xlims = [min(xs), max(xs)]
-        ylims = [min(ys), max(ys)]
-        zlims = [min(ys), max(ys)]  # place-holder
-        set_equal_axis(ax, xlims, ylims, zlims, scale, dim3=False)
-    else:
-        fig = None
-    # plot trajectory
-    ax.plot(xs, ys, linewidth=lw_traj, c=c_traj, zorder=1)
-    # scatter at the beginning/end of trajectory
-    if scatter_start is True:
-        ax.scatter(xs[0], ys[0], marker=marker_start, c=c_start, zorder=2)
-    if scatter_end is True:
-        ax.scatter(xs[-1], ys[-1], marker=marker_end, c=c_end, zorder=2)
+    if frame is not None:
+        xs = transform_trajectory(frame, xs, ys)
+    xs, ys, _, traj = unpack_coordinates(xs, ys)
+    with phase("figure"):
+        if ax is None:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(n_figsize,n_figsize))
+            ax = fig.add_subplot()
+            # reference sphere around asteroid
+            if radius is not None:
+                x_circle, y_circle = get_circle_coordinates(radius, center)
+                ax.plot(x_circle, y_circle, c="k", linewidth=0.5)
+        else:
+            fig = None
+    # equal size grid, extended with trajectories already plotted on the axis
+    with phase("bounds", len(xs)):
+        bounds = get_axes_bounds(ax, dim=2)
+        bounds.update((xs, ys) if traj is None else traj.bounds[:, 0:2])
+        bounds.apply(ax, scale)
+        points = None if traj is None else traj.positions[:, 0:2]
+    with phase("artists", len(xs)):
+        if pyramid is True:
+            from .pyramid import attach_pyramid
+            # plot trajectory re-sampled to the view at draw time, after changes of axis limits
+            line = ax.plot([], [], linewidth=lw_traj, c=c_traj, zorder=1)[0]
+            attach_pyramid(ax, line, np.stack([xs, ys], axis=1) if points is None else points)
+        else:
+            # decimate trajectory
+            xs_plot, ys_plot = _decimate((xs, ys), max_points, decimate, verbose, points=points)
+            # plot trajectory
+            ax.plot(xs_plot, ys_plot, linewidth=lw_traj, c=c_traj, zorder=1)
+        # scatter at the beginning/end of trajectory
+        if scatter_start is True:
+            ax.scatter(xs[0], ys[0], marker=marker_start, c=c_start, zorder=2)
+        if scatter_end is True:
+            ax.scatter(xs[-1], ys[-1], marker=marker_end, c=c_end, zorder=2)
+        # one scatter per event kind, found on the full-resolution trajectory
+        if events is not None and events is not False:
+            from .events import EVENT_KINDS, find_events, plot_events
+            if traj is None:
+                kinds = [kind for kind in EVENT_KINDS if "node" not in kind] if events is True else events
+                found = find_events(np.stack([xs, ys], axis=1), center=center, kinds=kinds)
+            else:
+                found = find_events(traj, center=center, kinds=EVENT_KINDS if events is True else events)
+            plot_events(ax, found, dim=2)
     # return Axes3DSubplot object
     return fig, ax
 
 
-def get_circle_coordinates(radius, center=None, n=50):
-    """Get x,y,z coordinates for circle
-    
+@instrument
+def quickplot2_many(trajs, ax=None, n_figsize=5, scale=1.0,
+        lw_traj=0.75, c_traj="navy", cycle_colors=False,
+        radius: float=None, center=None, label=None,
+        scatter_start=True, marker_start="x", c_start="r", 
+        scatter_end=True, marker_end="*", c_end="g"):
+    """Plot ensemble of 2D trajectories around body as a single `LineCollection`.
+    Start and end markers of all trajectories are drawn as one scatter artist each,
+    so that the number of artists does not grow with the number of trajectories. 
+    If `ax` is not provided, a new `matplotlib` trajectory is initialized. 
+    If `ax` is provided, the trajectories are appended, and equal-axis limits are extended to include them. 
+
+    Args:
+        trajs (ndarray or list): array of shape (K,N,2), or list of K arrays of shape (N_i,2)
+        ax (Axes): matplotlib axis. If set to None, new set of axis is created. 
+        n_figsize (int): fig_size is set to (n_figsize, n_figsize)
+        scale (float): scaling factor along x,y
+        lw_traj (float): linewidth for trajectories
+        c_traj (str or list): color for all trajectories, or list of colors for each trajectory
+        cycle_colors (bool): whether to color trajectories with `cycle_color`, overriding `c_traj`
+        radius (float): radius of circle at the center
+        center (list): x,y coordinates of center, if None set to [0.0, 0.0]
+        label (str): label of trajectories collection
+        scatter_start (bool): whether to plot marker at the beginning of trajectories
+        marker_start (str): marker at the beginning of trajectories
+        c_start (str): marker color at the beginning of trajectories
+        scatter_end (bool): whether to plot marker at the end of trajectories
+        marker_end (str): marker at the end of trajectories
+        c_end (str): marker color at the end of trajectories
+
+    Returns:
+        (tuple): fig, ax
+    """
+    from matplotlib.collections import LineCollection
+    from .linecolor import cycle_color
+
+    trajs, starts, ends = _as_trajectory_list(trajs, dim=2)
+    with phase("figure"):
+        if ax is None:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(n_figsize,n_figsize))
+            ax = fig.add_subplot()
+            # reference sphere around asteroid
+            if radius is not None:
+                x_circle, y_circle = get_circle_coordinates(radius, center)
+                ax.plot(x_circle, y_circle, c="k", linewidth=0.5)
+        else:
+            fig = None
+    # equal size grid, set once after adding all trajectories to the bounds
+    with phase("bounds"):
+        bounds = get_axes_bounds(ax, dim=2)
+        for traj in trajs:
+            bounds.update(traj)
+        bounds.apply(ax, scale)
+    # plot trajectories as single collection
+    with phase("artists"):
+        if cycle_colors is True:
+            c_traj = cycle_color(len(trajs))
+        lc = LineCollection(trajs, linewidths=lw_traj, colors=c_traj, label=label, zorder=1)
+        ax.add_collection(lc, autolim=False)
+        # scatter at the beginning/end of trajectories
+        if scatter_start is True:
+            ax.scatter(starts[:, 0], starts[:, 1], marker=marker_start, c=c_start, zorder=2)
+        if scatter_end is True:
+            ax.scatter(ends[:, 0], ends[:, 1], marker=marker_end, c=c_end, zorder=2)
+    return fig, ax
+
+
+@instrument
+def quickplot2_density(trajs, ax=None, n_figsize=5, scale=1.0, projection="xy",
+        resolution=512, norm="log", cmap="viridis", colorbar=False,
+        radius: float=None, center=None, chunk_size=1000000, n_threads=None):
+    """Plot density of an ensemble of trajectories as a single image, for ensembles too large for line artists.
+    Segments are rasterized onto a grid spanning the equal-axis limits with `accumulate_density`,
+    and 3D trajectories are projected onto the plane given by `projection`. 
+    If `ax` is not provided, a new `matplotlib` trajectory is initialized. 
+    If `ax` is provided, equal-axis limits are extended to include the trajectories. 
+
     Args:
-        radius (float): radius
-        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0]
+        trajs (ndarray or list): array of shape (K,N,D), or list of K arrays of shape (N_i,D), with D equal to 2 or 3
+        ax (Axes): matplotlib axis. If set to None, new set of axis is created. 
+        n_figsize (int): fig_size is set to (n_figsize, n_figsize)
+        scale (float): scaling factor along x,y
+        projection (str): plane to project 3D trajectories onto, "xy", "xz", or "yz"
+        resolution (int): number of grid cells along the horizontal axis
+        norm (str): color scale, "log" or "linear"
+        cmap (str): colormap
+        colorbar (bool): whether to add a colorbar
+        radius (float): radius of circle at the center
+        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
+        chunk_size (int): number of segments rasterized at once
+        n_threads (int): number of threads accumulating chunks; if None, chunks are accumulated in the calling thread; if 0, set to `os.cpu_count()`
+
+    Returns:
+        (tuple): fig, ax, `AxesImage` of density
     """
-    # check if center is provided
-    if center is None:
-        center = [0.0, 0.0]
-    thetas = np.linspace(0, 2*np.pi, n)
-    x_circle, y_circle = [], []
-    for theta in thetas:
-        x_circle.append(center[0] + radius*np.cos(theta))
-        y_circle.append(center[1] + radius*np.sin(theta))
-    return x_circle, y_circle
+    from matplotlib.colors import LogNorm, Normalize
+
+    trajs = project_trajectories(trajs, projection=projection)
+    with phase("figure"):
+        if ax is None:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(n_figsize,n_figsize))
+            ax = fig.add_subplot()
+        else:
+            fig = None
+    # reference circle around asteroid, projected like the trajectories
+    if radius is not None:
+        if center is not None and len(center) == 3:
+            center = np.asarray(center, dtype=float)[PROJECTIONS[projection]]
+        x_circle, y_circle = get_circle_coordinates(radius, center)
+        ax.plot(x_circle, y_circle, c="k", linewidth=0.5, zorder=2)
+    # equal size grid, extended with trajectories already plotted on the axis
+    bounds = get_axes_bounds(ax, dim=2)
+    for traj in trajs:
+        bounds.update(traj)
+    bounds.apply(ax, scale)
+    xlims, ylims = ax.get_xlim(), ax.get_ylim()
+    # rasterize all trajectories into one image
+    grid = accumulate_density(trajs, xlims, ylims, resolution=resolution, chunk_size=chunk_size, n_threads=n_threads)
+    if norm == "log":
+        # empty cells are masked by the log scale and left transparent
+        norm = LogNorm()
+    elif norm == "linear":
+        norm = Normalize()
+    else:
+        raise ValueError(f"norm must be 'log' or 'linear', got {norm}")
+    image = ax.imshow(grid, origin="lower", extent=(*xlims, *ylims), norm=norm, cmap=cmap,
+                      interpolation="nearest", zorder=1)
+    # keep equal-axis limits rather than the extent of the image
+    ax.set_xlim(xlims)
+    ax.set_ylim(ylims)
+    if colorbar is True:
+        ax.figure.colorbar(image, ax=ax, label="Path length per cell [px]")
+    return fig, ax, image
@@ -2,10 +2,18 @@
 3D plots helpers
 """
 
+import os
+from functools import lru_cache
+
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from scipy.interpolate import CubicSpline
+
+from .bounds import get_axes_bounds
+from .decimate import _decimate
+from .export import export_trajectory_animation
+from .frames import transform_trajectory
+from .profiling import instrument, phase
+from .resample import resample_trajectories
+from .trajectory import Trajectory, _as_trajectory_list, unpack_coordinates
 
 
 def set_equal_axis(ax, xlims, ylims, zlims, scale=1.0, dim3=True):
@@ -35,12 +43,31 @@ def set_equal_axis(ax, xlims, ylims, zlims, scale=1.0, dim3=True):
     return
 
 
-def get_sphere_coordinates(radius, center=None):
+@lru_cache(maxsize=32)
+def _unit_sphere_mesh(n_u, n_v):
+    """Get read-only x,y,z coordinates of unit sphere mesh, of shape (3,n_u,n_v), memoized per resolution"""
+    u, v = np.mgrid[0:2*np.pi:n_u*1j, 0:np.pi:n_v*1j]
+    mesh = np.array([np.cos(u)*np.sin(v), np.sin(u)*np.sin(v), np.broadcast_to(np.cos(v), u.shape)])
+    mesh.setflags(write=False)
+    return mesh
+
+
+@lru_cache(maxsize=32)
+def _unit_circle(n):
+    """Get read-only x,y coordinates of unit circle, of shape (2,n), memoized per resolution"""
+    thetas = np.linspace(0, 2*np.pi, n)
+    circle = np.array([np.cos(thetas), np.sin(thetas)])
+    circle.setflags(write=False)
+    return circle
+
+
+def get_sphere_coordinates(radius, center=None, n=20):
     """Get x,y,z coordinates for sphere
 
     Args:
         radius (float): sphere radius
         center (list): x,y,z coordinates of center; if None, set to [0.0, 0.0, 0.0]
+        n (int): number of points along longitude; n//2 points are used along latitude
     
     Returns:
         (tuple): x, y, z coordinates of sphere
@@ -48,35 +75,31 @@ def get_sphere_coordinates(radius, center=None):
     # check if center is provided
     if center is None:
         center = [0.0, 0.0, 0.0]
-    # construct reference sphere
-    u, v = np.mgrid[0:2*np.pi:20j, 0:np.pi:10j]
-    #u, v = np.mgrid[0:2*np.pi:20j, 0:np.pi:10j]
-    x_sphere = center[0] + radius*np.cos(u)*np.sin(v)
-    y_sphere = center[1] + radius*np.sin(u)*np.sin(v)
-    z_sphere = center[2] + radius*np.cos(v)
+    # construct reference sphere from cached unit mesh
+    x_sphere, y_sphere, z_sphere = np.reshape(center, (3,1,1)) + radius*_unit_sphere_mesh(n, n//2)
     return x_sphere, y_sphere, z_sphere
 
 
-
 def get_circle_coordinates(radius, center=None, n=50):
-    """Get x,y,z coordinates for circle
+    """Get x,y coordinates for circle
     
     Args:
         radius (float): radius
-        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0]
+        center (list): x,y coordinates of center, if None set to [0.0, 0.0]
+        n (int): number of points along circle
+
+    Returns:
+        (tuple): x, y coordinates of circle
     """
     # check if center is provided
     if center is None:
         center = [0.0, 0.0]
-    thetas = np.linspace(0, 2*np.pi, n)
-    x_circle, y_circle = [], []
-    for theta in thetas:
-        x_circle.append(center[0] + radius*np.cos(theta))
-        y_circle.append(center[1] + radius*np.sin(theta))
+    x_circle, y_circle = np.reshape(center[0:2], (2,1)) + radius*_unit_circle(n)
     return x_circle, y_circle
 
 
-def plot_sphere_wireframe(ax, radius, center=None, color="k", linewidth=0.5):
+@instrument
+def plot_sphere_wireframe(ax, radius, center=None, color="k", linewidth=0.5, n=20):
     """Plot sphere wireframe
     
     Args:
@@ -85,8 +108,9 @@ def plot_sphere_wireframe(ax, radius, center=None, color="k", linewidth=0.5):
         center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
         color (str): color of wireframe
         linewidth (float): linewidth of wireframe
+        n (int): number of points along longitude; n//2 points are used along latitude
     """
-    x_sphere, y_sphere, z_sphere = get_sphere_coordinates(radius, center)
+    x_sphere, y_sphere, z_sphere = get_sphere_coordinates(radius, center, n=n)
     ax.plot_wireframe(x_sphere, y_sphere, z_sphere, color=color, linewidth=linewidth)
     return
 
@@ -107,18 +131,12 @@ def get_ellipsoid_coordinates(rx, ry, rz, center=None, n=60):
     # check if center is provided
     if center is None:
         center = [0.0, 0.0, 0.0]
-
-    # grid setup
-    u = np.linspace(0, 2 * np.pi, n)
-    v = np.linspace(0, np.pi, n)
-
-    # Cartesian coordinates of ellipsoid
-    x_el = center[0] + rx * np.outer(np.cos(u), np.sin(v))
-    y_el = center[1] + ry * np.outer(np.sin(u), np.sin(v))
-    z_el = center[2] +rz * np.outer(np.ones_like(u), np.cos(v))
+    # scale cached unit mesh along each axis
+    x_el, y_el, z_el = np.reshape(center, (3,1,1)) + np.reshape([rx, ry, rz], (3,1,1))*_unit_sphere_mesh(n, n)
     return x_el, y_el, z_el
 
 
+@instrument
 def plot_ellipsoid_wireframe(ax, rx, ry, rz, center=None, color="k", linewidth=0.5, n=60):
     """Plot ellipsoid wireframe
 
@@ -137,21 +155,24 @@ def plot_ellipsoid_wireframe(ax, rx, ry, rz, center=None, color="k", linewidth=0
     return
 
 
-def quickplot3(xs, ys, zs, ax=None, n_figsize=5, scale=1.0,
+@instrument
+def quickplot3(xs, ys=None, zs=None, ax=None, n_figsize=5, scale=1.0,
         lw_traj=0.75, c_traj="navy", 
         radius: float=None, center=None, label=None,
         scatter_start=True, marker_start="x", c_start="r", 
         scatter_end=True, marker_end="*", c_end="g",
         background=False,
-        facecolor=None):
+        facecolor=None,
+        max_points=None, decimate="minmax", verbose=False, pyramid=False, occlude=False, frame=None,
+        events=None, radii=None, scene=None):
     """Plot 3D trajectory around body. 
     If `ax` is not provided, a new `matplotlib` trajectory is initialized. 
-    If `ax` is provided, the trajectory is appended. 
+    If `ax` is provided, the trajectory is appended, and equal-axis limits are extended to include it. 
     
     Args:
-        xs (ndarray): x-coordinates of trajectory
-        ys (ndarray): y-coordinates of trajectory
-        zs (ndarray): z-coordinates of trajectory
+        xs (ndarray or Trajectory): x-coordinates of trajectory, or `Trajectory`
+        ys (ndarray): y-coordinates of trajectory, not needed if `xs` is a `Trajectory`
+        zs (ndarray): z-coordinates of trajectory, not needed if `xs` is a `Trajectory`
         ax (Axes3DSubplot): matplotlib 3D axis, created by `ax = fig.add_subplot(projection='3d')`. If set to None, new set of axis is created. 
         n_figsize (int): fig_size is set to (n_figsize, n_figsize)
         scale (float): scaling factor along x,y,z
@@ -166,32 +187,81 @@ def quickplot3(xs, ys, zs, ax=None, n_figsize=5, scale=1.0,
         marker_end (str): marker at the end of trajectory
         c_end (str): marker color at the end of trajectory
         background (bool): whether to plot gray box at the background
+        max_points (int): if provided, trajectory line is decimated to at most `max_points` samples, from bins of equal sample count; markers use exact start/end
+        decimate (str): decimation method, "minmax" or "rdp"
+        verbose (bool): whether to log how many points were dropped by decimation, at INFO level of the `logging` module
+        pyramid (bool): whether to draw the trajectory from a min/max pyramid re-sampled on every pan or zoom with `attach_pyramid`, instead of decimating with `max_points`
+        occlude (bool): whether to draw parts of the trajectory behind or inside the sphere of `radius` (or ellipsoid of `radii`) as a separate faded line, updated when the view changes; not used with `pyramid`, and not applied by `animate_trajectory_3d`
+        frame (FrameTransform): if provided, trajectory is transformed before plotting; time-dependent transformations require a `Trajectory` with time-stamps
+        events (bool or list): if True, apsides, node crossings, and closest approach to `center` are marked with `find_events`; if a list, only the listed event kinds
+        radii (list): radii of ellipsoid along x,y,z at the center, drawn and used for occlusion instead of the sphere of `radius`
+        scene (SceneTemplate): if provided, the trajectory is rendered on top of the cached background of this scene template
+            (see `get_scene_template`), whose figure and axis are returned; `ax`, the body, limits, and view arguments are not used
     """
-    if ax is None:
-        fig = plt.figure(figsize=(n_figsize,n_figsize))
-        ax = fig.add_subplot(projection='3d')
-        # reference sphere around asteroid
-        if radius is not None:
-            plot_sphere_wireframe(ax, radius, center=center, color="k", linewidth=0.5)
-        # equal size grid
-        xlims = [min(xs), max(xs)]
-        ylims = [min(ys), max(ys)]
-        zlims = [min(zs), max(zs)]
-        set_equal_axis(ax, xlims, ylims, zlims, scale)
-    else:
-        fig = None
-    # plot trajectory
-    ax.plot(xs, ys, zs, linewidth=lw_traj, c=c_traj, label=label)
-    # scatter at the beginning/end of trajectory
-    if scatter_end is True:
-        ax.scatter(xs[0], ys[0], zs[0], marker=marker_start, c=c_start)
-    if scatter_end is True:
-        ax.scatter(xs[-1], ys[-1], zs[-1], marker=marker_end, c=c_end)
+    if frame is not None:
+        xs = transform_trajectory(frame, xs, ys, zs)
+    xs, ys, zs, traj = unpack_coordinates(xs, ys, zs)
+    assert occlude is False or radius is not None or radii is not None, "radius or radii is required to occlude trajectory"
+    if scene is not None:
+        assert pyramid is False and occlude is False and events in (None, False), "scene does not support pyramid, occlude, or events"
+        # static background is already rendered, only the trajectory is drawn
+        with phase("artists", len(xs)):
+            xs_plot, ys_plot, zs_plot = _decimate((xs, ys, zs), max_points, decimate, verbose,
+                                                  points=None if traj is None else traj.positions)
+            scene.render(xs_plot, ys_plot, zs_plot, lw_traj=lw_traj, c_traj=c_traj,
+                         scatter_start=scatter_start, marker_start=marker_start, c_start=c_start,
+                         scatter_end=scatter_end, marker_end=marker_end, c_end=c_end)
+        return scene.fig, scene.ax
+    with phase("figure"):
+        if ax is None:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(n_figsize,n_figsize))
+            ax = fig.add_subplot(projection='3d')
+            # reference sphere or ellipsoid around asteroid
+            if radii is not None:
+                plot_ellipsoid_wireframe(ax, *radii, center=center, color="k", linewidth=0.5)
+            elif radius is not None:
+                plot_sphere_wireframe(ax, radius, center=center, color="k", linewidth=0.5)
+        else:
+            fig = None
+    # equal size grid, extended with trajectories already plotted on the axis
+    with phase("bounds", len(xs)):
+        bounds = get_axes_bounds(ax, dim=3)
+        bounds.update((xs, ys, zs) if traj is None else traj.bounds)
+        bounds.apply(ax, scale)
+        points = None if traj is None else traj.positions
+    with phase("artists", len(xs)):
+        if pyramid is True:
+            from .pyramid import attach_pyramid
+            # plot trajectory re-sampled to the view at draw time, after changes of axis limits
+            line = ax.plot(xs[0:1], ys[0:1], zs[0:1], linewidth=lw_traj, c=c_traj, label=label)[0]
+            attach_pyramid(ax, line, np.stack([xs, ys, zs], axis=1) if points is None else points)
+        else:
+            # decimate trajectory
+            xs_plot, ys_plot, zs_plot = _decimate((xs, ys, zs), max_points, decimate, verbose, points=points)
+            # plot trajectory
+            if occlude is True:
+                from .occlusion import plot_occluded
+                plot_occluded(ax, np.stack([xs_plot, ys_plot, zs_plot], axis=1), radius if radii is None else radii, center=center,
+                              linewidth=lw_traj, c=c_traj, label=label)
+            else:
+                ax.plot(xs_plot, ys_plot, zs_plot, linewidth=lw_traj, c=c_traj, label=label)
+        # scatter at the beginning/end of trajectory
+        if scatter_start is True:
+            ax.scatter(xs[0], ys[0], zs[0], marker=marker_start, c=c_start)
+        if scatter_end is True:
+            ax.scatter(xs[-1], ys[-1], zs[-1], marker=marker_end, c=c_end)
+        # one scatter per event kind, found on the full-resolution trajectory
+        if events is not None and events is not False:
+            from .events import EVENT_KINDS, find_events, plot_events
+            kinds = EVENT_KINDS if events is True else events
+            found = find_events(np.stack([xs, ys, zs], axis=1) if traj is None else traj, center=center, kinds=kinds)
+            plot_events(ax, found, dim=3)
     # turn off background
     if background is False:
-        ax.w_xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        ax.w_yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        ax.w_zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        ax.xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        ax.yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        ax.zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
     if facecolor is not None:
         ax.set_facecolor(facecolor)
         fig.set_facecolor(facecolor)
@@ -199,11 +269,87 @@ def quickplot3(xs, ys, zs, ax=None, n_figsize=5, scale=1.0,
     return fig, ax
 
 
+@instrument
+def quickplot3_many(trajs, ax=None, n_figsize=5, scale=1.0,
+        lw_traj=0.75, c_traj="navy", cycle_colors=False,
+        radius: float=None, center=None, label=None,
+        scatter_start=True, marker_start="x", c_start="r", 
+        scatter_end=True, marker_end="*", c_end="g",
+        background=False):
+    """Plot ensemble of 3D trajectories around body as a single `Line3DCollection`.
+    Start and end markers of all trajectories are drawn as one scatter artist each,
+    so that the number of artists does not grow with the number of trajectories. 
+    If `ax` is not provided, a new `matplotlib` trajectory is initialized. 
+    If `ax` is provided, the trajectories are appended, and equal-axis limits are extended to include them. 
+
+    Args:
+        trajs (ndarray or list): array of shape (K,N,3), or list of K arrays of shape (N_i,3)
+        ax (Axes3DSubplot): matplotlib 3D axis, created by `ax = fig.add_subplot(projection='3d')`. If set to None, new set of axis is created. 
+        n_figsize (int): fig_size is set to (n_figsize, n_figsize)
+        scale (float): scaling factor along x,y,z
+        lw_traj (float): linewidth for trajectories
+        c_traj (str or list): color for all trajectories, or list of colors for each trajectory
+        cycle_colors (bool): whether to color trajectories with `cycle_color`, overriding `c_traj`
+        radius (float): radius of sphere at the center
+        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
+        label (str): label of trajectories collection
+        scatter_start (bool): whether to plot marker at the beginning of trajectories
+        marker_start (str): marker at the beginning of trajectories
+        c_start (str): marker color at the beginning of trajectories
+        scatter_end (bool): whether to plot marker at the end of trajectories
+        marker_end (str): marker at the end of trajectories
+        c_end (str): marker color at the end of trajectories
+        background (bool): whether to plot gray box at the background
+
+    Returns:
+        (tuple): fig, ax
+    """
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
+    from .linecolor import cycle_color
+
+    trajs, starts, ends = _as_trajectory_list(trajs, dim=3)
+    with phase("figure"):
+        if ax is None:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(n_figsize,n_figsize))
+            ax = fig.add_subplot(projection='3d')
+            # reference sphere around asteroid
+            if radius is not None:
+                plot_sphere_wireframe(ax, radius, center=center, color="k", linewidth=0.5)
+        else:
+            fig = None
+    # equal size grid, set once after adding all trajectories to the bounds
+    with phase("bounds"):
+        bounds = get_axes_bounds(ax, dim=3)
+        for traj in trajs:
+            bounds.update(traj)
+        bounds.apply(ax, scale)
+    # plot trajectories as single collection
+    with phase("artists"):
+        if cycle_colors is True:
+            c_traj = cycle_color(len(trajs))
+        lc = Line3DCollection(trajs, linewidths=lw_traj, colors=c_traj, label=label)
+        ax.add_collection3d(lc)
+        # scatter at the beginning/end of trajectories
+        if scatter_start is True:
+            ax.scatter(starts[:, 0], starts[:, 1], starts[:, 2], marker=marker_start, c=c_start)
+        if scatter_end is True:
+            ax.scatter(ends[:, 0], ends[:, 1], ends[:, 2], marker=marker_end, c=c_end)
+    # turn off background
+    if background is False:
+        ax.xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        ax.yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        ax.zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+    # return Axes3DSubplot object
+    return fig, ax
+
+
+@instrument
 def animate_trajectory_3d(
         xs, 
-        ys, 
-        zs, 
-        times, 
+        ys=None, 
+        zs=None, 
+        times=None, 
         nt=100, 
         multiple_traj=False, 
         scale=1.2, 
@@ -213,117 +359,124 @@ def animate_trajectory_3d(
         repeat_delay=0, 
         fps=20, 
         lw_traj=0.5, 
-        c_traj='navy'
+        c_traj='navy',
+        method="cubic",
+        velocities=None,
+        n_workers=None,
+        trail_length=None,
+        marker="o",
+        cache_frames=None,
+        frame=None,
     ):
-    """Animate trajectory in 3D using `matplotlib.animation.FuncAnimation`
+    """Animate trajectory in 3D using a single blitted `TrajectoryAnimator`.
+    Unlike `quickplot3` with `occlude`, trajectories are drawn in full, without occlusion by a central body.
 
     Args:
-        xs (lst): list or list of multiple trajectories' list of x-coordinates
-        ys (lst): list or list of multiple trajectories' list of y-coordinates
-        zs (lst): list or list of multiple trajectories' list of z-coordinates
-        times (lst): list of time-stamps corresponding to states xs, ys, zs
+        xs (lst): list or list of multiple trajectories' list of x-coordinates, or `Trajectory` (list of `Trajectory` if `multiple_traj` is True)
+        ys (lst): list or list of multiple trajectories' list of y-coordinates, not needed if `xs` is a `Trajectory`
+        zs (lst): list or list of multiple trajectories' list of z-coordinates, not needed if `xs` is a `Trajectory`
+        times (lst): list of time-stamps corresponding to states xs, ys, zs; if None, time-stamps of the `Trajectory` are used
         nt (int): number of steps to use for interpolating and creating animation
         multiple_traj (bool): whether xs,ys,zs are lists (False) or lists of lists (True)
+        c_traj (str, tuple, or list): color for trajectory, or list of colors if `multiple_traj` is True
         scale (float): scaling for setting limits on axis
         fig (matplot): if previous figure has been created
-        filename (str): FIXME!! saving gif file, not supported for multiple animations
+        filename (str): if provided, animation is exported with `export_trajectory_animation`; ".gif" is appended if there is no extension;
+            ".tplb" exports the interpolated trajectories as a bundle with `export_bundle`, and ".html" additionally writes a viewer with the bundle embedded
+        method (str): interpolation method, "linear", "cubic", or "hermite"
+        velocities (ndarray): velocities of shape (N,3), or (K,N,3) if `multiple_traj` is True; required for "hermite"
+        n_workers (int): number of processes rendering frames when exporting to `filename`
+        trail_length (int): if provided, only the most recent `trail_length` segments are shown, fading out along the trail
+        marker (str): marker at the current position, shown if `trail_length` is provided; if None, no marker is drawn
+        cache_frames (int): if provided, up to `cache_frames` rendered frames are cached, so that loops and `seek` restore them instead of re-rendering
+        frame (FrameTransform): if provided, interpolated trajectories are transformed in place before plotting
         
     Returns:
-        (tuple): fig, ax, list of animations
+        (tuple): fig, ax, `TrajectoryAnimator` animating all trajectories; with `multiple_traj`, this single animator
+            replaces the list of one `FuncAnimation` per trajectory returned by earlier versions
     """
-    assert len(xs) == len(ys) == len(zs) == len(times), "xs, ys, zs, and times must be of equal length"
-
-    # clean up data if time is not strictly increasing
-    ordered_time = all(i < j for i, j in zip(times, times[1:]))
-    if ordered_time == False:
-        t_ordered, xs_ordered, ys_ordered, zs_ordered = [], [], [], []
-        if multiple_traj is False:
-            assert len(times) == len(xs) == len(ys) == len(zs)
-            for j in range(len(times)-1):
-                if times[j] < times[j+1]:  # if strictly less than next time-step
-                    t_ordered.append(times[j])
-                    xs_ordered.append( xs[j] )
-                    ys_ordered.append( ys[j] )
-                    zs_ordered.append( zs[j] )
-        else:
-            for i_traj in range(len(xs)):
-                assert len(times) == len(xs[i_traj]) == len(ys[i_traj]) == len(zs[i_traj])
-                xi_ordered, yi_ordered, zi_ordered = [], [], []
-                for j in range(len(times)-1):
-                    if times[j] < times[j+1]:  # if strictly less than next time-step
-                        if i_traj == 0:
-                            t_ordered.append(times[j])
-                        xi_ordered.append( xs[i_traj][j] )
-                        yi_ordered.append( ys[i_traj][j] )
-                        zi_ordered.append( zs[i_traj][j] )
-                xs_ordered.append( xi_ordered )
-                ys_ordered.append( yi_ordered )
-                zs_ordered.append( zi_ordered )
-
+    if isinstance(xs, Trajectory):
+        trajs = [xs]
+    elif multiple_traj is True and len(xs) > 0 and isinstance(xs[0], Trajectory):
+        trajs = list(xs)
     else:
-        t_ordered = times
-        xs_ordered = xs
-        ys_ordered = ys
-        zs_ordered = zs
-
-    # create inerpolation
-    if multiple_traj is False:
-        cxs = CubicSpline(t_ordered, xs_ordered)
-        cys = CubicSpline(t_ordered, ys_ordered)
-        czs = CubicSpline(t_ordered, zs_ordered)
-        t_interp = np.linspace(t_ordered[0], t_ordered[-1], nt)
-        xs_interp = cxs(t_interp)
-        ys_interp = cys(t_interp)
-        zs_interp = czs(t_interp)
-
+        trajs = None
+    if trajs is not None:
+        # use position arrays of trajectories directly, stacking only if there are several
+        positions = trajs[0].positions[None, :, :] if len(trajs) == 1 else np.stack([traj.positions for traj in trajs])
+        if times is None:
+            times = trajs[0].times
+        if velocities is None and all(traj.velocities is not None for traj in trajs):
+            velocities = np.stack([traj.velocities for traj in trajs])
     else:
-        xs_interp, ys_interp, zs_interp = [], [], []
-        for i_traj in range(len(xs_ordered)):
-            cxs = CubicSpline(t_ordered, xs_ordered[i_traj])
-            cys = CubicSpline(t_ordered, ys_ordered[i_traj])
-            czs = CubicSpline(t_ordered, zs_ordered[i_traj])
-            t_interp = np.linspace(times[0], times[-1], nt)
-            xs_interp.append( cxs(t_interp) )
-            ys_interp.append( cys(t_interp) )
-            zs_interp.append( czs(t_interp) )
+        # stack coordinates into array of shape (K,N,3)
+        positions = np.stack([np.asarray(xs, dtype=float), np.asarray(ys, dtype=float), np.asarray(zs, dtype=float)], axis=-1)
+        if multiple_traj is False:
+            positions = positions[None, :, :]
+    assert times is not None, "times must be provided, either directly or as time-stamps of the Trajectory"
+    if velocities is not None:
+        velocities = np.asarray(velocities, dtype=float).reshape(positions.shape)
+    assert positions.shape[1] == len(times), "xs, ys, zs, and times must be of equal length"
+
+    # remove non-monotonic time-stamps and interpolate all trajectories at once
+    t_interp, positions_interp = resample_trajectories(
+        times, positions, nt=nt, method=method, velocities=velocities
+    )
+    if frame is not None:
+        # transform only the interpolated samples, in place
+        frame.apply(positions_interp, times=t_interp, out=positions_interp)
+    from .animator import TrajectoryAnimator, plot_trail
 
     # prep base figure if none is provided
-    if fig is None:
-        fig = plt.figure()
-        ax = fig.add_subplot(111, projection='3d')
-        # set equal axis
-        if multiple_traj is False:
-            xlims = [min(xs_interp), max(xs_interp)]
-            ylims = [min(ys_interp), max(ys_interp)]
-            zlims = [min(zs_interp), max(zs_interp)]
+    with phase("figure"):
+        if fig is None:
+            import matplotlib.pyplot as plt
+            fig = plt.figure()
+            ax = fig.add_subplot(111, projection='3d')
         else:
-            xlims = [min(xs_interp[0]), max(xs_interp[0])]
-            ylims = [min(ys_interp[0]), max(ys_interp[0])]
-            zlims = [min(zs_interp[0]), max(zs_interp[0])]
-        set_equal_axis(ax, xlims, ylims, zlims, scale=scale, dim3=True)
-
-    # prep drawing funciton
-    def update_frame(num, dataSet, line):
-        # NOTE: there is no .set_data() for 3 dim data...
-        line.set_data(dataSet[0:2, :num])    
-        line.set_3d_properties(dataSet[2, :num])    
-        return line
-
-    if multiple_traj is False:
-        dataSet = np.array([xs_interp, ys_interp, zs_interp])
-        # NOTE: Can't pass empty arrays into 3d version of plot()
-        line = plt.plot(dataSet[0], dataSet[1], dataSet[2], lw=lw_traj, c=c_traj)[0] # For line plot
-        anis = animation.FuncAnimation(fig, update_frame, frames=len(t_interp), fargs=(dataSet,line), interval=interval, repeat=True, repeat_delay=repeat_delay, blit=False)
-
-    else:   # multiple trajectory (multiple_traj==True case)
-        anis = []
-        for i_traj in range(len(xs_interp)):
-            dataSet = np.array([xs_interp[i_traj], ys_interp[i_traj], zs_interp[i_traj]])
-            # NOTE: Can't pass empty arrays into 3d version of plot()
-            line = plt.plot(dataSet[0], dataSet[1], dataSet[2], lw=lw_traj, c=c_traj[i_traj])[0] # For line plot
-            anis.append( animation.FuncAnimation(fig, update_frame, frames=len(t_interp), fargs=(dataSet,line), interval=interval, repeat=True, repeat_delay=repeat_delay, blit=False)
-            )
+            ax = fig.gca()
+    # set equal axis from all trajectories
+    with phase("bounds"):
+        bounds = get_axes_bounds(ax, dim=3)
+        bounds.update(positions_interp)
+        bounds.apply(ax, scale)
+
+    # one line per trajectory, all updated by a single animator
+    with phase("artists"):
+        from matplotlib.colors import is_color_like
+
+        # a single color of any matplotlib format (name, hex, RGB(A) tuple) is shared by all trajectories
+        if is_color_like(c_traj):
+            c_traj = [c_traj] * len(positions_interp)
+        lines, markers = [], []
+        for i_traj, pos in enumerate(positions_interp):
+            if trail_length is not None:
+                trail, head = plot_trail(ax, pos[0], trail_length, lw=lw_traj, color=c_traj[i_traj], marker=marker)
+                lines.append(trail)
+                markers.append(head)
+            else:
+                # NOTE: Can't pass empty arrays into 3d version of plot()
+                lines.append( ax.plot(pos[:, 0], pos[:, 1], pos[:, 2], lw=lw_traj, c=c_traj[i_traj])[0] )
+        anis = TrajectoryAnimator(
+            fig, lines, positions_interp, interval=interval, repeat=True, repeat_delay=repeat_delay, blit=True,
+            trail_length=trail_length, markers=markers if trail_length is not None else None,
+            times=t_interp, cache_frames=cache_frames,
+        )
 
     if filename is not None:
-        ani.save(fn+'.gif',writer='imagemagick',fps=fps)
+        root, ext = os.path.splitext(filename)
+        if ext in (".tplb", ".html"):
+            # client-side playback, independent of frame count and resolution
+            from .webexport import export_bundle, export_viewer
+            export_bundle(root + ".tplb", positions_interp, times=t_interp, c_traj=c_traj, lw_traj=lw_traj)
+            if ext == ".html":
+                export_viewer(filename, root + ".tplb")
+            return fig, ax, anis
+        if ext == "":
+            filename += ".gif"
+        export_trajectory_animation(
+            positions_interp, filename, fps=fps, n_workers=n_workers, lw_traj=lw_traj, c_traj=c_traj,
+            limits=(ax.get_xlim(), ax.get_ylim(), ax.get_zlim()), elev=ax.elev, azim=ax.azim,
+            trail_length=trail_length, marker=marker,
+        )
     return fig, ax, anis
@@ -0,0 +1,156 @@
+"""
+Trajectory loading helpers with binary cache
+"""
+
+import os
+from itertools import islice
+
+import numpy as np
+from numpy.lib import recfunctions
+
+from .profiling import instrument
+
+
+STATE_COLUMNS = ("x", "y", "z", "vx", "vy", "vz")
+
+
+def get_cache_path(path):
+    """Get path of binary cache sidecar for trajectory file
+
+    Args:
+        path (str): path to CSV file
+
+    Returns:
+        (str): path to `.npy` cache
+    """
+    return path + ".npy"
+
+
+def is_cache_valid(path, cache=None):
+    """Check whether binary cache exists and is not older than its source file
+
+    Args:
+        path (str): path to CSV file
+        cache (str): path to cache; if None, set with `get_cache_path`
+
+    Returns:
+        (bool): whether cache can be used
+    """
+    if cache is None:
+        cache = get_cache_path(path)
+    return os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path)
+
+
+def _default_names(n_cols):
+    """Get column names from number of columns"""
+    if n_cols == 6:
+        return STATE_COLUMNS
+    elif n_cols == 7:
+        return ("t",) + STATE_COLUMNS
+    return tuple(f"c{i}" for i in range(n_cols))
+
+
+@instrument
+def convert_csv(path, cache=None, names=None, delimiter=",", chunk_rows=1000000):
+    """Convert CSV trajectory file into structured `.npy` binary cache.
+    The file is parsed in chunks of `chunk_rows` rows and written into a memory-mapped
+    output, so the whole text file is never held in memory.
+    By default, 6 columns are named x, y, z, vx, vy, vz, and 7 columns are named t, x, y, z, vx, vy, vz.
+
+    Args:
+        path (str): path to CSV file
+        cache (str): path to cache; if None, set with `get_cache_path`
+        names (tuple): column names; if None, set from number of columns
+        delimiter (str): CSV delimiter
+        chunk_rows (int): number of rows parsed at once
+
+    Returns:
+        (str): path to cache
+    """
+    if cache is None:
+        cache = get_cache_path(path)
+    # count rows and columns
+    with open(path) as f:
+        n_rows = 0
+        n_cols = None
+        for line in f:
+            if line.strip():
+                if n_cols is None:
+                    n_cols = len(line.split(delimiter))
+                n_rows += 1
+    if names is None:
+        names = _default_names(n_cols)
+    assert len(names) == n_cols, f"{len(names)} names provided for {n_cols} columns"
+
+    # stream chunks into structured memory-mapped array
+    tmp = cache + ".tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=[(name, float) for name in names], shape=(n_rows,))
+    out_flat = out.view(float).reshape(n_rows, n_cols)
+    with open(path) as f:
+        i_row = 0
+        while True:
+            lines = [line for line in islice(f, chunk_rows) if line.strip()]
+            if len(lines) == 0:
+                break
+            chunk = np.loadtxt(lines, delimiter=delimiter, ndmin=2)
+            out_flat[i_row:i_row+len(chunk)] = chunk
+            i_row += len(chunk)
+    out.flush()
+    del out, out_flat
+    os.replace(tmp, cache)
+    return cache
+
+
+@instrument
+def load_trajectory(path, columns=None, window=None, cache=None, refresh=False, names=None, delimiter=","):
+    """Load trajectory as memory-mapped structured array, using a binary cache for CSV files.
+    On first load (or when the CSV file is newer than the cache), the CSV is converted with `convert_csv`;
+    later loads only map the cache, so that data is read from disk lazily as it is accessed.
+
+    Args:
+        path (str): path to CSV file, or to `.npy` file
+        columns (str or list): column name, or list of column names, to return; if None, all columns are returned
+        window (tuple): (start, stop) window to return; in time if there is a "t" column (assumed increasing), otherwise in rows
+        cache (str): path to cache; if None, set with `get_cache_path`
+        refresh (bool): whether to rebuild cache even if it is valid
+        names (tuple): column names passed to `convert_csv`
+        delimiter (str): CSV delimiter
+
+    Returns:
+        (np.memmap): structured array view, or view of the requested column(s)
+    """
+    if path.endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+    else:
+        if cache is None:
+            cache = get_cache_path(path)
+        if refresh is True or is_cache_valid(path, cache) is False:
+            convert_csv(path, cache=cache, names=names, delimiter=delimiter)
+        data = np.load(cache, mmap_mode="r")
+
+    if window is not None:
+        start, stop = window
+        if "t" in data.dtype.names:
+            ts = data["t"]
+            start = None if start is None else np.searchsorted(ts, start, side="left")
+            stop = None if stop is None else np.searchsorted(ts, stop, side="right")
+        data = data[start:stop]
+
+    if columns is None:
+        return data
+    elif isinstance(columns, str):
+        return data[columns]
+    return data[list(columns)]
+
+
+def get_positions(data, columns=("x", "y", "z")):
+    """Get (N,3) positions from structured trajectory array, as a view whenever possible
+
+    Args:
+        data (ndarray): structured array returned by `load_trajectory`
+        columns (tuple): names of position columns
+
+    Returns:
+        (ndarray): positions of shape (N,len(columns))
+    """
+    return recfunctions.structured_to_unstructured(data[list(columns)], copy=False)
@@ -3,13 +3,74 @@ Helper for line-color for trajectory plotting
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
+from matplotlib.colors import Normalize
 from matplotlib import cm
 import numbers
 
+from .profiling import instrument
+from .trajectory import Trajectory
 
-def get_lc_traj_singleColor(xs, ys, cs, vmin, vmax, cmap, lw=0.8):
+
+def get_segments(points):
+    """Get line segments between consecutive points as a read-only strided view, without copying
+
+    Args:
+        points (np.array): array of shape (N,D)
+
+    Returns:
+        (np.array): view of shape (N-1,2,D), where segment i is [points[i], points[i+1]]
+    """
+    points = np.asarray(points)
+    n, dim = points.shape
+    return np.lib.stride_tricks.as_strided(
+        points, shape=(n-1, 2, dim), strides=(points.strides[0], points.strides[0], points.strides[1]), writeable=False
+    )
+
+
+def _stack_points(coords, float32):
+    """Stack coordinate arrays into single (N,D) array, with one allocation"""
+    dtype = np.float32 if float32 is True else float
+    points = np.empty((len(coords[0]), len(coords)), dtype=dtype)
+    for i, coord in enumerate(coords):
+        points[:, i] = coord
+    return points
+
+
+def _get_points(xs, coords, float32):
+    """Get (N,D) points from a `Trajectory` as a view where possible, or by stacking coordinate arrays"""
+    if isinstance(xs, Trajectory):
+        points = xs.positions[:, 0:len(coords)+1]
+        if float32 is True and points.dtype != np.float32:
+            points = points.astype(np.float32)
+        return points
+    return _stack_points((xs,) + coords, float32)
+
+
+def _get_colors(xs, cs):
+    """Get color-values, defaulting to the speed of a `Trajectory`"""
+    if cs is None:
+        assert isinstance(xs, Trajectory), "cs must be provided unless xs is a Trajectory"
+        return xs.speed
+    return cs
+
+
+def _set_colormap(lc, cs, n_segments, vmin, vmax, lw):
+    """Set colormap values and linewidth of line collection"""
+    # check if cs is a float, and if it is broadcast it without copying
+    if isinstance(cs, numbers.Real) == True:
+        cs = np.broadcast_to(cs, (n_segments,))
+    else:
+        cs = np.asarray(cs)[:n_segments]
+    lc.set_norm(Normalize( vmin, vmax ))
+    # Set the values used for colormapping
+    lc.set_array( cs )
+    lc.set_linewidth( lw )
+    return lc
+
+
+@instrument
+def get_lc_traj_singleColor(xs, ys=None, cs=None, vmin=None, vmax=None, cmap=None, lw=0.8):
     """
     Get line collection object for a trajectory with a single color based on a colormap defined by vmin ~ vmax
 
@@ -18,33 +79,56 @@ def get_lc_traj_singleColor(xs, ys, cs, vmin, vmax, cmap, lw=0.8):
         fig.colorbar(line, ax=ax, label="Colorbar label")
 
     Args:
-        xs (np.array): array-like object of x-coordinates of the trajectory
-        ys (np.array): array-like object of y-coordinates of the trajectory
-        cs (float or np.array): float or array-like object of color-values along the coordinates
-        vmin (float): minimum bound on colorbar
-        vmax (float): maximum bound on colorbar
+        xs (np.array or Trajectory): array-like object of x-coordinates of the trajectory, or `Trajectory` whose x,y-coordinates are used without copying
+        ys (np.array): array-like object of y-coordinates of the trajectory, not needed if `xs` is a `Trajectory`
+        cs (float or np.array): float or array-like object of color-values along the coordinates; if None, speed of the `Trajectory`
+        vmin (float): minimum bound on colorbar; if None, minimum of `cs`
+        vmax (float): maximum bound on colorbar; if None, maximum of `cs`
         cmap (str): colormap, e.g. 'viridis'
         lw (float): linewidth of trajectory
 
     Returns:
         (obj): line collection object
     """
-    # check if cs is a float, and if it is convert it to an array
-    if isinstance(cs, numbers.Real) == True:
-    	cs = cs * np.ones((len(xs),))
+    # generate segments as view of stacked points; no float32 option, as `LineCollection` stores 2D segments in double precision anyway
+    segments = get_segments(_get_points(xs, (ys,), False))
+
+    # create color bar
+    lc = LineCollection(segments, cmap=cmap)
+    return _set_colormap(lc, _get_colors(xs, cs), len(segments), vmin, vmax, lw)
+
+
+@instrument
+def get_lc_traj_singleColor_3d(xs, ys=None, zs=None, cs=None, vmin=None, vmax=None, cmap=None, lw=0.8, float32=False):
+    """
+    Get 3D line collection object for a trajectory with a single color based on a colormap defined by vmin ~ vmax
 
-    # generate segments
-    points = np.array([ xs , ys ]).T.reshape(-1, 1, 2)
-    segments = np.concatenate([points[:-1], points[1:]], axis=1)
-    plt_color = cs
+    For plotting, run:
+        line = ax.add_collection3d(lc)
+        fig.colorbar(line, ax=ax, label="Colorbar label")
+
+    Args:
+        xs (np.array or Trajectory): array-like object of x-coordinates of the trajectory, or `Trajectory` whose positions are used without copying
+        ys (np.array): array-like object of y-coordinates of the trajectory, not needed if `xs` is a `Trajectory`
+        zs (np.array): array-like object of z-coordinates of the trajectory, not needed if `xs` is a `Trajectory`
+        cs (float or np.array): float or array-like object of color-values along the coordinates, e.g. time, speed, or range; if None, speed of the `Trajectory`
+        vmin (float): minimum bound on colorbar; if None, minimum of `cs`
+        vmax (float): maximum bound on colorbar; if None, maximum of `cs`
+        cmap (str): colormap, e.g. 'viridis'
+        lw (float): linewidth of trajectory
+        float32 (bool): whether to store coordinates in single precision; `Line3DCollection` keeps the segments as given
+
+    Returns:
+        (obj): 3D line collection object
+    """
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+    # generate segments as view of stacked points
+    segments = get_segments(_get_points(xs, (ys, zs), float32))
 
     # create color bar
-    norm = plt.Normalize( vmin, vmax )
-    lc = LineCollection(segments, cmap=cmap, norm=norm)
-    # Set the values used for colormapping
-    lc.set_array( plt_color )
-    lc.set_linewidth( lw )
-    return lc
+    lc = Line3DCollection(segments, cmap=cmap)
+    return _set_colormap(lc, _get_colors(xs, cs), len(segments), vmin, vmax, lw)
 
 
 def cycle_color(n):
@@ -56,4 +140,4 @@ def cycle_color(n):
     Returns:
         (list): list of colors to be used in plots
     """
-    return cm.rainbow(np.linspace(0, 1, n))
\ No newline at end of file
+    return cm.rainbow(np.linspace(0, 1, n))
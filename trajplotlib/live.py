@@ -0,0 +1,205 @@
+"""
+Live plot of a trajectory streamed point-by-point
+"""
+
+import time
+
+import numpy as np
+
+from .bounds import get_axes_bounds
+
+
+class LiveTrajectoryPlot:
+    """Plot of a trajectory growing as new points arrive, e.g. from a propagator or a telemetry feed.
+    Points are stored in a preallocated buffer, which either grows by doubling its size or, if `capacity`
+    is given, acts as a ring buffer keeping only the most recent `capacity` points. The ring buffer
+    writes each point twice, at index i and i + capacity, so that the most recent points are always
+    available as one contiguous view without copying; the line is given a snapshot of this view at each
+    redraw, since the ring buffer is overwritten between redraws.
+
+    The existing line is updated in place, the equal-axis limits are extended with only the newly added
+    points, and the canvas is redrawn at most `max_fps` times per second regardless of the rate at which
+    points arrive. In ring buffer mode, the axis limits keep covering points that were dropped from the buffer.
+
+    Args:
+        ax (Axes3DSubplot): matplotlib axis; if None, a new figure is created
+        dim (int): number of dimensions, 2 or 3
+        capacity (int): number of most recent points to keep; if None, all points are kept
+        initial_capacity (int): initial size of the growable buffer
+        max_fps (float): maximum number of redraws per second
+        scale (float): scaling factor along x,y,z
+        lw_traj (float): linewidth for trajectory
+        c_traj (str): color for trajectory
+        radius (float): radius of sphere (or circle in 2D) at the center, only used if `ax` is None
+        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
+        n_figsize (int): fig_size is set to (n_figsize, n_figsize), only used if `ax` is None
+        background (bool): whether to plot gray box at the background, only used in 3D
+    """
+    def __init__(self, ax=None, dim=3, capacity=None, initial_capacity=1024, max_fps=30.0, scale=1.2,
+                 lw_traj=0.5, c_traj="navy", radius=None, center=None, n_figsize=5, background=False):
+        assert dim in (2, 3), "dim must be 2 or 3"
+        if ax is None:
+            import matplotlib.pyplot as plt
+            from .helper3d import plot_sphere_wireframe, get_circle_coordinates
+            fig = plt.figure(figsize=(n_figsize,n_figsize))
+            if dim == 3:
+                ax = fig.add_subplot(projection='3d')
+                if radius is not None:
+                    plot_sphere_wireframe(ax, radius, center=center, color="k", linewidth=0.5)
+            else:
+                ax = fig.add_subplot()
+                if radius is not None:
+                    x_circle, y_circle = get_circle_coordinates(radius, center)
+                    ax.plot(x_circle, y_circle, c="k", linewidth=0.5)
+        if dim == 3 and background is False:
+            ax.xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+            ax.yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+            ax.zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        self.ax = ax
+        self.fig = ax.figure
+        self.dim = dim
+        self.capacity = capacity
+        self.max_fps = max_fps
+        self.scale = scale
+        self.n_draws = 0
+
+        # preallocated point buffer; twice the capacity in ring buffer mode
+        if capacity is None:
+            self._buffer = np.empty((initial_capacity, dim))
+        else:
+            self._buffer = np.empty((2*capacity, dim))
+        self._start = 0       # index of oldest point kept in the buffer
+        self._n_points = 0    # number of points kept in the buffer
+        self._n_total = 0     # number of points received
+        self._last_draw = -np.inf
+        self._stale = False
+
+        self.bounds = get_axes_bounds(ax, dim=dim)
+        # NOTE: Can't pass empty arrays into 3d version of plot(), so start from a NaN point
+        if dim == 3:
+            self.line = ax.plot([np.nan], [np.nan], [np.nan], lw=lw_traj, c=c_traj)[0]
+        else:
+            self.line = ax.plot([np.nan], [np.nan], lw=lw_traj, c=c_traj)[0]
+
+    @property
+    def positions(self):
+        """View of the points kept in the buffer, of shape (N,dim)"""
+        return self._buffer[self._start:self._start+self._n_points]
+
+    @property
+    def n_points(self):
+        """Total number of points received, including points dropped from the ring buffer"""
+        return self._n_total
+
+    def _write(self, points):
+        """Copy new points into the buffer"""
+        n_new = len(points)
+        if self.capacity is None:
+            n_required = self._n_points + n_new
+            if n_required > len(self._buffer):
+                buffer = np.empty((max(n_required, 2*len(self._buffer)), self.dim))
+                buffer[:self._n_points] = self._buffer[:self._n_points]
+                self._buffer = buffer
+            self._buffer[self._n_points:n_required] = points
+            self._n_points = n_required
+            return
+
+        # ring buffer: only the most recent `capacity` points can be kept
+        capacity = self.capacity
+        if n_new > capacity:
+            points = points[-capacity:]
+            n_new = capacity
+        idx = (self._start + self._n_points + np.arange(n_new)) % capacity
+        self._buffer[idx] = points
+        self._buffer[idx + capacity] = points
+        n_kept = min(self._n_points + n_new, capacity)
+        self._start = (self._start + self._n_points + n_new - n_kept) % capacity
+        self._n_points = n_kept
+
+    def extend(self, points):
+        """Add new points, redrawing if the last redraw is older than 1 / `max_fps`
+
+        Args:
+            points (ndarray): single point of shape (dim,), or batch of points of shape (M,dim)
+
+        Returns:
+            (bool): whether the canvas was redrawn
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, self.dim)
+        if len(points) == 0:
+            return False
+        self.bounds.update(points)
+        self._write(points)
+        self._n_total += len(points)
+        self._stale = True
+        return self.redraw(force=False)
+
+    def append(self, point):
+        """Add a single point; alias of `extend`
+
+        Args:
+            point (ndarray): point of shape (dim,)
+
+        Returns:
+            (bool): whether the canvas was redrawn
+        """
+        return self.extend(point)
+
+    def redraw(self, force=True):
+        """Push buffered points to the line and request a redraw of the canvas
+
+        Args:
+            force (bool): whether to redraw even if the last redraw is more recent than 1 / `max_fps`
+
+        Returns:
+            (bool): whether the canvas was redrawn
+        """
+        now = time.perf_counter()
+        if self._stale is False or (force is False and now - self._last_draw < 1.0 / self.max_fps):
+            return False
+        positions = self.positions
+        if self.capacity is not None:
+            # ring buffer slots are overwritten by later points, so the line gets its own snapshot
+            positions = positions.copy()
+        if self.dim == 3:
+            self.line.set_data_3d(positions[:, 0], positions[:, 1], positions[:, 2])
+        else:
+            self.line.set_data(positions[:, 0], positions[:, 1])
+        # keep default limits until the points span a finite range
+        if np.any(self.bounds.maxs > self.bounds.mins):
+            self.bounds.apply(self.ax, scale=self.scale)
+        canvas = self.fig.canvas
+        canvas.draw_idle()
+        canvas.flush_events()
+        self._last_draw = now
+        self._stale = False
+        self.n_draws += 1
+        return True
+
+    def feed(self, points):
+        """Consume an iterator of points, redrawing at most `max_fps` times per second
+
+        Args:
+            points (iterable): iterable of points of shape (dim,) or batches of shape (M,dim)
+
+        Returns:
+            (LiveTrajectoryPlot): self
+        """
+        for point in points:
+            self.extend(point)
+        self.redraw()
+        return self
+
+    async def afeed(self, points):
+        """Consume an asynchronous iterator of points, redrawing at most `max_fps` times per second
+
+        Args:
+            points (async iterable): asynchronous iterable of points of shape (dim,) or batches of shape (M,dim)
+
+        Returns:
+            (LiveTrajectoryPlot): self
+        """
+        async for point in points:
+            self.extend(point)
+        self.redraw()
+        return self
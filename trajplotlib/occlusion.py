@@ -0,0 +1,202 @@
+"""
+Occlusion of 3D trajectories by the central body
+"""
+
+import numpy as np
+from mpl_toolkits.mplot3d.art3d import Line3D
+
+
+def _get_eye(ax):
+    """Get camera location of 3D axis in data coordinates, and whether the projection is orthographic.
+    The camera is the point projected to the center of the view at zero depth, i.e. the null space of
+    the x, y and w rows of the projection matrix of `ax.get_proj`. For orthographic projections it is
+    a point at infinity, and the direction towards the viewer is returned instead."""
+    proj = ax.get_proj()
+    # null vector of the 3x4 camera matrix, in homogeneous data coordinates
+    eye = np.linalg.svd(proj[[0, 1, 3]])[2][-1]
+    ranges = np.array([np.ptp(ax.get_xlim3d()), np.ptp(ax.get_ylim3d()), np.ptp(ax.get_zlim3d())])
+    scale = np.max(np.abs(eye[:3]) / ranges)
+    if abs(eye[3]) <= 1e-12*scale:
+        # orient direction towards the viewer with the view angles
+        elev, azim = np.deg2rad(ax.elev), np.deg2rad(ax.azim)
+        towards = np.array([np.cos(elev)*np.cos(azim), np.cos(elev)*np.sin(azim), np.sin(elev)])
+        direction = eye[:3] / np.linalg.norm(eye[:3])
+        return direction if direction @ (towards*ranges) > 0 else -direction, True
+    return eye[:3] / eye[3], False
+
+
+class EllipsoidOcclusion:
+    """Visibility of trajectory points with respect to an ellipsoid and a camera.
+    A point is hidden if it is inside the ellipsoid, or if the ray from the point towards the camera
+    hits the ellipsoid. Segments between visible points that pass behind the ellipsoid are split
+    at a hidden point. Points are scaled to the unit sphere once, so that each view only costs
+    a few vectorized operations over all points. The last result is cached by camera location,
+    so that redraws without view changes are free.
+
+    Args:
+        points (ndarray): trajectory of shape (N,3)
+        radii (float or list): radius of sphere, or radii of ellipsoid along x,y,z
+        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
+    """
+    def __init__(self, points, radii, center=None):
+        if center is None:
+            center = [0.0, 0.0, 0.0]
+        self.points = np.asarray(points, dtype=float)
+        self.radii = np.broadcast_to(np.asarray(radii, dtype=float), (3,))
+        self.center = np.asarray(center, dtype=float)
+        # points in coordinates where the ellipsoid is the unit sphere
+        self._q = (self.points - self.center) / self.radii
+        self._c = np.einsum("ij,ij->i", self._q, self._q) - 1.0
+        self._key = None
+        self._coordinates = None
+
+    def _hidden(self, q, c, eye, orthographic):
+        """Get mask of hidden points `q` in unit sphere coordinates, with `c` = |q|^2 - 1"""
+        # solve |q + t*u|^2 = 1 along each ray q + t*u, t > 0
+        if orthographic:
+            u = np.asarray(eye, dtype=float) / self.radii
+            a = u @ u
+            b = 2.0*(q @ u)
+            t_max = np.inf
+        else:
+            u = (np.asarray(eye, dtype=float) - self.center) / self.radii - q
+            a = np.einsum("ij,ij->i", u, u)
+            b = 2.0*np.einsum("ij,ij->i", q, u)
+            t_max = 1.0
+        disc = b*b - 4.0*a*c
+        # outside points (c > 0) have both roots of equal sign, which are positive if b < 0
+        hidden = (disc > 0.0) & (b < 0.0)
+        if t_max < np.inf:
+            hidden &= (-b - np.sqrt(np.maximum(disc, 0.0))) < 2.0*a*t_max
+        hidden |= c < 0.0
+        return hidden
+
+    def get_hidden(self, eye, orthographic=False):
+        """Get mask of hidden points
+
+        Args:
+            eye (ndarray): camera location, or direction towards the camera if `orthographic`
+            orthographic (bool): whether rays towards the camera are parallel
+
+        Returns:
+            (ndarray): boolean mask of shape (N,)
+        """
+        return self._hidden(self._q, self._c, eye, orthographic)
+
+    def get_crossings(self, hidden, eye, orthographic=False):
+        """Get segments between two visible points that pass behind or through the ellipsoid.
+        Each segment is tested at its closest approach to the line of sight through the center, where
+        it is the most likely to be hidden.
+
+        Args:
+            hidden (ndarray): boolean mask of hidden points of shape (N,)
+            eye (ndarray): camera location, or direction towards the camera if `orthographic`
+            orthographic (bool): whether rays towards the camera are parallel
+
+        Returns:
+            (tuple): indices of first points of hidden segments of shape (K,), and hidden points on these segments of shape (K,3)
+        """
+        idx = np.flatnonzero(~hidden[:-1] & ~hidden[1:])
+        # line of sight through the center, in unit sphere coordinates
+        if orthographic:
+            w = np.asarray(eye, dtype=float) / self.radii
+        else:
+            w = (np.asarray(eye, dtype=float) - self.center) / self.radii
+        w = w / np.linalg.norm(w)
+        q0 = self._q[idx]
+        d = self._q[idx+1] - q0
+        # components normal to the line of sight, whose norm is minimized along the segment
+        q0_n = q0 - np.outer(q0 @ w, w)
+        d_n = d - np.outer(d @ w, w)
+        dd = np.einsum("ij,ij->i", d_n, d_n)
+        s = np.clip(-np.einsum("ij,ij->i", q0_n, d_n) / np.where(dd > 0.0, dd, 1.0), 0.0, 1.0)
+        q = q0 + s[:, None]*d
+        crossing = self._hidden(q, np.einsum("ij,ij->i", q, q) - 1.0, eye, orthographic)
+        return idx[crossing], q[crossing]*self.radii + self.center
+
+    def split(self, hidden, crossings=None):
+        """Split trajectory into visible and hidden parts, with NaN's in place of the other part.
+        The hidden part includes the neighbors of hidden points, so that both parts meet.
+
+        Args:
+            hidden (ndarray): boolean mask of hidden points of shape (N,)
+            crossings (tuple): segments passing behind the ellipsoid from `get_crossings`, whose hidden points are inserted
+
+        Returns:
+            (tuple): visible and hidden coordinates, each of shape (N+K,3)
+        """
+        points = self.points
+        if crossings is not None and len(crossings[0]) > 0:
+            idx, inserted = crossings
+            points = np.insert(points, idx+1, inserted, axis=0)
+            hidden = np.insert(hidden, idx+1, True)
+        hidden_drawn = hidden.copy()
+        hidden_drawn[1:] |= hidden[:-1]
+        hidden_drawn[:-1] |= hidden[1:]
+        visible = np.where(hidden[:, None], np.nan, points)
+        occluded = np.where(hidden_drawn[:, None], points, np.nan)
+        return visible, occluded
+
+    def update(self, ax):
+        """Get visible and hidden coordinates for the current view of `ax`, recomputed only if the camera moved
+
+        Args:
+            ax (Axes3DSubplot): matplotlib 3D axis
+
+        Returns:
+            (tuple): visible and hidden coordinates, each of shape (N,3)
+        """
+        eye, orthographic = _get_eye(ax)
+        key = (tuple(np.round(eye, 12)), orthographic)
+        if key != self._key:
+            hidden = self.get_hidden(eye, orthographic=orthographic)
+            crossings = self.get_crossings(hidden, eye, orthographic=orthographic)
+            self._coordinates = self.split(hidden, crossings)
+            self._key = key
+        return self._coordinates
+
+
+class OccludedLine3D(Line3D):
+    """3D line drawing either the visible or the hidden part of a trajectory, updated at draw time
+
+    Args:
+        occlusion (EllipsoidOcclusion): occlusion of trajectory, shared by the visible and hidden lines
+        hidden (bool): whether to draw the hidden part instead of the visible part
+        **kwargs: keyword arguments passed to `Line3D`
+    """
+    def __init__(self, occlusion, hidden=False, **kwargs):
+        points = occlusion.points
+        super().__init__(points[:, 0], points[:, 1], points[:, 2], **kwargs)
+        self.occlusion = occlusion
+        self.hidden = hidden
+
+    def draw(self, renderer):
+        coords = self.occlusion.update(self.axes)[1 if self.hidden else 0]
+        self._verts3d = coords[:, 0], coords[:, 1], coords[:, 2]
+        super().draw(renderer)
+
+
+def plot_occluded(ax, points, radii, center=None, hidden_alpha=0.3, hidden_linestyle="--", **kwargs):
+    """Plot 3D trajectory with the parts behind or inside an ellipsoid drawn as a separate, faded line.
+    Visibility is recomputed whenever the axis is drawn with a new view angle or limits.
+    Only static plots are occluded; `TrajectoryAnimator` and `animate_trajectory_3d` draw trajectories in full.
+
+    Args:
+        ax (Axes3DSubplot): matplotlib 3D axis
+        points (ndarray): trajectory of shape (N,3)
+        radii (float or list): radius of sphere, or radii of ellipsoid along x,y,z
+        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
+        hidden_alpha (float): alpha of hidden part
+        hidden_linestyle (str): linestyle of hidden part
+        **kwargs: keyword arguments passed to both lines, e.g. `linewidth`, `c`, `label`
+
+    Returns:
+        (tuple): visible and hidden lines
+    """
+    occlusion = EllipsoidOcclusion(points, radii, center=center)
+    visible = OccludedLine3D(occlusion, **kwargs)
+    kwargs.pop("label", None)
+    hidden = OccludedLine3D(occlusion, hidden=True, alpha=hidden_alpha, linestyle=hidden_linestyle, **kwargs)
+    ax.add_line(visible)
+    ax.add_line(hidden)
+    return visible, hidden
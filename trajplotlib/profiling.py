@@ -0,0 +1,234 @@
+"""
+Opt-in timing instrumentation of trajplotlib functions
+
+Usage:
+    with trajplotlib.profiling.profile() as stats:
+        fig, ax = trajplotlib.quickplot3(xs, ys, zs)
+        with trajplotlib.profiling.phase("draw"):
+            fig.canvas.draw()
+    print(trajplotlib.profiling.report(stats))
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+
+# global switch checked by every instrumented call; when False, instrumentation is a single check
+_ENABLED = False
+# recorded statistics, keyed by phase name ("function" or "function/phase")
+_STATS = {}
+_CALLBACKS = []
+_LOCAL = threading.local()
+_LOCK = threading.Lock()
+
+
+class PhaseStats:
+    """Accumulated statistics of a phase
+
+    Args:
+        calls (int): number of calls
+        time (float): total wall time in seconds
+        n_points (int): total number of points processed
+    """
+    __slots__ = ("calls", "time", "n_points")
+
+    def __init__(self, calls=0, time=0.0, n_points=0):
+        self.calls = calls
+        self.time = time
+        self.n_points = n_points
+
+    def __repr__(self):
+        return f"PhaseStats(calls={self.calls}, time={self.time:.6f}, n_points={self.n_points})"
+
+
+class _NullPhase:
+    """Phase doing nothing, returned while instrumentation is disabled"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """Phase timing its body and recording it under the name of the enclosing phases"""
+    def __init__(self, name, n_points):
+        self.name = name
+        self.n_points = n_points
+
+    def __enter__(self):
+        stack = getattr(_LOCAL, "stack", None)
+        if stack is None:
+            stack = _LOCAL.stack = []
+        stack.append(self.name)
+        self.key = "/".join(stack)
+        self.tstart = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.tstart
+        _LOCAL.stack.pop()
+        n_points = self.n_points or 0
+        with _LOCK:
+            stats = _STATS.get(self.key)
+            if stats is None:
+                stats = _STATS[self.key] = PhaseStats()
+            stats.calls += 1
+            stats.time += elapsed
+            stats.n_points += n_points
+        for callback in _CALLBACKS:
+            callback(self.key, elapsed, n_points)
+        return False
+
+
+def phase(name, n_points=None):
+    """Get context manager timing a phase, nested under the currently running instrumented function.
+    While instrumentation is disabled, a shared no-op context manager is returned.
+
+    Args:
+        name (str): name of phase, e.g. "prepare", "artists", or "draw"
+        n_points (int): number of points processed in the phase
+
+    Returns:
+        (context manager): phase
+    """
+    if _ENABLED is False:
+        return _NULL_PHASE
+    return _Phase(name, n_points)
+
+
+def count_points(data):
+    """Get number of points of trajectory data, as used for per-phase point counts
+
+    Args:
+        data (ndarray, Trajectory, or list): coordinates of shape (N,), points of shape (...,D), trajectory, or list thereof
+
+    Returns:
+        (int): number of points, or 0 if unknown
+    """
+    shape = getattr(data, "shape", None)
+    if shape is not None:
+        if len(shape) <= 1:
+            return int(shape[0]) if len(shape) == 1 else 1
+        return int(data.size // shape[-1])
+    positions = getattr(data, "positions", None)
+    if positions is not None:
+        return len(positions)
+    if isinstance(data, (list, tuple)):
+        if len(data) > 0 and hasattr(data[0], "__len__"):
+            return sum(count_points(item) for item in data)
+        return len(data)
+    return 0
+
+
+def instrument(func=None, name=None):
+    """Decorator recording wall time, calls, and number of points of the first argument of a function.
+    While instrumentation is disabled, the wrapper only checks a global flag before calling the function.
+
+    Args:
+        func (callable): function to instrument
+        name (str): name under which calls are recorded; if None, name of the function
+
+    Returns:
+        (callable): instrumented function
+    """
+    if func is None:
+        return functools.partial(instrument, name=name)
+    label = func.__name__ if name is None else name
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _ENABLED is False:
+            return func(*args, **kwargs)
+        with _Phase(label, count_points(args[0]) if len(args) > 0 else 0):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def enable(callback=None):
+    """Enable instrumentation
+
+    Args:
+        callback (callable): if provided, called as `callback(name, elapsed, n_points)` whenever a phase ends
+    """
+    global _ENABLED
+    if callback is not None:
+        _CALLBACKS.append(callback)
+    _ENABLED = True
+
+
+def disable():
+    """Disable instrumentation and remove all callbacks"""
+    global _ENABLED
+    _ENABLED = False
+    _CALLBACKS.clear()
+
+
+def is_enabled():
+    """Whether instrumentation is enabled"""
+    return _ENABLED
+
+
+def reset():
+    """Clear recorded statistics"""
+    with _LOCK:
+        _STATS.clear()
+
+
+def get_stats():
+    """Get copy of recorded statistics
+
+    Returns:
+        (dict): phase name -> `PhaseStats`
+    """
+    with _LOCK:
+        return {key: PhaseStats(s.calls, s.time, s.n_points) for key, s in _STATS.items()}
+
+
+@contextmanager
+def profile(callback=None):
+    """Context manager enabling instrumentation, with statistics cleared on entry.
+    The yielded dictionary is filled with the recorded statistics on exit, and the
+    previous enabled state is restored.
+
+    Args:
+        callback (callable): if provided, called as `callback(name, elapsed, n_points)` whenever a phase ends
+
+    Yields:
+        (dict): phase name -> `PhaseStats`, filled on exit
+    """
+    global _ENABLED
+    was_enabled = _ENABLED
+    callbacks = list(_CALLBACKS)
+    reset()
+    enable(callback=callback)
+    stats = {}
+    try:
+        yield stats
+    finally:
+        stats.update(get_stats())
+        _ENABLED = was_enabled
+        _CALLBACKS[:] = callbacks
+
+
+def report(stats=None):
+    """Format statistics as a table, sorted by phase name
+
+    Args:
+        stats (dict): statistics from `profile` or `get_stats`; if None, currently recorded statistics
+
+    Returns:
+        (str): table of calls, total time, time per call, and points per phase
+    """
+    if stats is None:
+        stats = get_stats()
+    lines = [f"{'phase':50s} {'calls':>8s} {'total [s]':>12s} {'per call [ms]':>14s} {'points':>12s}"]
+    for key in sorted(stats):
+        s = stats[key]
+        lines.append(f"{key:50s} {s.calls:8d} {s.time:12.6f} {1e3*s.time/max(s.calls, 1):14.3f} {s.n_points:12d}")
+    return "\n".join(lines)
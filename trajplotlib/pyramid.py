@@ -0,0 +1,245 @@
+"""
+Multi-resolution min/max pyramid of a trajectory for interactive zoom
+"""
+
+import numpy as np
+from matplotlib.artist import Artist
+
+from .trajectory import _float_dtype
+
+
+def _reduce_bins(points, imin, imax, base, samples=False):
+    """Group consecutive bins by `base` and keep indices of samples with min/max value along each coordinate.
+    If `samples` is True, the bins are the samples themselves, so that values are read without gathering."""
+    n, dim = imin.shape
+    cols = np.arange(dim)
+    if samples is True:
+        vmin = vmax = points
+    else:
+        vmin = points[imin, cols]
+        vmax = points[imax, cols]
+    n_full = n // base
+    out_min, out_max = [], []
+    if n_full > 0:
+        amin = np.argmin(vmin[:n_full*base].reshape(n_full, base, dim), axis=1)
+        amax = np.argmax(vmax[:n_full*base].reshape(n_full, base, dim), axis=1)
+        rows = base*np.arange(n_full, dtype=imin.dtype)[:, None]
+        if samples is True:
+            out_min.append((rows + amin).astype(imin.dtype))
+            out_max.append((rows + amax).astype(imin.dtype))
+        else:
+            out_min.append(imin[rows + amin, cols])
+            out_max.append(imax[rows + amax, cols])
+    if n_full*base < n:
+        out_min.append(imin[n_full*base + np.argmin(vmin[n_full*base:], axis=0), cols][None, :])
+        out_max.append(imax[n_full*base + np.argmax(vmax[n_full*base:], axis=0), cols][None, :])
+    return np.concatenate(out_min), np.concatenate(out_max)
+
+
+class TrajectoryPyramid:
+    """Min/max decimation pyramid of a trajectory.
+    Level k splits the trajectory into bins of `base**k` consecutive samples, and keeps for each bin
+    the indices of the samples with minimum and maximum value along each coordinate, which also
+    define the bin's bounding box. Each level is reduced from the previous one, so building the
+    pyramid is O(N), and only sample indices are stored. Single precision points are kept as they are.
+
+    Args:
+        points (ndarray): trajectory of shape (N,D)
+        base (int): number of bins of a level merged into one bin of the next level
+    """
+    def __init__(self, points, base=8):
+        self.points = np.asarray(points, dtype=_float_dtype(points))
+        self.base = base
+        n, dim = self.points.shape
+        dtype = np.int32 if n < 2**31 else np.intp
+        # level 0 is the trajectory itself
+        idx = np.broadcast_to(np.arange(n, dtype=dtype)[:, None], (n, dim))
+        self.levels = [(idx, idx)]
+        while len(self.levels[-1][0]) > base:
+            self.levels.append(_reduce_bins(self.points, *self.levels[-1], base, samples=len(self.levels) == 1))
+
+    def bin_size(self, level):
+        """Number of samples per bin of `level`"""
+        return self.base**level
+
+    def select(self, lower, upper, pixel_size, tolerance=1.0, max_vertices=None):
+        """Get indices of samples to draw within a view window.
+        Starting from the coarsest level, bins outside the window are dropped, and visible bins are
+        refined until their bounding box spans at most `tolerance` pixels, so that each part of the
+        trajectory is drawn from the coarsest level that is still pixel-accurate. If refining the
+        visible bins would exceed `max_vertices`, only the widest bins are refined and the others are
+        drawn from the current level. Samples just outside the window are kept so that lines leaving the window are drawn up to its edge.
+
+        Args:
+            lower (ndarray): lower limits of the window along each coordinate
+            upper (ndarray): upper limits of the window along each coordinate
+            pixel_size (ndarray): size of a pixel in data units along each coordinate
+            tolerance (float): maximum extent of a bin in pixels for it to be drawn without refinement
+            max_vertices (int): approximate maximum number of selected samples; if None, not limited
+
+        Returns:
+            (tuple): sorted sample indices, and index of the visible run each sample belongs to
+        """
+        points = self.points
+        n, dim = points.shape
+        cols = np.arange(dim)
+        max_extent = tolerance*np.asarray(pixel_size, dtype=float)
+        lower = np.asarray(lower, dtype=float)
+        upper = np.asarray(upper, dtype=float)
+
+        kept, run_lo, run_hi = [], [], []
+        n_kept = 0
+        bins = np.arange(len(self.levels[-1][0]))
+        for level in range(len(self.levels)-1, -1, -1):
+            imin, imax = self.levels[level]
+            vmin = points[imin[bins], cols]
+            vmax = points[imax[bins], cols]
+            visible = np.all(vmax >= lower, axis=1) & np.all(vmin <= upper, axis=1)
+            if level > 0:
+                extent = np.max((vmax - vmin) / max_extent, axis=1)
+                done = visible & (extent <= 1.0)
+                if max_vertices is not None:
+                    # each bin contributes up to 2*dim samples, so only refine the widest coarse bins within the budget
+                    coarse = np.flatnonzero(visible & ~done)
+                    n_refined = (max_vertices - n_kept - 2*dim*np.count_nonzero(visible)) // (2*dim*(self.base - 1))
+                    if len(coarse) > max(n_refined, 0):
+                        stop = coarse[np.argsort(extent[coarse])[:len(coarse) - max(n_refined, 0)]]
+                        done[stop] = True
+            else:
+                done = visible
+            n_kept += 2*dim*np.count_nonzero(done)
+            # bins that are fine enough are drawn from their min/max samples
+            size = self.bin_size(level)
+            kept.append(np.concatenate([imin[bins[done]], imax[bins[done]]], axis=1).ravel())
+            run_lo.append(bins[done]*size)
+            run_hi.append(np.minimum((bins[done]+1)*size, n))
+            if level == 0:
+                break
+            # visible bins that are too coarse are replaced by their children
+            refine = bins[visible & ~done]
+            bins = (refine[:, None]*self.base + np.arange(self.base)).ravel()
+            bins = bins[bins < len(self.levels[level-1][0])]
+            if len(bins) == 0:
+                break
+
+        kept = np.unique(np.concatenate(kept).astype(np.intp))
+        run_lo = np.concatenate(run_lo)
+        run_hi = np.concatenate(run_hi)
+        if len(kept) == 0:
+            return kept, kept
+        # merge adjacent bin ranges into visible runs
+        order = np.argsort(run_lo)
+        run_lo, run_hi = run_lo[order], run_hi[order]
+        starts = np.r_[True, run_lo[1:] != run_hi[:-1]]
+        run_lo = run_lo[starts]
+        run_hi = run_hi[np.r_[starts[1:], True]]
+        run = np.searchsorted(run_lo, kept, side="right") - 1
+        # samples just before and after each run
+        before = run_lo - 1
+        after = run_hi
+        idx = np.concatenate([kept, before, after])
+        run = np.concatenate([run, np.arange(len(run_lo)), np.arange(len(run_lo))])
+        valid = (idx >= 0) & (idx < n)
+        idx, run = idx[valid], run[valid]
+        order = np.lexsort((idx, run))
+        return idx[order], run[order]
+
+    def get_coordinates(self, lower, upper, pixel_size, tolerance=1.0, max_vertices=None):
+        """Get coordinates to draw within a view window, with NaN's separating disjoint visible runs
+
+        Args:
+            lower (ndarray): lower limits of the window along each coordinate
+            upper (ndarray): upper limits of the window along each coordinate
+            pixel_size (ndarray): size of a pixel in data units along each coordinate
+            tolerance (float): maximum extent of a bin in pixels for it to be drawn without refinement
+            max_vertices (int): approximate maximum number of selected samples; if None, not limited
+
+        Returns:
+            (ndarray): coordinates of shape (M,D)
+        """
+        idx, run = self.select(lower, upper, pixel_size, tolerance=tolerance, max_vertices=max_vertices)
+        coords = self.points[idx]
+        breaks = np.flatnonzero(run[1:] != run[:-1]) + 1
+        if len(breaks) > 0:
+            coords = np.insert(coords, breaks, np.nan, axis=0)
+        return coords
+
+
+def _get_view(ax, dim):
+    """Get lower and upper limits, pixel size in data units, and number of pixel columns of axis"""
+    if dim == 3:
+        limits = np.array([ax.get_xlim3d(), ax.get_ylim3d(), ax.get_zlim3d()])
+        n_pixels = np.full(3, max(ax.bbox.width, ax.bbox.height))
+    else:
+        limits = np.array([ax.get_xlim(), ax.get_ylim()])
+        n_pixels = np.array([ax.bbox.width, ax.bbox.height])
+    lower = limits.min(axis=1)
+    upper = limits.max(axis=1)
+    return lower, upper, (upper - lower) / np.maximum(n_pixels, 1.0), max(ax.bbox.width, 1.0)
+
+
+class _PyramidUpdater(Artist):
+    """Invisible artist drawn before all others of its axis, re-sampling a line from its pyramid
+    if the axis limits changed since the last draw. Limit changes only set a flag, so that a zoom
+    changing several limits at once, or several changes between draws, cost a single re-sampling."""
+    def __init__(self, line, pyramid, tolerance, vertices_per_pixel):
+        super().__init__()
+        self.line = line
+        self.pyramid = pyramid
+        self.tolerance = tolerance
+        self.vertices_per_pixel = vertices_per_pixel
+        self.dirty = True
+        # draw before all other artists of the axis
+        self.set_zorder(-np.inf)
+
+    def invalidate(self, ax=None):
+        self.dirty = True
+
+    def update_line(self):
+        ax = self.line.axes
+        dim = self.pyramid.points.shape[1]
+        lower, upper, pixel_size, n_columns = _get_view(ax, dim)
+        max_vertices = None if self.vertices_per_pixel is None else int(self.vertices_per_pixel*n_columns)
+        coords = self.pyramid.get_coordinates(lower, upper, pixel_size, tolerance=self.tolerance, max_vertices=max_vertices)
+        if dim == 3:
+            self.line.set_data_3d(coords[:, 0], coords[:, 1], coords[:, 2])
+        else:
+            self.line.set_data(coords[:, 0], coords[:, 1])
+        self.dirty = False
+
+    def draw(self, renderer):
+        if self.dirty is True:
+            self.update_line()
+        self.stale = False
+
+    def get_window_extent(self, renderer=None):
+        from matplotlib.transforms import Bbox
+        return Bbox.null()
+
+
+def attach_pyramid(ax, line, points, base=8, tolerance=1.0, vertices_per_pixel=2.0):
+    """Draw `line` from a min/max pyramid of `points`, re-sampled at draw time whenever the limits of `ax` changed.
+    Only the part of the trajectory inside the view is drawn, from the coarsest pyramid level that is still
+    pixel-accurate, with at most about `vertices_per_pixel` vertices per pixel column, so that deep zooms
+    show full-resolution samples while the full view stays responsive.
+
+    Args:
+        ax (Axes3DSubplot): matplotlib axis containing `line`
+        line (Line2D): line artist, `Line3D` for 3D axes
+        points (ndarray): trajectory of shape (N,2) or (N,3)
+        base (int): number of bins of a pyramid level merged into one bin of the next level
+        tolerance (float): maximum extent of a pyramid bin in pixels for it to be drawn without refinement
+        vertices_per_pixel (float): approximate maximum number of vertices per pixel column of the axis; if None, not limited
+
+    Returns:
+        (TrajectoryPyramid): pyramid of `points`
+    """
+    pyramid = TrajectoryPyramid(points, base=base)
+    dim = pyramid.points.shape[1]
+    updater = _PyramidUpdater(line, pyramid, tolerance, vertices_per_pixel)
+    ax.add_artist(updater)
+    # NOTE: callback registries only keep weak references to bound methods, so connect a closure
+    for name in ("xlim_changed", "ylim_changed", "zlim_changed")[:dim]:
+        ax.callbacks.connect(name, lambda ax: updater.invalidate())
+    line._trajplotlib_pyramid = pyramid
+    return pyramid
@@ -0,0 +1,108 @@
+"""
+Resampling helpers for stacked trajectories
+"""
+
+import numpy as np
+
+from .profiling import instrument
+
+
+def monotonic_mask(times):
+    """Get boolean mask of samples that form a strictly increasing time sequence.
+    A sample is kept only if its time-stamp is larger than every time-stamp before it.
+
+    Args:
+        times (ndarray): time-stamps, shape (N,)
+
+    Returns:
+        (ndarray): boolean mask of shape (N,)
+    """
+    times = np.asarray(times)
+    mask = np.ones(times.shape, dtype=bool)
+    if len(times) > 1:
+        mask[1:] = times[1:] > np.maximum.accumulate(times)[:-1]
+    return mask
+
+
+def _hermite_eval(p0, v0, p1, v1, h, s):
+    """Evaluate cubic Hermite interpolant between two samples
+
+    Args:
+        p0 (ndarray): positions at the beginning of the intervals
+        v0 (ndarray): velocities at the beginning of the intervals
+        p1 (ndarray): positions at the end of the intervals
+        v1 (ndarray): velocities at the end of the intervals
+        h (ndarray): interval lengths in time, broadcastable against p0
+        s (ndarray): normalized time within the interval in [0,1], broadcastable against p0
+
+    Returns:
+        (ndarray): interpolated positions
+    """
+    s2 = s*s
+    s3 = s2*s
+    h00 = 2*s3 - 3*s2 + 1
+    h10 = s3 - 2*s2 + s
+    h01 = -2*s3 + 3*s2
+    h11 = s3 - s2
+    return h00*p0 + h10*h*v0 + h01*p1 + h11*h*v1
+
+
+@instrument
+def resample_trajectories(times, positions, nt=100, method="cubic", velocities=None, t_interp=None):
+    """Resample one or multiple trajectories sharing the same time-stamps onto a uniform time grid.
+    Samples with non-monotonic time-stamps are removed from all trajectories before interpolating,
+    and all trajectories are evaluated together in a single batched call.
+
+    Args:
+        times (ndarray): time-stamps, shape (N,)
+        positions (ndarray): positions, shape (N,3) or (K,N,3)
+        nt (int): number of time-steps of the resampled trajectories
+        method (str): interpolation method, "linear", "cubic", or "hermite"
+        velocities (ndarray): velocities with the same shape as `positions`, required for "hermite"
+        t_interp (ndarray): time-stamps to evaluate at; if None, `nt` uniform steps are used
+
+    Returns:
+        (tuple): resampled time-stamps of shape (nt,) and positions of shape (nt,3) or (K,nt,3)
+    """
+    times = np.asarray(times, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    assert positions.ndim in (2, 3), "positions must be of shape (N,3) or (K,N,3)"
+    assert positions.shape[-2] == len(times), "positions and times must be of equal length"
+
+    # remove samples with non-monotonic time-stamps
+    mask = monotonic_mask(times)
+    if mask.all() == False:
+        times = times[mask]
+        positions = positions[..., mask, :]
+        if velocities is not None:
+            velocities = np.asarray(velocities, dtype=float)[..., mask, :]
+
+    if t_interp is None:
+        t_interp = np.linspace(times[0], times[-1], nt)
+    else:
+        t_interp = np.asarray(t_interp, dtype=float)
+
+    if method == "cubic":
+        # single spline fit along the time axis for all trajectories
+        from scipy.interpolate import CubicSpline
+        positions_interp = CubicSpline(times, positions, axis=-2)(t_interp)
+
+    elif method in ("linear", "hermite"):
+        # locate interval of each evaluation time
+        idx = np.clip(np.searchsorted(times, t_interp, side="right") - 1, 0, len(times)-2)
+        h = (times[idx+1] - times[idx])[:, None]
+        s = (t_interp[:, None] - times[idx, None]) / h
+        if method == "linear":
+            positions_interp = (1 - s)*positions[..., idx, :] + s*positions[..., idx+1, :]
+        else:
+            assert velocities is not None, "velocities must be provided for hermite interpolation"
+            velocities = np.asarray(velocities, dtype=float)
+            assert velocities.shape == positions.shape, "velocities must be of same shape as positions"
+            positions_interp = _hermite_eval(
+                positions[..., idx, :], velocities[..., idx, :],
+                positions[..., idx+1, :], velocities[..., idx+1, :],
+                h, s,
+            )
+    else:
+        raise ValueError(f"method must be 'linear', 'cubic', or 'hermite', got {method}")
+    return t_interp, positions_interp
@@ -0,0 +1,152 @@
+"""
+Cached static scene templates for repeated renders around the same body
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from .helper3d import set_equal_axis, plot_sphere_wireframe
+
+
+# cached templates, keyed by their parameters
+_TEMPLATE_CACHE = OrderedDict()
+_TEMPLATE_CACHE_MAXSIZE = 8
+
+
+class SceneTemplate:
+    """Static 3D scene (body mesh, axes, ticks, limits and view angle) rendered once on the Agg backend.
+    The rendered background is kept as a bitmap, and each call to `render` restores it and draws
+    only the trajectory artists on top, so that render time depends mainly on trajectory size.
+
+    Args:
+        limits (tuple): xlims, ylims, zlims of the scene
+        radius (float): radius of sphere at the center; if None, no sphere is drawn
+        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
+        elev (float): elevation angle of view in degrees
+        azim (float): azimuthal angle of view in degrees
+        scale (float): scaling factor along x,y,z
+        n_figsize (int): fig_size is set to (n_figsize, n_figsize)
+        dpi (int): resolution of rendered images
+        background (bool): whether to plot gray box at the background
+        n_mesh (int): number of points along longitude of sphere wireframe
+    """
+    def __init__(self, limits, radius=None, center=None, elev=None, azim=None, scale=1.0,
+                 n_figsize=5, dpi=100, background=False, n_mesh=20):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        import mpl_toolkits.mplot3d  # noqa: F401 (registers 3d projection)
+
+        self.fig = Figure(figsize=(n_figsize, n_figsize), dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(projection="3d")
+        if radius is not None:
+            plot_sphere_wireframe(self.ax, radius, center=center, color="k", linewidth=0.5, n=n_mesh)
+        xlims, ylims, zlims = limits
+        set_equal_axis(self.ax, xlims, ylims, zlims, scale=scale, dim3=True)
+        if elev is not None or azim is not None:
+            self.ax.view_init(elev=elev, azim=azim)
+        if background is False:
+            self.ax.xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+            self.ax.yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+            self.ax.zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+
+        # trajectory artists, excluded from the background and reused for every render
+        self._line = self.ax.plot([0.0], [0.0], [0.0], animated=True)[0]
+        self._start = self.ax.plot([0.0], [0.0], [0.0], linestyle="none", animated=True)[0]
+        self._end = self.ax.plot([0.0], [0.0], [0.0], linestyle="none", animated=True)[0]
+
+        # render static background once
+        self.fig.canvas.draw()
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def render(self, xs, ys, zs, filename=None, lw_traj=0.75, c_traj="navy",
+               scatter_start=True, marker_start="x", c_start="r",
+               scatter_end=True, marker_end="*", c_end="g"):
+        """Render trajectory on top of the cached background
+
+        Args:
+            xs (ndarray): x-coordinates of trajectory
+            ys (ndarray): y-coordinates of trajectory
+            zs (ndarray): z-coordinates of trajectory
+            filename (str): if provided, rendered image is saved to this file
+            lw_traj (float): linewidth for trajectory
+            c_traj (str): color for trajectory
+            scatter_start (bool): whether to plot marker at the beginning of trajectory
+            marker_start (str): marker at the beginning of trajectory
+            c_start (str): marker color at the beginning of trajectory
+            scatter_end (bool): whether to plot marker at the end of trajectory
+            marker_end (str): marker at the end of trajectory
+            c_end (str): marker color at the end of trajectory
+
+        Returns:
+            (ndarray): rendered RGBA image of shape (height, width, 4); valid until the next call to `render`
+        """
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        self._line.set_data_3d(xs, ys, zs)
+        self._line.set(linewidth=lw_traj, color=c_traj)
+        self.ax.draw_artist(self._line)
+        if scatter_start is True:
+            self._start.set_data_3d(xs[0:1], ys[0:1], zs[0:1])
+            self._start.set(marker=marker_start, color=c_start)
+            self.ax.draw_artist(self._start)
+        if scatter_end is True:
+            self._end.set_data_3d(xs[-1:], ys[-1:], zs[-1:])
+            self._end.set(marker=marker_end, color=c_end)
+            self.ax.draw_artist(self._end)
+        image = np.asarray(canvas.buffer_rgba())
+        if filename is not None:
+            from matplotlib.image import imsave
+            imsave(filename, image)
+        return image
+
+    def render_frames(self, positions, **kwargs):
+        """Render animation frames of a trajectory growing over time on top of the cached background
+
+        Args:
+            positions (ndarray): resampled positions of shape (nt,3)
+            **kwargs: passed on to `render`
+
+        Yields:
+            (ndarray): rendered RGBA image of each frame
+        """
+        for num in range(len(positions)):
+            yield self.render(positions[:num+1, 0], positions[:num+1, 1], positions[:num+1, 2], **kwargs)
+
+
+def get_scene_template(limits, radius=None, center=None, elev=None, azim=None, scale=1.0,
+                       n_figsize=5, dpi=100, background=False, n_mesh=20):
+    """Get scene template for the given parameters, rendering it only if it is not cached yet.
+    Up to 8 templates are cached, dropping the least recently used one.
+
+    Args:
+        limits (tuple): xlims, ylims, zlims of the scene
+        radius (float): radius of sphere at the center; if None, no sphere is drawn
+        center (list): x,y,z coordinates of center, if None set to [0.0, 0.0, 0.0]
+        elev (float): elevation angle of view in degrees
+        azim (float): azimuthal angle of view in degrees
+        scale (float): scaling factor along x,y,z
+        n_figsize (int): fig_size is set to (n_figsize, n_figsize)
+        dpi (int): resolution of rendered images
+        background (bool): whether to plot gray box at the background
+        n_mesh (int): number of points along longitude of sphere wireframe
+
+    Returns:
+        (SceneTemplate): cached scene template
+    """
+    key = (
+        tuple(tuple(float(v) for v in lims) for lims in limits),
+        radius, None if center is None else tuple(center),
+        elev, azim, scale, n_figsize, dpi, background, n_mesh,
+    )
+    template = _TEMPLATE_CACHE.get(key)
+    if template is None:
+        template = SceneTemplate(limits, radius=radius, center=center, elev=elev, azim=azim, scale=scale,
+                                 n_figsize=n_figsize, dpi=dpi, background=background, n_mesh=n_mesh)
+        _TEMPLATE_CACHE[key] = template
+        if len(_TEMPLATE_CACHE) > _TEMPLATE_CACHE_MAXSIZE:
+            _TEMPLATE_CACHE.popitem(last=False)
+    else:
+        _TEMPLATE_CACHE.move_to_end(key)
+    return template
@@ -0,0 +1,142 @@
+"""
+Compact container for a single trajectory
+"""
+
+import numpy as np
+
+
+class Trajectory:
+    """Trajectory stored as one contiguous (N,3) position array, with optional velocities and time-stamps.
+    Derived quantities (bounds, speed, arc length) are computed on first access and cached, so the
+    positions should not be modified in-place after creation. Plotting functions accepting `xs, ys, zs`
+    also accept a `Trajectory` in place of `xs`, and use column views of its positions without copying.
+
+    Args:
+        positions (ndarray): positions of shape (N,3)
+        velocities (ndarray): velocities of shape (N,3)
+        times (ndarray): time-stamps of shape (N,)
+        float32 (bool): whether to store positions and velocities in single precision
+    """
+    __slots__ = ("positions", "velocities", "times", "_bounds", "_speed", "_arc_length")
+
+    def __init__(self, positions, velocities=None, times=None, float32=False):
+        dtype = np.float32 if float32 is True else _float_dtype(positions)
+        self.positions = np.ascontiguousarray(positions, dtype=dtype)
+        assert self.positions.ndim == 2 and self.positions.shape[1] == 3, "positions must be of shape (N,3)"
+        if velocities is not None:
+            velocities = np.ascontiguousarray(velocities, dtype=dtype)
+            assert velocities.shape == self.positions.shape, "velocities must be of same shape as positions"
+        if times is not None:
+            times = np.asarray(times, dtype=float)
+            assert times.shape == (len(self.positions),), "times must be of shape (N,)"
+        self.velocities = velocities
+        self.times = times
+        self._bounds = None
+        self._speed = None
+        self._arc_length = None
+
+    @classmethod
+    def from_coordinates(cls, xs, ys, zs, velocities=None, times=None, float32=False):
+        """Create trajectory from separate coordinate arrays, filling the position array once
+
+        Args:
+            xs (ndarray): x-coordinates of trajectory
+            ys (ndarray): y-coordinates of trajectory
+            zs (ndarray): z-coordinates of trajectory
+            velocities (ndarray): velocities of shape (N,3)
+            times (ndarray): time-stamps of shape (N,)
+            float32 (bool): whether to store positions and velocities in single precision
+
+        Returns:
+            (Trajectory): trajectory
+        """
+        positions = np.empty((len(xs), 3), dtype=np.float32 if float32 is True else float)
+        positions[:, 0] = xs
+        positions[:, 1] = ys
+        positions[:, 2] = zs
+        return cls(positions, velocities=velocities, times=times, float32=float32)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __repr__(self):
+        return (f"Trajectory(n={len(self)}, dtype={self.positions.dtype}, "
+                f"velocities={self.velocities is not None}, times={self.times is not None})")
+
+    @property
+    def xs(self):
+        """View of x-coordinates"""
+        return self.positions[:, 0]
+
+    @property
+    def ys(self):
+        """View of y-coordinates"""
+        return self.positions[:, 1]
+
+    @property
+    def zs(self):
+        """View of z-coordinates"""
+        return self.positions[:, 2]
+
+    @property
+    def bounds(self):
+        """Minimum and maximum along each coordinate, ignoring NaN's, as array of shape (2,3)"""
+        if self._bounds is None:
+            self._bounds = np.array([np.fmin.reduce(self.positions, axis=0), np.fmax.reduce(self.positions, axis=0)])
+        return self._bounds
+
+    @property
+    def speed(self):
+        """Speed at each sample, from velocities if available, otherwise from finite differences of positions over times"""
+        if self._speed is None:
+            if self.velocities is not None:
+                self._speed = np.linalg.norm(self.velocities, axis=1)
+            else:
+                assert self.times is not None, "velocities or times are required to compute speed"
+                self._speed = np.linalg.norm(np.gradient(self.positions, self.times, axis=0), axis=1)
+        return self._speed
+
+    @property
+    def arc_length(self):
+        """Cumulative arc length at each sample, starting from 0"""
+        if self._arc_length is None:
+            arc_length = np.zeros(len(self.positions))
+            np.cumsum(np.linalg.norm(np.diff(self.positions, axis=0), axis=1), out=arc_length[1:])
+            self._arc_length = arc_length
+        return self._arc_length
+
+
+def _float_dtype(array):
+    """Get floating dtype of array, keeping single precision inputs as they are"""
+    dtype = getattr(array, "dtype", None)
+    if dtype is not None and np.issubdtype(dtype, np.floating):
+        return dtype
+    return float
+
+
+def unpack_coordinates(xs, ys=None, zs=None):
+    """Get coordinate arrays from either a `Trajectory` or loose coordinate arrays
+
+    Args:
+        xs (ndarray or Trajectory): x-coordinates, or trajectory
+        ys (ndarray): y-coordinates, ignored if `xs` is a `Trajectory`
+        zs (ndarray): z-coordinates, ignored if `xs` is a `Trajectory`
+
+    Returns:
+        (tuple): xs, ys, zs, and the `Trajectory` or None
+    """
+    if isinstance(xs, Trajectory):
+        return xs.xs, xs.ys, xs.zs, xs
+    return xs, ys, zs, None
+
+
+def _as_trajectory_list(trajs, dim):
+    """Convert (K,N,D) array or list of (N_i,D) arrays into list of arrays, and stacked start and end points"""
+    if isinstance(trajs, np.ndarray) and trajs.ndim == 3:
+        assert trajs.shape[2] == dim, f"trajectories must be of shape (K,N,{dim})"
+        return list(trajs), trajs[:, 0, :], trajs[:, -1, :]
+    trajs = [np.asarray(traj, dtype=float) for traj in trajs]
+    assert all(traj.ndim == 2 and traj.shape[1] == dim for traj in trajs), f"trajectories must be of shape (N_i,{dim})"
+    starts = np.array([traj[0] for traj in trajs])
+    ends = np.array([traj[-1] for traj in trajs])
+    return trajs, starts, ends
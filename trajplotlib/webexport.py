@@ -0,0 +1,502 @@
+"""
+Compact binary bundles of trajectories for playback in a browser
+
+Bundle layout (little-endian):
+    b"TPLB", uint32 version, uint32 header length, JSON header, then the arrays,
+    each starting at an offset aligned to 8 bytes. The header lists name, dtype,
+    shape, and offset of each array, and for quantized arrays the per-coordinate
+    lower and upper limits used to map uint16 values back to coordinates.
+"""
+
+import base64
+import html
+import json
+import os
+import struct
+
+import numpy as np
+
+from .profiling import instrument
+from .resample import resample_trajectories
+
+
+BUNDLE_MAGIC = b"TPLB"
+BUNDLE_VERSION = 1
+# quantized value marking a missing (NaN) coordinate
+QUANTIZED_NAN = 65535
+_QUANTIZED_LEVELS = 65534
+_ALIGN = 8
+
+
+def _quantize(array):
+    """Quantize array to uint16 with per-coordinate (last axis) limits, mapping NaN's to `QUANTIZED_NAN`"""
+    flat = array.reshape(-1, array.shape[-1])
+    lower = np.nanmin(flat, axis=0) if flat.size > 0 else np.zeros(array.shape[-1])
+    upper = np.nanmax(flat, axis=0) if flat.size > 0 else np.zeros(array.shape[-1])
+    span = np.where(upper > lower, upper - lower, 1.0)
+    quantized = np.rint((array - lower) / span * _QUANTIZED_LEVELS)
+    quantized = np.where(np.isnan(quantized), QUANTIZED_NAN, quantized).astype("<u2")
+    return quantized, lower, upper
+
+
+def _dequantize(quantized, lower, upper):
+    """Map uint16 values back to coordinates, with `QUANTIZED_NAN` as NaN"""
+    lower = np.asarray(lower, dtype=np.float32)
+    span = np.asarray(upper, dtype=np.float32) - lower
+    array = lower + quantized.astype(np.float32) * (span / _QUANTIZED_LEVELS)
+    array[quantized == QUANTIZED_NAN] = np.nan
+    return array
+
+
+def write_bundle(path, arrays, meta=None, quantize=()):
+    """Write arrays into a bundle
+
+    Args:
+        path (str): output file
+        arrays (dict): array name -> ndarray; floating arrays are stored as float32, others as they are
+        meta (dict): JSON-serializable metadata stored in the header
+        quantize (tuple): names of floating arrays stored as uint16 with per-coordinate limits
+
+    Returns:
+        (int): size of bundle in bytes
+    """
+    entries, blobs, offset = [], [], 0
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        entry = {"name": name, "shape": list(array.shape)}
+        if name in quantize:
+            array, lower, upper = _quantize(np.asarray(array, dtype=float))
+            entry["lower"] = lower.tolist()
+            entry["upper"] = upper.tolist()
+        elif np.issubdtype(array.dtype, np.floating):
+            array = array.astype("<f4")
+        else:
+            array = array.astype(array.dtype.newbyteorder("<"))
+        entry["dtype"] = array.dtype.str.lstrip("<|")
+        entry["offset"] = offset
+        blob = np.ascontiguousarray(array).tobytes()
+        entries.append(entry)
+        blobs.append(blob)
+        offset += len(blob) + (-len(blob)) % _ALIGN
+
+    header = json.dumps({"version": BUNDLE_VERSION, "arrays": entries, "meta": meta or {}}).encode("utf-8")
+    # pad header so that the data section starts aligned
+    header += b" " * ((-(12 + len(header))) % _ALIGN)
+    with open(path, "wb") as f:
+        f.write(BUNDLE_MAGIC + struct.pack("<II", BUNDLE_VERSION, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+            f.write(b"\0" * ((-len(blob)) % _ALIGN))
+        return f.tell()
+
+
+def _parse_header(data):
+    """Parse magic, version, and JSON header at the start of bundle content
+
+    Returns:
+        (tuple): header dict, and offset of the arrays
+    """
+    if data[:4] != BUNDLE_MAGIC:
+        raise ValueError("not a trajplotlib bundle")
+    version, header_length = struct.unpack("<II", data[4:12])
+    if version > BUNDLE_VERSION:
+        raise ValueError(f"unsupported bundle version {version}")
+    header = json.loads(data[12:12+header_length].decode("utf-8"))
+    return header, 12 + header_length
+
+
+def _read_meta(path):
+    """Read metadata of bundle file without reading its arrays"""
+    with open(path, "rb") as f:
+        data = f.read(12)
+        if len(data) == 12 and data[:4] == BUNDLE_MAGIC:
+            data += f.read(struct.unpack("<I", data[8:12])[0])
+    return _parse_header(data)[0]["meta"]
+
+
+def load_bundle(path):
+    """Load bundle written by `write_bundle` or `export_bundle`, dequantizing quantized arrays to float32
+
+    Args:
+        path (str or bytes): bundle file, or its content
+
+    Returns:
+        (dict): array name -> ndarray, and "meta" -> metadata
+    """
+    if isinstance(path, (bytes, bytearray)):
+        data = bytes(path)
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+    header, start = _parse_header(data)
+    bundle = {"meta": header["meta"]}
+    for entry in header["arrays"]:
+        dtype = np.dtype("<" + entry["dtype"])
+        count = int(np.prod(entry["shape"]))
+        array = np.frombuffer(data, dtype=dtype, count=count, offset=start + entry["offset"]).reshape(entry["shape"])
+        if "lower" in entry:
+            array = _dequantize(array, entry["lower"], entry["upper"])
+        bundle[entry["name"]] = array
+    return bundle
+
+
+def _as_positions(positions, times, velocities):
+    """Get positions of shape (K,N,3), times, and velocities from arrays, a `Trajectory`, or a list of them"""
+    from .trajectory import Trajectory
+    if isinstance(positions, Trajectory):
+        positions = [positions]
+    if isinstance(positions, (list, tuple)) and len(positions) > 0 and isinstance(positions[0], Trajectory):
+        trajs = positions
+        if times is None:
+            times = trajs[0].times
+        if velocities is None and all(traj.velocities is not None for traj in trajs):
+            velocities = np.stack([traj.velocities for traj in trajs])
+        positions = np.stack([traj.positions for traj in trajs])
+    positions = np.asarray(positions, dtype=float)
+    if positions.ndim == 2:
+        positions = positions[None, :, :]
+    return positions, times, velocities
+
+
+@instrument
+def export_bundle(
+        path,
+        positions,
+        times=None,
+        nt=None,
+        method="cubic",
+        velocities=None,
+        c_traj="navy",
+        lw_traj=1.0,
+        values=None,
+        cmap="viridis",
+        vmin=None,
+        vmax=None,
+        bodies=None,
+        n_mesh=24,
+        quantize=False,
+        title=None,
+    ):
+    """Export trajectories, optionally resampled, with body meshes and colors into a compact binary bundle
+    for playback with the viewer written by `export_viewer`. The size of the bundle only depends on
+    the number of samples: 12 bytes per sample, or 6 bytes per sample if `quantize` is True.
+
+    Args:
+        path (str): output file, e.g. "mission.tplb"
+        positions (ndarray or Trajectory): positions of shape (N,3) or (K,N,3), `Trajectory`, or list of `Trajectory`
+        times (ndarray): time-stamps of shape (N,); if None, time-stamps of the `Trajectory`, or sample indices
+        nt (int): if provided, trajectories are resampled onto `nt` uniform time-stamps with `resample_trajectories`
+        method (str): interpolation method used with `nt`, "linear", "cubic", or "hermite"
+        velocities (ndarray): velocities of same shape as `positions`; required for "hermite"
+        c_traj (str, tuple, or list): color for trajectory, or list of colors, one per trajectory
+        lw_traj (float): linewidth for trajectory in the viewer
+        values (ndarray): per-sample values of shape (N,) or (K,N), e.g. speed, mapped to per-sample colors with `cmap`
+        cmap (str): matplotlib colormap of `values`
+        vmin (float): value mapped to the lower end of `cmap`; if None, minimum of `values`
+        vmax (float): value mapped to the upper end of `cmap`; if None, maximum of `values`
+        bodies (list): bodies drawn as wireframes, each a dict with "radii" (radius, or radii along x,y,z), and optionally "center" and "color"
+        n_mesh (int): number of points along each mesh direction of bodies
+        quantize (bool): whether to store positions as uint16 quantized within their bounding box, instead of float32
+        title (str): title shown by the viewer
+
+    Returns:
+        (int): size of bundle in bytes
+    """
+    from matplotlib import colormaps
+    from matplotlib.colors import is_color_like, to_hex
+    from .helper3d import get_ellipsoid_coordinates
+
+    positions, times, velocities = _as_positions(positions, times, velocities)
+    n_traj, n = positions.shape[0], positions.shape[1]
+    if values is not None:
+        values = np.asarray(values, dtype=float).reshape(n_traj, n)
+    if nt is not None:
+        assert times is not None, "times are required to resample trajectories"
+        if velocities is not None:
+            velocities = np.asarray(velocities, dtype=float).reshape(positions.shape)
+        t_out, positions = resample_trajectories(times, positions, nt=nt, method=method, velocities=velocities)
+        if values is not None:
+            values = resample_trajectories(times, values[..., None], t_interp=t_out, method="linear")[1][..., 0]
+        times = t_out
+    elif times is None:
+        times = np.arange(n, dtype=float)
+    times = np.asarray(times, dtype=float)
+
+    arrays = {
+        # time-stamps relative to the first one, so that float32 keeps their resolution
+        "times": times - times[0],
+        "positions": positions,
+    }
+    if is_color_like(c_traj):
+        c_traj = [c_traj] * n_traj
+    meta = {
+        "title": title or "",
+        "t0": float(times[0]),
+        "colors": [to_hex(c) for c in c_traj],
+        "linewidth": lw_traj,
+        "bodies": [],
+    }
+    if values is not None:
+        vmin = np.nanmin(values) if vmin is None else vmin
+        vmax = np.nanmax(values) if vmax is None else vmax
+        normalized = (values - vmin) / (vmax - vmin) if vmax > vmin else np.zeros_like(values)
+        arrays["sample_colors"] = colormaps[cmap](normalized, bytes=True)[..., :3]
+        meta.update(cmap=cmap, vmin=float(vmin), vmax=float(vmax))
+    for i, body in enumerate(bodies or []):
+        radii = np.broadcast_to(np.asarray(body["radii"], dtype=float), (3,))
+        mesh = np.stack(get_ellipsoid_coordinates(*radii, center=body.get("center"), n=n_mesh), axis=-1)
+        arrays[f"body{i}"] = mesh
+        meta["bodies"].append({"name": f"body{i}", "color": to_hex(body.get("color", "k"))})
+    return write_bundle(path, arrays, meta=meta, quantize=("positions",) if quantize is True else ())
+
+
+@instrument
+def export_viewer(path, bundle, embed=True, title=None):
+    """Write a self-contained HTML viewer playing back a bundle, with play/pause, time slider,
+    and mouse rotation and zoom. No external scripts are loaded, so the viewer works offline.
+
+    Args:
+        path (str): output HTML file
+        bundle (str): bundle file written by `export_bundle`
+        embed (bool): whether to embed the bundle as base64 in the HTML file; if False, the bundle is
+            loaded from its path relative to `path`, which requires serving both files over HTTP
+        title (str): page title, HTML-escaped; if None, title stored in the bundle, or "trajplotlib" if it is empty
+
+    Returns:
+        (int): size of HTML file in bytes
+    """
+    if title is None:
+        title = _read_meta(bundle).get("title")
+    if embed is True:
+        with open(bundle, "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        url = ""
+    else:
+        data = ""
+        url = os.path.relpath(bundle, os.path.dirname(os.path.abspath(path))).replace(os.sep, "/")
+    page = _VIEWER_TEMPLATE.replace("{{TITLE}}", html.escape(title or "trajplotlib"))
+    page = page.replace("{{BUNDLE_URL}}", json.dumps(url).replace("</", "<\\/")).replace("{{BUNDLE_B64}}", data)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+        return f.tell()
+
+
+_VIEWER_TEMPLATE = r"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{{TITLE}}</title>
+<style>
+  body { margin: 0; font-family: sans-serif; background: #fff; }
+  #controls { position: fixed; bottom: 0; left: 0; right: 0; padding: 8px; background: rgba(255,255,255,0.85); display: flex; gap: 8px; align-items: center; }
+  #slider { flex: 1; }
+  #label { min-width: 10em; text-align: right; font-variant-numeric: tabular-nums; }
+  canvas { display: block; }
+</style>
+</head>
+<body>
+<canvas id="view"></canvas>
+<div id="controls">
+  <button id="play">pause</button>
+  <select id="speed"><option value="0.25">0.25x</option><option value="1" selected>1x</option><option value="4">4x</option><option value="16">16x</option></select>
+  <input id="slider" type="range" min="0" max="0" value="0">
+  <span id="label"></span>
+</div>
+<script id="bundle" type="application/octet-stream">{{BUNDLE_B64}}</script>
+<script>
+"use strict";
+const BUNDLE_URL = {{BUNDLE_URL}};
+const QUANTIZED_NAN = 65535, QUANTIZED_LEVELS = 65534;
+
+function parseBundle(buffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== "TPLB") throw new Error("not a trajplotlib bundle");
+  const headerLength = view.getUint32(8, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 12, headerLength)));
+  const start = 12 + headerLength;
+  const types = { f4: Float32Array, u2: Uint16Array, u1: Uint8Array, i4: Int32Array, u4: Uint32Array };
+  const arrays = {};
+  for (const entry of header.arrays) {
+    const count = entry.shape.reduce((a, b) => a * b, 1);
+    let data = new types[entry.dtype](buffer, start + entry.offset, count);
+    if (entry.lower !== undefined) {
+      const dim = entry.shape[entry.shape.length - 1];
+      const out = new Float32Array(count);
+      for (let i = 0; i < count; i++) {
+        const c = i % dim;
+        out[i] = data[i] === QUANTIZED_NAN ? NaN : entry.lower[c] + data[i] * (entry.upper[c] - entry.lower[c]) / QUANTIZED_LEVELS;
+      }
+      data = out;
+    }
+    arrays[entry.name] = { data: data, shape: entry.shape };
+  }
+  return { meta: header.meta, arrays: arrays };
+}
+
+async function loadBundle() {
+  const text = document.getElementById("bundle").textContent.trim();
+  if (text.length > 0) {
+    const bytes = Uint8Array.from(atob(text), (c) => c.charCodeAt(0));
+    return parseBundle(bytes.buffer);
+  }
+  const response = await fetch(BUNDLE_URL);
+  return parseBundle(await response.arrayBuffer());
+}
+
+function startViewer(bundle) {
+  const canvas = document.getElementById("view");
+  const ctx = canvas.getContext("2d");
+  const slider = document.getElementById("slider");
+  const label = document.getElementById("label");
+  const playButton = document.getElementById("play");
+  const speed = document.getElementById("speed");
+  const meta = bundle.meta;
+  const times = bundle.arrays.times.data;
+  const [nTraj, nt] = bundle.arrays.positions.shape;
+  const pos = bundle.arrays.positions.data;
+  const sampleColors = bundle.arrays.sample_colors ? bundle.arrays.sample_colors.data : null;
+  document.title = meta.title || document.title;
+  slider.max = nt - 1;
+
+  // equal-axis bounds of trajectories and bodies
+  const lo = [Infinity, Infinity, Infinity], hi = [-Infinity, -Infinity, -Infinity];
+  const extend = (data) => {
+    for (let i = 0; i < data.length; i++) {
+      const v = data[i], c = i % 3;
+      if (v < lo[c]) lo[c] = v;
+      if (v > hi[c]) hi[c] = v;
+    }
+  };
+  extend(pos);
+  for (const body of meta.bodies) extend(bundle.arrays[body.name].data);
+  const center = [0, 1, 2].map((c) => 0.5 * (lo[c] + hi[c]));
+  const halfRange = Math.max(...[0, 1, 2].map((c) => 0.5 * (hi[c] - lo[c]))) || 1;
+
+  let elev = 30, azim = -60, zoom = 1, frame = 0, playing = true, last = null;
+  let sx = 0, sy = 0, scale = 1;
+  let ex = [1, 0, 0], ey = [0, 1, 0];
+
+  function resize() {
+    canvas.width = window.innerWidth * devicePixelRatio;
+    canvas.height = (window.innerHeight - 40) * devicePixelRatio;
+    canvas.style.width = window.innerWidth + "px";
+    canvas.style.height = (window.innerHeight - 40) + "px";
+    draw();
+  }
+
+  function updateProjection() {
+    // orthographic projection with the same view angles as matplotlib
+    const e = elev * Math.PI / 180, a = azim * Math.PI / 180;
+    ex = [-Math.sin(a), Math.cos(a), 0];
+    ey = [-Math.sin(e) * Math.cos(a), -Math.sin(e) * Math.sin(a), Math.cos(e)];
+    scale = zoom * 0.45 * Math.min(canvas.width, canvas.height) / (halfRange * Math.sqrt(3));
+    sx = canvas.width / 2;
+    sy = canvas.height / 2;
+  }
+
+  function project(data, i) {
+    const x = data[i] - center[0], y = data[i + 1] - center[1], z = data[i + 2] - center[2];
+    return [sx + scale * (ex[0] * x + ex[1] * y), sy - scale * (ey[0] * x + ey[1] * y + ey[2] * z)];
+  }
+
+  function drawPolyline(data, offset, count, stride) {
+    let pen = false;
+    ctx.beginPath();
+    for (let j = 0; j < count; j++) {
+      const i = offset + j * stride;
+      if (Number.isNaN(data[i])) { pen = false; continue; }
+      const [u, v] = project(data, i);
+      if (pen) ctx.lineTo(u, v); else ctx.moveTo(u, v);
+      pen = true;
+    }
+    ctx.stroke();
+  }
+
+  function draw() {
+    updateProjection();
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.lineWidth = 0.5 * devicePixelRatio;
+    for (const body of meta.bodies) {
+      const mesh = bundle.arrays[body.name];
+      const [n0, n1] = mesh.shape;
+      ctx.strokeStyle = body.color;
+      for (let r = 0; r < n0; r++) drawPolyline(mesh.data, 3 * r * n1, n1, 3);
+      for (let c = 0; c < n1; c++) drawPolyline(mesh.data, 3 * c, n0, 3 * n1);
+    }
+    ctx.lineWidth = meta.linewidth * devicePixelRatio;
+    for (let k = 0; k < nTraj; k++) {
+      const offset = 3 * k * nt;
+      if (sampleColors === null) {
+        ctx.strokeStyle = meta.colors[k];
+        drawPolyline(pos, offset, frame + 1, 3);
+      } else {
+        // one polyline per run of samples sharing the same color
+        let j = 0;
+        while (j < frame) {
+          const c = 3 * (k * nt + j);
+          let end = j + 1;
+          while (end < frame && sampleColors[c + 3 * (end - j)] === sampleColors[c] &&
+                 sampleColors[c + 3 * (end - j) + 1] === sampleColors[c + 1] &&
+                 sampleColors[c + 3 * (end - j) + 2] === sampleColors[c + 2]) end++;
+          ctx.strokeStyle = "rgb(" + sampleColors[c] + "," + sampleColors[c + 1] + "," + sampleColors[c + 2] + ")";
+          drawPolyline(pos, offset + 3 * j, end - j + 1, 3);
+          j = end;
+        }
+      }
+      // marker at current position
+      const head = offset + 3 * frame;
+      if (!Number.isNaN(pos[head])) {
+        const [u, v] = project(pos, head);
+        ctx.fillStyle = meta.colors[k];
+        ctx.beginPath();
+        ctx.arc(u, v, 3 * devicePixelRatio, 0, 2 * Math.PI);
+        ctx.fill();
+      }
+    }
+    slider.value = frame;
+    label.textContent = "t = " + (meta.t0 + times[frame]).toPrecision(6);
+  }
+
+  function tick(now) {
+    if (playing && last !== null) {
+      // play the whole bundle in about 10 seconds at 1x
+      const step = Number(speed.value) * (now - last) / 10000 * nt;
+      frame = Math.min(nt - 1, frame + Math.max(1, Math.round(step)));
+      if (frame === nt - 1) playing = false, playButton.textContent = "play";
+      draw();
+    }
+    last = now;
+    requestAnimationFrame(tick);
+  }
+
+  playButton.onclick = () => {
+    playing = !playing;
+    if (playing && frame === nt - 1) frame = 0;
+    playButton.textContent = playing ? "pause" : "play";
+  };
+  slider.oninput = () => { frame = Number(slider.value); draw(); };
+  let drag = null;
+  canvas.onmousedown = (event) => { drag = [event.clientX, event.clientY]; };
+  window.onmouseup = () => { drag = null; };
+  window.onmousemove = (event) => {
+    if (drag === null) return;
+    azim -= 0.5 * (event.clientX - drag[0]);
+    elev = Math.max(-90, Math.min(90, elev + 0.5 * (event.clientY - drag[1])));
+    drag = [event.clientX, event.clientY];
+    draw();
+  };
+  canvas.onwheel = (event) => { event.preventDefault(); zoom *= Math.exp(-0.001 * event.deltaY); draw(); };
+  window.onresize = resize;
+  resize();
+  requestAnimationFrame(tick);
+}
+
+if (typeof document !== "undefined") {
+  loadBundle().then(startViewer).catch((error) => { document.body.textContent = String(error); });
+}
+</script>
+</body>
+</html>
+"""